@@ -3,9 +3,21 @@ import _ from 'lodash';
 import oracledb from 'oracledb';
 
 import { logger } from 'utils/logger';
+import { observe, registerGauge } from 'utils/metrics';
 
 const dbConfig = config.get('dataSources.oracledb');
 
+/**
+ * Requests waiting for a connection beyond queueMax are rejected at once, and requests that wait
+ * longer than queueTimeout milliseconds are rejected by the pool. Rejected requests should be
+ * retried after retryAfterSeconds.
+ */
+const {
+  queueMax = dbConfig.poolMax * 4,
+  queueTimeout = 60000,
+  retryAfterSeconds = 1,
+} = dbConfig;
+
 process.on('SIGINT', () => process.exit());
 oracledb.outFormat = oracledb.OBJECT;
 oracledb.fetchAsString = [oracledb.DATE, oracledb.NUMBER];
@@ -14,8 +26,16 @@ oracledb.fetchAsString = [oracledb.DATE, oracledb.NUMBER];
 const threadPoolSize = dbConfig.poolMax + (dbConfig.poolMax / 5);
 process.env.UV_THREADPOOL_SIZE = threadPoolSize > 128 ? 128 : threadPoolSize;
 
-/** Connection pool */
+/** Connection pool, and the promise of its creation while it is being created */
 let pool;
+let pendingPool = null;
+
+/** Number of requests currently waiting for a connection from the pool */
+let queueLength = 0;
+
+/** Number of requests rejected because the queue was full or they waited too long */
+let rejectedCount = 0;
+let timedOutCount = 0;
 
 /**
  * Create a pool of connection
@@ -25,23 +45,103 @@ let pool;
 const createPool = async () => {
   /** Attributes to use from config file */
   const attributes = ['connectString', 'user', 'password', 'poolMin', 'poolMax', 'poolIncrement'];
-  pool = await oracledb.createPool(_.pick(dbConfig, attributes));
+  pool = await oracledb.createPool({ ..._.pick(dbConfig, attributes), queueTimeout });
+};
+
+/**
+ * Get the pool, creating it if it hasn't been created yet. Concurrent callers share a single
+ * creation.
+ *
+ * @returns {Promise} Promise object represents the pool of connections
+ */
+const getPool = async () => {
+  if (!pool) {
+    if (!pendingPool) {
+      pendingPool = createPool().finally(() => { pendingPool = null; });
+    }
+    await pendingPool;
+  }
+  return pool;
 };
 
 /**
- * Get a connection from a created pool. Creates pool if it hasn't been created yet.
+ * Create an error for a request which could not get a connection because the pool is saturated.
+ * The error handler responds to it with 503 and a Retry-After header.
+ *
+ * @param {string} message Error message
+ * @returns {Error} Error with the seconds after which the request should be retried
+ */
+const poolSaturatedError = (message) => Object.assign(new Error(message), { retryAfterSeconds });
+
+/**
+ * Get a connection from a created pool. Creates pool if it hasn't been created yet. Rejects at
+ * once if queueMax requests are already waiting for a connection.
  *
  * @returns {Promise} Promise object represents a connection from created pool
  */
 const getConnection = async () => {
-  if (!pool) {
-    await createPool();
+  if (queueLength >= queueMax) {
+    rejectedCount += 1;
+    throw poolSaturatedError(`Connection queue is full: ${queueLength} waiting requests`);
   }
-  return pool.getConnection();
+
+  const start = process.hrtime();
+  queueLength += 1;
+  try {
+    return await (await getPool()).getConnection();
+  } catch (err) {
+    // NJS-040: the request waited longer than queueTimeout
+    if (/^NJS-040/.test(err.message)) {
+      timedOutCount += 1;
+      throw poolSaturatedError(err.message);
+    }
+    throw err;
+  } finally {
+    queueLength -= 1;
+    const [seconds, nanoseconds] = process.hrtime(start);
+    observe('oracledb.connectionWaitMs', seconds * 1e3 + nanoseconds / 1e6);
+  }
+};
+
+/**
+ * Warm up the pool at startup, so that the first requests don't pay for creating it. Each of the
+ * poolMin connections opened with the pool is pinged before it is released.
+ *
+ * @returns {Promise} Promise object resolves once the connections have been pinged
+ */
+const warmUpPool = async () => {
+  const connections = await Promise.all(_.times(dbConfig.poolMin || 0, getConnection));
+  await Promise.all(_.map(connections, async (connection) => {
+    try {
+      await connection.ping();
+    } finally {
+      await connection.close();
+    }
+  }));
 };
 
 /**
- * Validate database connection and throw an error if invalid
+ * Get statistics of the connection pool
+ *
+ * @returns {object} Open and in-use connections of the pool, the number of queued requests and the
+ *   number of requests rejected because the pool was saturated
+ */
+const getPoolStats = () => ({
+  connectionsOpen: pool ? pool.connectionsOpen : 0,
+  connectionsInUse: pool ? pool.connectionsInUse : 0,
+  queueLength,
+  rejectedCount,
+  timedOutCount,
+});
+
+registerGauge('oracledb.connectionsOpen', () => getPoolStats().connectionsOpen);
+registerGauge('oracledb.connectionsInUse', () => getPoolStats().connectionsInUse);
+registerGauge('oracledb.queueLength', () => getPoolStats().queueLength);
+registerGauge('oracledb.rejectedCount', () => getPoolStats().rejectedCount);
+registerGauge('oracledb.timedOutCount', () => getPoolStats().timedOutCount);
+
+/**
+ * Validate database connection and warm up the pool, and throw an error if invalid
  *
  * @returns {Promise} resolves if database connection can be established and rejects otherwise
  */
@@ -50,6 +150,9 @@ const validateOracleDb = async () => {
   try {
     connection = await getConnection();
     await connection.execute('SELECT 1 FROM DUAL');
+    await connection.close();
+    connection = null;
+    await warmUpPool();
   } catch (err) {
     logger.error(err);
     throw new Error('Unable to connect to Oracle database');
@@ -64,5 +167,5 @@ const validateOracleDb = async () => {
 process.on('exit', () => { if (pool && pool.close) pool.close(); });
 
 export {
-  getConnection, validateOracleDb,
+  getConnection, getPoolStats, validateOracleDb,
 };
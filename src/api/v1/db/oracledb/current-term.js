@@ -0,0 +1,68 @@
+import config from 'config';
+import moment from 'moment';
+
+import { contrib } from './contrib/contrib';
+
+/** Seconds a resolved current term is reused before it is looked up again */
+const { currentTermTtlSeconds = 3600 } = config.get('dataSources.oracledb');
+
+/** Cached current term and the moment it expires */
+let cachedTerm = null;
+let expiresAt = null;
+
+/** Promise of the lookup in flight, shared by concurrent callers */
+let pendingLookup = null;
+
+/**
+ * Invalidate the cached current term once it has expired, so that the next caller looks it up
+ */
+const invalidateCurrentTerm = () => {
+  cachedTerm = null;
+  expiresAt = null;
+};
+
+/**
+ * Look up the current term and cache it until the TTL elapses or the day ends, whichever is first.
+ * Terms start at day boundaries, so a cached term never outlives the day it was looked up on.
+ *
+ * @param {object} connection Connection used for the lookup
+ * @returns {Promise<string>} Promise object represents the current term
+ */
+const lookUpCurrentTerm = async (connection) => {
+  try {
+    // Errors thrown synchronously while building the query reject the promise instead
+    const { rows } = await Promise.resolve().then(
+      () => connection.execute(contrib.getCurrentTerm()),
+    );
+    const { currentTerm } = rows[0];
+    cachedTerm = currentTerm;
+    expiresAt = moment.min(
+      moment().add(currentTermTtlSeconds, 'seconds'),
+      moment().endOf('day'),
+    );
+    return currentTerm;
+  } finally {
+    pendingLookup = null;
+  }
+};
+
+/**
+ * Get the current term from the cache, or look it up. Concurrent callers share a single lookup.
+ *
+ * @param {object} connection Connection used if the term has to be looked up
+ * @returns {Promise<string>} Promise object represents the current term
+ */
+const getCurrentTerm = async (connection) => {
+  if (cachedTerm) {
+    if (moment().isBefore(expiresAt)) {
+      return cachedTerm;
+    }
+    invalidateCurrentTerm();
+  }
+  if (!pendingLookup) {
+    pendingLookup = lookUpCurrentTerm(connection);
+  }
+  return pendingLookup;
+};
+
+export { getCurrentTerm };
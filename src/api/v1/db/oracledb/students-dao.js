@@ -1,9 +1,83 @@
+import _ from 'lodash';
+
+import { registerGauge } from 'utils/metrics';
+import { getPageQuery, getPagination } from 'utils/paginator';
+import { createTimer } from 'utils/server-timing';
+import { createSingleFlight } from 'utils/single-flight';
 import { contrib } from './contrib/contrib';
 import * as conn from './connection';
+import { getCurrentTerm } from './current-term';
 import * as studentsSerializer from '../../serializers/students-serializer';
 
+/** Number of statements executed by the DAO */
+let executeCount = 0;
+
+/** Queries of a single student in flight, shared by identical concurrent requests */
+const resourceFlight = createSingleFlight();
+
+/** Ids of SQL and serializer functions, which identify a resource in the keys of resourceFlight */
+const functionIds = new Map();
+
+registerGauge('oracledb.executeCount', () => executeCount);
+registerGauge('coalescing.executions', () => resourceFlight.getStats().executions);
+registerGauge('coalescing.sharedCalls', () => resourceFlight.getStats().sharedCalls);
+
 /**
- * Return serialized resource(s) by unique ID
+ * Execute a statement and count it
+ *
+ * @param {object} connection Connection to execute the statement on
+ * @param {string} statement The SQL statement
+ * @param {object} binds Bind parameters
+ * @returns {Promise<object>} Promise object represents the result of the statement
+ */
+const execute = (connection, statement, binds) => {
+  executeCount += 1;
+  return connection.execute(statement, binds);
+};
+
+/**
+ * Get the id of a function, assigning the next one the first time
+ *
+ * @param {Function} fn SQL or serializer function
+ * @returns {number} Id of the function
+ */
+const getFunctionId = (fn) => {
+  if (!functionIds.has(fn)) {
+    functionIds.set(fn, functionIds.size);
+  }
+  return functionIds.get(fn);
+};
+
+/**
+ * Count the rows of a query without fetching them
+ *
+ * @param {string} sql The SQL statement to count the rows of
+ * @returns {string} SQL statement returning the number of rows as totalResults
+ */
+const countSql = (sql) => `SELECT COUNT(*) AS "totalResults" FROM (${sql})`;
+
+/**
+ * Limit a query to a single page of rows
+ *
+ * @param {string} sql The SQL statement to paginate
+ * @returns {string} SQL statement with :pageOffset and :pageSize bind parameters
+ */
+const pageSql = (sql) => `${sql}
+  OFFSET :pageOffset ROWS FETCH NEXT :pageSize ROWS ONLY`;
+
+/**
+ * Pick the sparse fieldset parameters, e.g. fields[gpa], of query parameters
+ *
+ * @param {object} params A key-value pair params object
+ * @returns {object} sparse fieldset parameters
+ */
+const getFieldsetParams = (params) => _.pickBy(
+  params,
+  (value, key) => _.startsWith(key, 'fields['),
+);
+
+/**
+ * Query and serialize resource(s) by unique ID
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {string} sql The SQL statement that is executed
@@ -11,10 +85,20 @@ import * as studentsSerializer from '../../serializers/students-serializer';
  * @param {boolean} isSingleton A Boolean value represents the resource should be singleton or not
  * @param {object} extraBinds Extra bind parameters besides osuId and term
  * @param {object} params A key-value pair params object
+ * @param {object} timer Timer of the request, which records the pool, term, count, query and
+ *                       serialize phases
  * @returns {Promise<object>} Promise object represents serialized resource(s)
  */
-const getResourceById = async (osuId, sql, serializer, isSingleton, extraBinds, params) => {
-  const connection = await conn.getConnection();
+const queryResourceById = async (
+  osuId,
+  sql,
+  serializer,
+  isSingleton,
+  extraBinds,
+  params,
+  timer,
+) => {
+  const connection = await timer.time('pool', () => conn.getConnection());
   try {
     const term = params ? params.term : null;
     const binds = {
@@ -23,15 +107,27 @@ const getResourceById = async (osuId, sql, serializer, isSingleton, extraBinds,
       ...extraBinds,
     };
     if (term === 'current') {
-      const rawCurrentTerm = await connection.execute(contrib.getCurrentTerm());
-      const { currentTerm } = rawCurrentTerm.rows[0];
-      binds.term = currentTerm;
+      binds.term = await timer.time('term', () => getCurrentTerm(connection));
     }
 
-    const { rows } = await connection.execute(
-      sql(params),
-      binds,
-    );
+    // Only a single page of rows is fetched if a page is requested
+    let statement = sql(params);
+    let pagination;
+    const pageQuery = getPageQuery(params);
+    if (pageQuery) {
+      const { rows: [{ totalResults }] } = await timer.time(
+        'count',
+        () => execute(connection, countSql(statement), binds),
+      );
+      pagination = getPagination(parseInt(totalResults, 10), pageQuery);
+      statement = pageSql(statement);
+      binds.pageOffset = (pagination.pageNumber - 1) * pagination.pageSize;
+      binds.pageSize = pagination.pageSize;
+    }
+
+    const { rows } = pagination && pagination.isOutOfBounds
+      ? { rows: [] }
+      : await timer.time('query', () => execute(connection, statement, binds));
     if (isSingleton && rows.length > 1) {
       throw new Error('Expect a single object but got multiple results.');
     } else {
@@ -41,11 +137,132 @@ const getResourceById = async (osuId, sql, serializer, isSingleton, extraBinds,
       } else {
         rawRows = rows;
       }
-      const serializedResource = serializer(rawRows, osuId, params);
+      const serializedResource = await timer.time(
+        'serialize',
+        () => serializer(rawRows, osuId, params, pagination),
+      );
       return serializedResource;
     }
   } finally {
-    connection.close();
+    await connection.close();
+  }
+};
+
+/**
+ * Return serialized resource(s) by unique ID. Identical concurrent calls, e.g. a burst of requests
+ * for the grades of a student, share a single query and its serialized result. Calls which share
+ * a query record the time they wait for it as the coalesced phase.
+ *
+ * @param {string} osuId 9 digits OSU ID
+ * @param {string} sql The SQL statement that is executed
+ * @param {Function} serializer Resource serializer function
+ * @param {boolean} isSingleton A Boolean value represents the resource should be singleton or not
+ * @param {object} extraBinds Extra bind parameters besides osuId and term
+ * @param {object} params A key-value pair params object
+ * @param {object} timer Timer of the request, which records the pool, term, query and serialize
+ *                       phases
+ * @returns {Promise<object>} Promise object represents serialized resource(s)
+ */
+const getResourceById = (
+  osuId,
+  sql,
+  serializer,
+  isSingleton,
+  extraBinds,
+  params,
+  timer = createTimer(),
+) => {
+  const key = JSON.stringify([
+    getFunctionId(sql),
+    getFunctionId(serializer),
+    osuId,
+    isSingleton,
+    extraBinds,
+    params,
+  ]);
+  const query = () => queryResourceById(
+    osuId,
+    sql,
+    serializer,
+    isSingleton,
+    extraBinds,
+    params,
+    timer,
+  );
+  return resourceFlight.has(key)
+    ? timer.time('coalesced', () => resourceFlight.run(key, query))
+    : resourceFlight.run(key, query);
+};
+
+/**
+ * Wrap a single student query into a set-based query over a collection of OSU IDs. The query is
+ * applied laterally to each OSU ID, and every row is tagged with the OSU ID it belongs to.
+ *
+ * @param {Function} sql The SQL statement of a single student
+ * @param {object} params A key-value pair params object
+ * @returns {string} SQL statement with an :osuIds collection bind parameter
+ */
+const batchSql = (sql, params) => `
+  SELECT ids.COLUMN_VALUE AS "batchOsuId", resource.*
+  FROM TABLE(:osuIds) ids
+  CROSS APPLY (${sql(params).replace(/:osuId\b/g, 'ids.COLUMN_VALUE')}) resource
+`;
+
+/**
+ * Return serialized resource(s) of many students with a single query
+ *
+ * @param {string[]} osuIds 9 digits OSU IDs
+ * @param {string} sql The SQL statement of a single student
+ * @param {Function} serializer Resource serializer function of a single student
+ * @param {boolean} isSingleton A Boolean value represents the resource should be singleton or not
+ * @param {object} extraBinds Extra bind parameters besides osuIds and term
+ * @param {object} params A key-value pair params object
+ * @param {object} timer Timer of the request
+ * @returns {Promise<object[]>} Promise object represents serialized resource(s) of each student
+ *                             that has any
+ */
+const getResourcesByIds = async (
+  osuIds,
+  sql,
+  serializer,
+  isSingleton,
+  extraBinds,
+  params,
+  timer = createTimer(),
+) => {
+  const connection = await timer.time('pool', () => conn.getConnection());
+  try {
+    const term = params ? params.term : null;
+    const binds = {
+      osuIds: { type: 'SYS.ODCIVARCHAR2LIST', val: osuIds },
+      ...(term && { term }),
+      ...extraBinds,
+    };
+    if (term === 'current') {
+      binds.term = await timer.time('term', () => getCurrentTerm(connection));
+    }
+
+    const { rows } = await timer.time(
+      'query',
+      () => execute(connection, batchSql(sql, params), binds),
+    );
+    const rowsByOsuId = _.groupBy(rows, 'batchOsuId');
+
+    const stopSerialize = timer.start('serialize');
+    const serializedResources = [];
+    _.forEach(osuIds, (osuId) => {
+      const studentRows = _.map(rowsByOsuId[osuId], (row) => _.omit(row, 'batchOsuId'));
+      if (isSingleton && studentRows.length > 1) {
+        throw new Error('Expect a single object but got multiple results.');
+      } else if (!isSingleton || studentRows.length === 1) {
+        const rawRows = isSingleton ? studentRows[0] : studentRows;
+        serializedResources.push(serializer(rawRows, osuId, params));
+      }
+    });
+    stopSerialize();
+    return serializedResources;
+  } finally {
+    await connection.close();
   }
 };
 
@@ -53,28 +270,36 @@ const getResourceById = async (osuId, sql, serializer, isSingleton, extraBinds,
  * Get GPA
  *
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params sparse fieldset parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized GPA
  */
-const getGpaById = (osuId) => getResourceById(
+const getGpaById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getGpaLevelsById,
   studentsSerializer.serializeGpa,
   false,
   {},
+  params,
+  timer,
 );
 
 /**
  * Get GPA
  *
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params sparse fieldset parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized GPA
  */
-const getAccountBalanceById = (osuId) => getResourceById(
+const getAccountBalanceById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getAccountBalanceById,
   studentsSerializer.serializeAccountBalance,
   true,
   {},
+  params,
+  timer,
 );
 
 /**
@@ -82,9 +307,10 @@ const getAccountBalanceById = (osuId) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized account transactions
  */
-const getAccountTransactionsById = (osuId, params) => {
+const getAccountTransactionsById = (osuId, params, timer) => {
   const { categories, transactionType } = params;
   const extraBinds = {
     ...(transactionType && { transactionType: { charge: 'C', payment: 'P' }[transactionType] }),
@@ -97,6 +323,7 @@ const getAccountTransactionsById = (osuId, params) => {
     false,
     extraBinds,
     params,
+    timer,
   );
 };
 
@@ -105,29 +332,35 @@ const getAccountTransactionsById = (osuId, params) => {
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized academic status
  */
-const getAcademicStatusById = (osuId, params) => getResourceById(
+const getAcademicStatusById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getAcademicStatusById,
   studentsSerializer.serializeAcademicStatus,
   false,
   {},
   params,
+  timer,
 );
 
 /**
  * Get classification
  *
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params sparse fieldset parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized classification
  */
-const getClassificationById = (osuId) => getResourceById(
+const getClassificationById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getClassificationById,
   studentsSerializer.serializeClassification,
   true,
   {},
+  params,
+  timer,
 );
 
 /**
@@ -135,15 +368,17 @@ const getClassificationById = (osuId) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized grades
  */
-const getGradesById = (osuId, params) => getResourceById(
+const getGradesById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getGradesById,
   studentsSerializer.serializeGrades,
   false,
   {},
   params,
+  timer,
 );
 
 /**
@@ -151,15 +386,17 @@ const getGradesById = (osuId, params) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized class schedule
  */
-const getClassScheduleById = (osuId, params) => getResourceById(
+const getClassScheduleById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getClassScheduleById,
   studentsSerializer.serializeClassSchedule,
   false,
   {},
   params,
+  timer,
 );
 
 /**
@@ -167,29 +404,35 @@ const getClassScheduleById = (osuId, params) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized holds
  */
-const getHoldsById = (osuId, params) => getResourceById(
+const getHoldsById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getHoldsById,
   studentsSerializer.serializeHolds,
   false,
   params.codes,
   params,
+  timer,
 );
 
 /**
  * Get work study
  *
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params sparse fieldset parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized work study
  */
-const getWorkStudyById = (osuId) => getResourceById(
+const getWorkStudyById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getAwardsById,
   studentsSerializer.serializeWorkStudy,
   false,
   {},
+  params,
+  timer,
 );
 
 /**
@@ -197,15 +440,17 @@ const getWorkStudyById = (osuId) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized dual enrollment
  */
-const getDualEnrollmentById = (osuId, params) => getResourceById(
+const getDualEnrollmentById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getDualEnrollmentById,
   studentsSerializer.serializeDualEnrollment,
   false,
   {},
   params,
+  timer,
 );
 
 /**
@@ -213,33 +458,187 @@ const getDualEnrollmentById = (osuId, params) => getResourceById(
  *
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized degrees
  */
-const getDegreesById = (osuId, params) => getResourceById(
+const getDegreesById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getDegreesById,
   studentsSerializer.serializeDegrees,
   false,
   {},
   params,
+  timer,
 );
 
 /**
  * Get emergency contacts
  *
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params sparse fieldset parameters
+ * @param {object} timer Timer of the request
  * @returns {object} serialized emergency contacts
  */
-const getEmergencyContactsById = (osuId) => getResourceById(
+const getEmergencyContactsById = (osuId, params, timer) => getResourceById(
   osuId,
   contrib.getEmergencyContactsById,
   studentsSerializer.serializeEmergencyContacts,
   false,
   {},
+  params,
+  timer,
 );
 
+/**
+ * Queries of the resources which can be requested for many students at once or included in a
+ * student, keyed by resource path. Filters other than term and sparse fieldsets are only supported
+ * by the single student endpoints.
+ */
+const batchQueries = {
+  'academic-status': {
+    sql: contrib.getAcademicStatusById,
+    serializer: studentsSerializer.serializeAcademicStatus,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  'account-balance': {
+    sql: contrib.getAccountBalanceById,
+    serializer: studentsSerializer.serializeAccountBalance,
+    isSingleton: true,
+  },
+  'account-transactions': {
+    sql: contrib.getTransactionsById,
+    serializer: studentsSerializer.serializeAccountTransactions,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  classification: {
+    sql: contrib.getClassificationById,
+    serializer: studentsSerializer.serializeClassification,
+    isSingleton: true,
+  },
+  'class-schedule': {
+    sql: contrib.getClassScheduleById,
+    serializer: studentsSerializer.serializeClassSchedule,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  degrees: {
+    sql: contrib.getDegreesById,
+    serializer: studentsSerializer.serializeDegrees,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  'dual-enrollment': {
+    sql: contrib.getDualEnrollmentById,
+    serializer: studentsSerializer.serializeDualEnrollment,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  gpa: {
+    sql: contrib.getGpaLevelsById,
+    serializer: studentsSerializer.serializeGpa,
+    isSingleton: false,
+  },
+  grades: {
+    sql: contrib.getGradesById,
+    serializer: studentsSerializer.serializeGrades,
+    isSingleton: false,
+    hasTerm: true,
+  },
+  holds: {
+    sql: contrib.getHoldsById,
+    serializer: studentsSerializer.serializeHolds,
+    isSingleton: false,
+  },
+  'work-study': {
+    sql: contrib.getAwardsById,
+    serializer: studentsSerializer.serializeWorkStudy,
+    isSingleton: false,
+  },
+  'emergency-contacts': {
+    sql: contrib.getEmergencyContactsById,
+    serializer: studentsSerializer.serializeEmergencyContacts,
+    isSingleton: false,
+  },
+};
+
+/**
+ * Get a resource of many students
+ *
+ * @param {string} resourcePath resource path name, e.g. gpa
+ * @param {string[]} osuIds 9 digits OSU IDs
+ * @param {object} params filter parameters
+ * @param {object} timer Timer of the request
+ * @returns {object} serialized collection of the resources of every student
+ */
+const getBatchByIds = async (resourcePath, osuIds, params, timer) => {
+  const {
+    sql,
+    serializer,
+    isSingleton,
+    hasTerm,
+  } = batchQueries[resourcePath];
+  const batchParams = {
+    ...(hasTerm && _.pick(params, 'term')),
+    ...getFieldsetParams(params),
+  };
+  const serializedResources = await getResourcesByIds(
+    _.uniq(osuIds),
+    sql,
+    serializer,
+    isSingleton,
+    {},
+    batchParams,
+    timer,
+  );
+  return studentsSerializer.serializeBatch(serializedResources, resourcePath, params);
+};
+
+/**
+ * Get a student with the selected resources included. The resources are fetched concurrently, each
+ * on its own pooled connection, and the current term is only resolved once for all of them.
+ *
+ * @param {string} osuId 9 digits OSU ID
+ * @param {object} params include and filter parameters
+ * @param {object} timer Timer of the request
+ * @returns {object} serialized compound document of the student
+ */
+const getStudentById = async (osuId, params, timer = createTimer()) => {
+  let { term } = params;
+  if (term === 'current') {
+    const connection = await timer.time('pool', () => conn.getConnection());
+    try {
+      term = await timer.time('term', () => getCurrentTerm(connection));
+    } finally {
+      await connection.close();
+    }
+  }
+
+  const include = _.uniq(params.include);
+  const serializedResources = await Promise.all(_.map(include, (resourcePath) => {
+    const {
+      sql,
+      serializer,
+      isSingleton,
+      hasTerm,
+    } = batchQueries[resourcePath];
+    const resourceParams = {
+      ...(hasTerm && term && { term }),
+      ...getFieldsetParams(params),
+    };
+    return getResourceById(osuId, sql, serializer, isSingleton, {}, resourceParams, timer);
+  }));
+  return studentsSerializer.serializeStudent(
+    osuId,
+    _.zipObject(include, serializedResources),
+    params,
+  );
+};
+
 export {
   getResourceById,
+  getResourcesByIds,
   getGpaById,
   getAccountBalanceById,
   getAccountTransactionsById,
@@ -252,4 +651,6 @@ export {
   getDualEnrollmentById,
   getDegreesById,
   getEmergencyContactsById,
+  getBatchByIds,
+  getStudentById,
 };
@@ -0,0 +1,20 @@
+import { errorHandler } from 'errors/errors';
+
+import { getBatchByIds } from '../../../db/oracledb/students-dao';
+
+/**
+ * Get a resource of many students
+ *
+ * @type {RequestHandler}
+ */
+const get = async (req, res) => {
+  try {
+    const { resource } = req.params;
+    const result = await getBatchByIds(resource, req.query.osuIds, req.query, res.locals.timer);
+    res.send(result);
+  } catch (err) {
+    errorHandler(res, err);
+  }
+};
+
+export { get };
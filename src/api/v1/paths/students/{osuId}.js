@@ -0,0 +1,20 @@
+import { errorHandler } from 'errors/errors';
+
+import { getStudentById } from '../../db/oracledb/students-dao';
+
+/**
+ * Get a student with the selected resources included
+ *
+ * @type {RequestHandler}
+ */
+const get = async (req, res) => {
+  try {
+    const { osuId } = req.params;
+    const result = await getStudentById(osuId, req.query, res.locals.timer);
+    res.send(result);
+  } catch (err) {
+    errorHandler(res, err);
+  }
+};
+
+export { get };
@@ -10,7 +10,7 @@ import { getAccountBalanceById } from '../../../db/oracledb/students-dao';
 const get = async (req, res) => {
   try {
     const { osuId } = req.params;
-    const result = await getAccountBalanceById(osuId);
+    const result = await getAccountBalanceById(osuId, req.query, res.locals.timer);
     res.send(result);
   } catch (err) {
     errorHandler(res, err);
@@ -10,7 +10,7 @@ import { getDegreesById } from '../../../db/oracledb/students-dao';
 const get = async (req, res) => {
   try {
     const { osuId } = req.params;
-    const result = await getDegreesById(osuId, req.query);
+    const result = await getDegreesById(osuId, req.query, res.locals.timer);
     res.send(result);
   } catch (err) {
     errorHandler(res, err);
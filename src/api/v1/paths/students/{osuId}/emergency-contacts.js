@@ -10,7 +10,7 @@ import { getEmergencyContactsById } from '../../../db/oracledb/students-dao';
 const get = async (req, res) => {
   try {
     const { osuId } = req.params;
-    const result = await getEmergencyContactsById(osuId);
+    const result = await getEmergencyContactsById(osuId, req.query, res.locals.timer);
     res.send(result);
   } catch (err) {
     errorHandler(res, err);
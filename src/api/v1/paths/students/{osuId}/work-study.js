@@ -10,7 +10,7 @@ import { getWorkStudyById } from '../../../db/oracledb/students-dao';
 const get = async (req, res) => {
   try {
     const { osuId } = req.params;
-    const result = await getWorkStudyById(osuId);
+    const result = await getWorkStudyById(osuId, req.query, res.locals.timer);
     res.send(result);
   } catch (err) {
     errorHandler(res, err);
@@ -6,6 +6,32 @@ import { openapi } from 'utils/load-openapi';
 import { serializerOptions } from 'utils/jsonapi';
 import { apiBaseUrl, resourcePathLink, paramsLink } from 'utils/uri-builder';
 
+/**
+ * Get the attributes to serialize for a sparse fieldset. An array attribute of objects is also kept
+ * if any attributes of its items are requested, and its items are trimmed to them.
+ *
+ * @param {object} attributes attribute definitions of the resource from the OpenAPI file
+ * @param {string[]} fields requested attribute names
+ * @returns {object} attribute names to serialize as resourceKeys, and the attribute names of the
+ *                   items of trimmed array attributes as nestedKeys
+ */
+const getSparseFieldset = (attributes, fields) => {
+  const resourceKeys = [];
+  const nestedKeys = {};
+  _.forEach(attributes, ({ items }, key) => {
+    const itemKeys = items && items.properties
+      ? _.intersection(_.keys(items.properties), fields)
+      : [];
+    if (_.includes(fields, key)) {
+      resourceKeys.push(key);
+    } else if (!_.isEmpty(itemKeys)) {
+      resourceKeys.push(key);
+      nestedKeys[key] = itemKeys;
+    }
+  });
+  return { resourceKeys, nestedKeys };
+};
+
 /**
  * The function to generate arguments for JSONAPI serializer
  *
@@ -14,24 +40,36 @@ import { apiBaseUrl, resourcePathLink, paramsLink } from 'utils/uri-builder';
  * @param {string} resourcePath resource path name for generating top-level self-link
  * @param {boolean} isSingleton a boolean value represents the resource is singleton or not
  * @param {object} params query parameters
+ * @param {object} pagination pagination details if the results are paginated
  * @returns {object} arguments for JSONAPI serializer
  */
-const getSerializerArgs = (osuId, resultField, resourcePath, isSingleton, params) => {
+const getSerializerArgs = (osuId, resultField, resourcePath, isSingleton, params, pagination) => {
   const resourceData = openapi.definitions[resultField].properties.data;
   const resourceProp = isSingleton ? resourceData.properties : resourceData.items.properties;
   const studentsUrl = resourcePathLink(apiBaseUrl, 'students');
   const resourceUrl = resourcePathLink(resourcePathLink(studentsUrl, osuId), resourcePath);
+  const resourceType = resourceProp.type.enum[0];
+  const fields = params ? params[`fields[${resourceType}]`] : undefined;
+  const { resourceKeys, nestedKeys } = fields
+    ? getSparseFieldset(resourceProp.attributes.properties, fields)
+    : { resourceKeys: _.keys(resourceProp.attributes.properties) };
 
   params = _.mapValues(params, (val) => (_.isArray(val) ? _.join(val, ',') : val));
 
   const serializerArgs = {
     identifierField: 'identifierField',
-    resourceKeys: _.keys(resourceProp.attributes.properties),
+    resourceKeys,
+    nestedKeys,
     resourcePath: 'students',
     topLevelSelfLink: params && !_.isEmpty(params) ? paramsLink(resourceUrl, params) : resourceUrl,
     enableDataLinks: false,
-    resourceType: resourceProp.type.enum[0],
+    resourceType,
   };
+  if (pagination) {
+    serializerArgs.pagination = pagination;
+    serializerArgs.paginationUrl = resourceUrl;
+    serializerArgs.query = _.omit(params, ['page[number]', 'page[size]']);
+  }
   return serializerArgs;
 };
 
@@ -69,10 +107,11 @@ const fourDigitToTime = (string) => {
  *
  * @param {object[]} rawGpaLevels raw GPA level
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params query parameters
  * @returns {object} serialized GPA data
  */
-const serializeGpa = (rawGpaLevels, osuId) => {
-  const serializerArgs = getSerializerArgs(osuId, 'GradePointAverageResult', 'gpa', true);
+const serializeGpa = (rawGpaLevels, osuId, params) => {
+  const serializerArgs = getSerializerArgs(osuId, 'GradePointAverageResult', 'gpa', true, params);
   const identifierField = osuId;
 
   _.forEach(rawGpaLevels, (rawGpaLevel) => {
@@ -93,10 +132,13 @@ const serializeGpa = (rawGpaLevels, osuId) => {
  *
  * @param {object[]} rawAccountBalance raw account balance
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params query parameters
  * @returns {object} serialized account balance data
  */
-const serializeAccountBalance = (rawAccountBalance, osuId) => {
-  const serializerArgs = getSerializerArgs(osuId, 'AccountBalanceResult', 'account-balance', true);
+const serializeAccountBalance = (rawAccountBalance, osuId, params) => {
+  const serializerArgs = getSerializerArgs(
+    osuId, 'AccountBalanceResult', 'account-balance', true, params,
+  );
 
   rawAccountBalance.currentBalance = parseFloat(rawAccountBalance.currentBalance);
 
@@ -109,10 +151,13 @@ const serializeAccountBalance = (rawAccountBalance, osuId) => {
  * @param {object[]} rawTransactions raw account transaction
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params query parameters
+ * @param {object} pagination pagination details if the transactions are paginated
  * @returns {object} serialized account transaction data
  */
-const serializeAccountTransactions = (rawTransactions, osuId, params) => {
-  const serializerArgs = getSerializerArgs(osuId, 'AccountTransactionsResult', 'account-transactions', true, params);
+const serializeAccountTransactions = (rawTransactions, osuId, params, pagination) => {
+  const serializerArgs = getSerializerArgs(
+    osuId, 'AccountTransactionsResult', 'account-transactions', true, params, pagination,
+  );
   const identifierField = osuId;
 
   _.forEach(rawTransactions, (rawTransaction) => {
@@ -180,10 +225,13 @@ const serializeAcademicStatus = (rawAcademicStatus, osuId, params) => {
  *
  * @param {object[]} rawClassification raw classification
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params query parameters
  * @returns {object} serialized classification data
  */
-const serializeClassification = (rawClassification, osuId) => {
-  const serializerArgs = getSerializerArgs(osuId, 'ClassificationResult', 'classification', true);
+const serializeClassification = (rawClassification, osuId, params) => {
+  const serializerArgs = getSerializerArgs(
+    osuId, 'ClassificationResult', 'classification', true, params,
+  );
 
   rawClassification.isInternational = rawClassification.isInternational === 'Y';
 
@@ -196,10 +244,13 @@ const serializeClassification = (rawClassification, osuId) => {
  * @param {object[]} rawGrades raw grades
  * @param {string} osuId 9 digits OSU ID
  * @param {object} params query parameters
+ * @param {object} pagination pagination details if the grades are paginated
  * @returns {object} serialized grades data
  */
-const serializeGrades = (rawGrades, osuId, params) => {
-  const serializerArgs = getSerializerArgs(osuId, 'GradesResult', 'grades', false, params);
+const serializeGrades = (rawGrades, osuId, params, pagination) => {
+  const serializerArgs = getSerializerArgs(
+    osuId, 'GradesResult', 'grades', false, params, pagination,
+  );
 
   _.forEach(rawGrades, (rawGrade) => {
     rawGrade.creditHours = parseFloat(rawGrade.creditHours);
@@ -329,10 +380,11 @@ const serializeHolds = (rawHolds, osuId, params) => {
  *
  * @param {object[]} rawAwards raw awards
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params query parameters
  * @returns {object} serialized awards data
  */
-const serializeWorkStudy = (rawAwards, osuId) => {
-  const serializerArgs = getSerializerArgs(osuId, 'WorkStudyResult', 'work-study', true);
+const serializeWorkStudy = (rawAwards, osuId, params) => {
+  const serializerArgs = getSerializerArgs(osuId, 'WorkStudyResult', 'work-study', true, params);
   const identifierField = osuId;
 
   _.forEach(rawAwards, (rawAward) => {
@@ -440,10 +492,13 @@ const serializeDegrees = (rawDegrees, osuId, params) => {
  *
  * @param {object[]} rawEmergencyContacts raw emergency contacts
  * @param {string} osuId 9 digits OSU ID
+ * @param {object} params query parameters
  * @returns {object} serialized emergency contact data
  */
-const serializeEmergencyContacts = (rawEmergencyContacts, osuId) => {
-  const serializerArgs = getSerializerArgs(osuId, 'EmergencyContactsResult', 'emergency-contacts', true);
+const serializeEmergencyContacts = (rawEmergencyContacts, osuId, params) => {
+  const serializerArgs = getSerializerArgs(
+    osuId, 'EmergencyContactsResult', 'emergency-contacts', true, params,
+  );
   const identifierField = osuId;
 
   _.forEach(rawEmergencyContacts, (rawEmergencyContact) => {
@@ -456,6 +511,53 @@ const serializeEmergencyContacts = (rawEmergencyContacts, osuId) => {
   });
 };
 
+/**
+ * A function to combine the serialized resources of many students into a single collection
+ *
+ * @param {object[]} serializedResources serialized resources of each student
+ * @param {string} resourcePath resource path name, e.g. gpa
+ * @param {object} params query parameters
+ * @returns {object} serialized collection of the resources of every student
+ */
+const serializeBatch = (serializedResources, resourcePath, params) => {
+  const batchUrl = resourcePathLink(resourcePathLink(apiBaseUrl, 'students/batch'), resourcePath);
+  params = _.mapValues(params, (val) => (_.isArray(val) ? _.join(val, ',') : val));
+
+  return {
+    links: { self: paramsLink(batchUrl, params) },
+    data: _.flatMap(serializedResources, 'data'),
+  };
+};
+
+/**
+ * Serialize a student as a compound document, which includes the resources of the student and
+ * links them as relationships
+ *
+ * @param {string} osuId 9 digits OSU ID
+ * @param {object} serializedResources serialized resources keyed by resource path, e.g. gpa
+ * @param {object} params query parameters
+ * @returns {object} serialized student with the included resources
+ */
+const serializeStudent = (osuId, serializedResources, params) => {
+  const studentUrl = resourcePathLink(resourcePathLink(apiBaseUrl, 'students'), osuId);
+  params = _.mapValues(params, (val) => (_.isArray(val) ? _.join(val, ',') : val));
+  const getIdentifier = ({ type, id }) => ({ type, id });
+
+  return {
+    links: { self: paramsLink(studentUrl, params) },
+    data: {
+      type: 'student',
+      id: osuId,
+      relationships: _.mapValues(serializedResources, ({ links, data }) => ({
+        links: { related: links.self },
+        data: _.isArray(data) ? _.map(data, getIdentifier) : data && getIdentifier(data),
+      })),
+      links: { self: studentUrl },
+    },
+    included: _.flatMap(serializedResources, 'data'),
+  };
+};
+
 export {
   fourDigitToTime,
   getSerializerArgs,
@@ -471,4 +573,6 @@ export {
   serializeDualEnrollment,
   serializeDegrees,
   serializeEmergencyContacts,
+  serializeBatch,
+  serializeStudent,
 };
@@ -13,15 +13,19 @@ import 'source-map-support/register';
 import { errorBuilder, errorHandler } from 'errors/errors';
 import { authentication } from 'middlewares/authentication';
 import { bodyParserError } from 'middlewares/body-parser-error';
+import { compression } from 'middlewares/compression';
+import { httpCache } from 'middlewares/http-cache';
 import { loggerMiddleware } from 'middlewares/logger';
 import { removeUnknownParams } from 'middlewares/remove-unknown-params';
 import { runtimeErrors } from 'middlewares/runtime-errors';
+import { serverTiming, timeMiddleware } from 'middlewares/server-timing';
 import { openapi } from 'utils/load-openapi';
+import { getMetrics } from 'utils/metrics';
 import { validateDataSource } from 'utils/validate-data-source';
 
 const serverConfig = config.get('server');
 
-validateDataSource();
+const dataSourcesReady = validateDataSource();
 
 // Initialize Express applications and routers
 const app = express();
@@ -35,6 +39,9 @@ const adminAppRouter = express.Router();
  */
 app.set('query parser', 'simple');
 
+// Use strong ETags so that clients can make conditional requests for byte-identical responses
+app.set('etag', 'strong');
+
 // Create and start HTTPS servers
 const httpsOptions = {
   key: fs.readFileSync(serverConfig.keyPath),
@@ -44,13 +51,15 @@ const httpsOptions = {
 const httpsServer = https.createServer(httpsOptions, app);
 const adminHttpsServer = https.createServer(httpsOptions, adminApp);
 
-// Middlewares for routers, logger and authentication
+// Middlewares for routers, logger, compression and authentication
 const baseEndpoint = `${serverConfig.basePathPrefix}`;
 app.use(baseEndpoint, appRouter);
 adminApp.use(baseEndpoint, adminAppRouter);
 
 appRouter.use(loggerMiddleware);
-appRouter.use(authentication);
+appRouter.use(serverTiming);
+appRouter.use(compression);
+appRouter.use(timeMiddleware('auth', authentication));
 adminAppRouter.use(authentication);
 
 /**
@@ -97,12 +106,21 @@ adminAppRouter.get(`${openapi.basePath}`, async (req, res) => {
   }
 });
 
+// Return connection pool statistics, memory usage and request timings at admin metrics endpoint
+adminAppRouter.get(`${openapi.basePath}/metrics`, (req, res) => {
+  try {
+    res.send(getMetrics());
+  } catch (err) {
+    errorHandler(res, err);
+  }
+});
+
 // Initialize API with OpenAPI specification
 initialize({
   app: appRouter,
   apiDoc: {
     ...openapi,
-    'x-express-openapi-additional-middleware': [removeUnknownParams],
+    'x-express-openapi-additional-middleware': [removeUnknownParams, httpCache],
   },
   paths: `dist/api${openapi.basePath}/paths`,
   consumesMiddleware: {
@@ -116,6 +134,6 @@ initialize({
 // Return a 404 error if resource not found
 appRouter.use((req, res) => errorBuilder(res, 404, 'Resource not found.'));
 
-// Start servers and listen on ports
-httpsServer.listen(serverConfig.port);
+// Start servers and listen on ports. The API only accepts requests once the data sources are warm.
+dataSourcesReady.then(() => httpsServer.listen(serverConfig.port));
 adminHttpsServer.listen(serverConfig.adminPort);
@@ -101,6 +101,19 @@ const internalServerError = (detail) => new JsonApiError(error(
   detail,
 ));
 
+/**
+ * [503] Return a Service Unavailable error object
+ *
+ * @param {string} detail A human-readable explanation
+ * @returns {object} Service Unavailable error object
+ */
+const serviceUnavailable = (detail) => new JsonApiError(error(
+  '503',
+  'Service Unavailable',
+  '1503',
+  detail,
+));
+
 /**
  * Function to build an error response
  *
@@ -120,12 +133,19 @@ const errorBuilder = (res, status, detail) => {
 };
 
 /**
- * Function to handle unexpected errors
+ * Function to handle unexpected errors. Errors with retryAfterSeconds, e.g. when the connection
+ * pool is saturated, are temporary and result in a 503 with a Retry-After header.
  *
  * @param {Response} res Response
  * @param {object} err Error
  */
 const errorHandler = (res, err) => {
+  if (err && err.retryAfterSeconds) {
+    logger.warn(err.message);
+    res.set('Retry-After', String(err.retryAfterSeconds));
+    res.status(503).send(serviceUnavailable('The server is busy. Please retry later.'));
+    return;
+  }
   const detail = 'The application encountered an unexpected condition.';
   // Not all errors will have a stack associated with it
   let message = err.stack || err;
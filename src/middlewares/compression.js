@@ -0,0 +1,118 @@
+import config from 'config';
+import _ from 'lodash';
+import zlib from 'zlib';
+
+import { registerGauge } from 'utils/metrics';
+
+const {
+  thresholdBytes = 1024,
+  gzipLevel = zlib.constants.Z_DEFAULT_COMPRESSION,
+  brotliQuality = 4,
+} = config.has('compression') ? config.get('compression') : {};
+
+/**
+ * Functions that compress a body with a content coding, keyed by the coding in order of preference.
+ * Brotli is only available from Node.js 10.16.
+ */
+const encoders = {
+  ...(zlib.brotliCompress && {
+    br: (body, callback) => zlib.brotliCompress(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: brotliQuality,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+      },
+    }, callback),
+  }),
+  gzip: (body, callback) => zlib.gzip(body, { level: gzipLevel }, callback),
+};
+
+/**
+ * Matches the content coding suffixes which are added to the ETags of compressed responses, so that
+ * each representation has its own strong ETag
+ *
+ * @type {RegExp}
+ */
+const codingSuffixRegex = new RegExp(`-(${_.keys(encoders).join('|')})"`, 'g');
+
+/**
+ * Add the suffix of a content coding to an ETag
+ *
+ * @param {string} etag ETag of the uncompressed representation
+ * @param {string} coding Content coding, e.g. gzip
+ * @returns {string} ETag of the compressed representation
+ */
+const addCodingSuffix = (etag, coding) => etag.replace(/"$/, `-${coding}"`);
+
+/** Total bytes of the compressed responses before and after compression */
+let uncompressedBytes = 0;
+let compressedBytes = 0;
+
+registerGauge('compression.uncompressedBytes', () => uncompressedBytes);
+registerGauge('compression.compressedBytes', () => compressedBytes);
+
+/**
+ * Middleware that compresses response bodies of at least thresholdBytes with brotli or gzip,
+ * whichever the client prefers. Express sends the whole body with a single res.end() call, so the
+ * body is compressed at once and sent with its compressed Content-Length. The time spent is
+ * recorded as the compress phase of the request.
+ *
+ * The ETag which Express computes over the uncompressed body gets the suffix of the content coding,
+ * e.g. "abc-gzip", since the compressed bytes differ. The suffix is removed from If-None-Match so
+ * that Express compares it with the uncompressed ETag, and added back to the ETag of a 304.
+ *
+ * @type {RequestHandler}
+ */
+const compression = (req, res, next) => {
+  res.vary('Accept-Encoding');
+
+  let matchedCoding;
+  if (req.headers['if-none-match']) {
+    req.headers['if-none-match'] = req.headers['if-none-match'].replace(
+      codingSuffixRegex,
+      (suffix, coding) => {
+        matchedCoding = coding;
+        return '"';
+      },
+    );
+  }
+
+  const { end } = res;
+  res.end = (chunk, encoding, ...args) => {
+    const etag = res.getHeader('ETag');
+    if (res.statusCode === 304 && etag && matchedCoding) {
+      res.setHeader('ETag', addCodingSuffix(etag, matchedCoding));
+    }
+
+    const body = typeof chunk === 'string' ? Buffer.from(chunk, encoding) : chunk;
+    const coding = req.acceptsEncodings([..._.keys(encoders), 'identity']);
+    if (
+      !Buffer.isBuffer(body)
+      || body.length < thresholdBytes
+      || !encoders[coding]
+      || res.getHeader('Content-Encoding')
+    ) {
+      return end.call(res, chunk, encoding, ...args);
+    }
+
+    const stop = res.locals.timer ? res.locals.timer.start('compress') : _.noop;
+    encoders[coding](body, (error, compressed) => {
+      stop();
+      if (error) {
+        end.call(res, body);
+        return;
+      }
+      uncompressedBytes += body.length;
+      compressedBytes += compressed.length;
+      res.setHeader('Content-Encoding', coding);
+      res.setHeader('Content-Length', compressed.length);
+      if (etag) {
+        res.setHeader('ETag', addCodingSuffix(etag, coding));
+      }
+      end.call(res, compressed);
+    });
+    return res;
+  };
+  next();
+};
+
+export { compression };
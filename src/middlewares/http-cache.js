@@ -0,0 +1,53 @@
+import config from 'config';
+import _ from 'lodash';
+
+import { registerGauge } from 'utils/metrics';
+import { createResponseCache } from 'utils/response-cache';
+
+const { maxAgeSeconds = 0, maxEntries = 1000, ttlSeconds = {} } = config.has('httpCache')
+  ? config.get('httpCache')
+  : {};
+
+/** Server-side response caches keyed by resource name, for resources with a configured TTL */
+const responseCaches = _.mapValues(ttlSeconds, (ttl) => createResponseCache(maxEntries, ttl));
+
+_.forEach(responseCaches, (cache, resource) => {
+  registerGauge(`httpCache.${resource}.size`, () => cache.getStats().size);
+  registerGauge(`httpCache.${resource}.hits`, () => cache.getStats().hits);
+  registerGauge(`httpCache.${resource}.misses`, () => cache.getStats().misses);
+});
+
+/**
+ * Middleware that sets Cache-Control on successful responses of student resources, and serves them
+ * from a server-side response cache if one is configured for the resource. Strong ETags and 304
+ * responses to If-None-Match are handled by Express when the response is sent.
+ *
+ * @type {RequestHandler}
+ */
+const httpCache = (req, res, next) => {
+  if (req.method !== 'GET' || !req.params.osuId) {
+    return next();
+  }
+
+  const cache = responseCaches[_.last(req.path.split('/'))];
+  const cacheKey = req.originalUrl;
+  const cachedBody = cache ? cache.get(cacheKey) : undefined;
+  if (cachedBody) {
+    res.set('Cache-Control', `private, max-age=${maxAgeSeconds}`);
+    return res.json(cachedBody);
+  }
+
+  const { json } = res;
+  res.json = (body) => {
+    if (res.statusCode === 200) {
+      res.set('Cache-Control', `private, max-age=${maxAgeSeconds}`);
+      if (cache) {
+        cache.set(cacheKey, body);
+      }
+    }
+    return json.call(res, body);
+  };
+  return next();
+};
+
+export { httpCache };
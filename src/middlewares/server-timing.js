@@ -0,0 +1,45 @@
+import _ from 'lodash';
+
+import { observe } from 'utils/metrics';
+import { createTimer, formatServerTiming } from 'utils/server-timing';
+
+/**
+ * Middleware that times the phases of a request. Handlers pass res.locals.timer to the DAO, and the
+ * durations are sent in the Server-Timing header and recorded in histograms of the metrics
+ * endpoint once the response headers are written.
+ *
+ * @type {RequestHandler}
+ */
+const serverTiming = (req, res, next) => {
+  const timer = createTimer();
+  res.locals.timer = timer;
+
+  const { writeHead } = res;
+  res.writeHead = (...args) => {
+    const durations = timer.getDurations();
+    const operation = req.operationDoc ? req.operationDoc.operationId : 'unknownOperation';
+    res.setHeader('Server-Timing', formatServerTiming(durations));
+    _.forEach(durations, (duration, phase) => {
+      observe(`serverTiming.${operation}.${phase}`, duration);
+    });
+    return writeHead.apply(res, args);
+  };
+  next();
+};
+
+/**
+ * Time a middleware as a phase of the request, e.g. authentication
+ *
+ * @param {string} phase Name of the phase
+ * @param {RequestHandler} middleware Middleware to time
+ * @returns {RequestHandler} Middleware that records the phase before calling the next one
+ */
+const timeMiddleware = (phase, middleware) => (req, res, next) => {
+  const stop = res.locals.timer.start(phase);
+  middleware(req, res, (...args) => {
+    stop();
+    next(...args);
+  });
+};
+
+export { serverTiming, timeMiddleware };
@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import requests
+
+
+class OAuth2TokenProvider:
+    """Provider of OAuth2 client credentials tokens which caches the token
+    with its expiry and refreshes it before it expires
+
+    :param token_api_url: URL of the OAuth2 token API
+    :param client_id: client ID of the application
+    :param client_secret: client secret of the application
+    :param cache_path: path to a JSON file to cache tokens across runs, or
+                       None to only cache in memory (default: None)
+    :param refresh_margin: seconds before expiry at which the token is
+                           refreshed (default: 60)
+    """
+
+    def __init__(self, token_api_url, client_id, client_secret,
+                 cache_path=None, refresh_margin=60):
+        self.token_api_url = token_api_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.cache_key = f'{client_id}@{token_api_url}'
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0
+
+        if cache_path:
+            self._token, self._expires_at = self._read_cache()
+
+    def get_token(self):
+        """Get a token which is valid for at least refresh_margin seconds.
+        Concurrent callers share a single refresh"""
+
+        with self._lock:
+            if time.time() >= self._expires_at - self.refresh_margin:
+                self._refresh()
+            return self._token
+
+    def invalidate(self, token):
+        """Invalidate a token rejected by the API, unless it has already
+        been replaced"""
+
+        with self._lock:
+            if self._token == token:
+                self._expires_at = 0
+
+    def _refresh(self):
+        data = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'client_credentials'
+        }
+        try:
+            res = requests.post(url=self.token_api_url, data=data)
+            content = res.json()
+            self._token = content['access_token']
+        except KeyError:
+            sys.exit('Error: invalid OAuth2 credentials')
+        self._expires_at = time.time() + int(content.get('expires_in', 3600))
+        logging.debug('Fetched a new OAuth2 token')
+
+        if self.cache_path:
+            self._write_cache()
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path) as cache_file:
+                entry = json.load(cache_file)[self.cache_key]
+            return entry['access_token'], entry['expires_at']
+        except (OSError, ValueError, KeyError):
+            return None, 0
+
+    def _write_cache(self):
+        try:
+            with open(self.cache_path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.cache_key] = {
+            'access_token': self._token,
+            'expires_at': self._expires_at
+        }
+
+        # Write to a private temporary file first so that concurrent runs
+        # never read a partially written cache
+        temporary_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        file_descriptor = os.open(temporary_path,
+                                  os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                  0o600)
+        # The mode of open only applies to new files, so a temporary file
+        # left over by a crashed run is restricted as well
+        os.chmod(temporary_path, 0o600)
+        with os.fdopen(file_descriptor, 'w') as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(temporary_path, self.cache_path)
+
+
+class OAuth2BearerAuth(requests.auth.AuthBase):
+    """Requests authentication handler which sets the bearer token of a
+    token provider on every request, and refreshes the token and retries
+    once if the API rejects it"""
+
+    def __init__(self, token_provider):
+        self.token_provider = token_provider
+
+    def __call__(self, request):
+        token = self.token_provider.get_token()
+        request.headers['Authorization'] = f'Bearer {token}'
+        request.register_hook('response', self.handle_unauthorized)
+        return request
+
+    def handle_unauthorized(self, response, **kwargs):
+        """Response hook which retries a request rejected with 401 once with
+        a refreshed token"""
+
+        request = response.request
+        if response.status_code != 401 or getattr(request, 'retried', False):
+            return response
+
+        rejected_token = request.headers['Authorization'][len('Bearer '):]
+        self.token_provider.invalidate(rejected_token)
+
+        # Consume the content so the connection can be released
+        response.content
+        response.close()
+        retry = request.copy()
+        retry.retried = True
+        retry.headers['Authorization'] = (
+            f'Bearer {self.token_provider.get_token()}'
+        )
+        retry_response = response.connection.send(retry, **kwargs)
+        retry_response.history.append(response)
+        retry_response.request = retry
+        return retry_response
@@ -0,0 +1,253 @@
+import datetime
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import time
+
+import utils
+
+
+def get_benchmark_endpoints(benchmark_config, mode='benchmark'):
+    """Get the endpoints listed in the benchmark section of the configuration
+    file, which maps each endpoint template to the OSU ID it is requested
+    with, e.g. /students/{osuId}/grades to 123456789
+
+    :param benchmark_config: the 'benchmark' section of the configuration
+    :param mode: name of the mode which requests the endpoints, for the error
+                 message if none are listed (default: 'benchmark')
+    :returns: A dictionary of endpoints keyed by endpoint template
+    """
+
+    endpoints = {
+        template: template.replace('{osuId}', osu_id)
+        for template, osu_id in benchmark_config.get('endpoints', {}).items()
+    }
+    if not endpoints:
+        sys.exit(f'Error: {mode} mode needs the endpoints to request under '
+                 f'benchmark.endpoints in the configuration file')
+    return endpoints
+
+
+def mann_whitney_u(sample, baseline):
+    """One-sided Mann-Whitney U test of whether the values of a sample tend
+    to be larger than the values of a baseline, using the tie-corrected
+    normal approximation
+
+    :returns: The p-value of the test
+    """
+
+    n1, n2 = len(sample), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, True) for value in sample]
+                      + [(value, False) for value in baseline])
+
+    # Assign average ranks to tied values
+    sample_rank_sum = 0
+    tie_sum = 0
+    index = 0
+    while index < len(combined):
+        tie_end = index
+        while (
+            tie_end + 1 < len(combined)
+            and combined[tie_end + 1][0] == combined[index][0]
+        ):
+            tie_end += 1
+        ties = tie_end - index + 1
+        average_rank = (index + tie_end) / 2 + 1
+        sample_rank_sum += average_rank * sum(
+            1 for _, in_sample in combined[index:tie_end + 1] if in_sample
+        )
+        tie_sum += ties ** 3 - ties
+        index = tie_end + 1
+
+    n = n1 + n2
+    u = sample_rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def run_benchmark(session, base_url, endpoints, iterations):
+    """Request every endpoint repeatedly, interleaving the endpoints so that
+    drift of the server affects all of them equally
+
+    :returns: A dictionary of latencies, response sizes and the durations of
+              each phase reported by the server keyed by endpoint template.
+              Only responses with status code 200 are measured
+    """
+
+    results = {
+        template: {'latencies': [], 'sizes': [], 'phases': {}}
+        for template in endpoints
+    }
+    # Warm up connections and server side caches before measuring
+    for endpoint in endpoints.values():
+        session.get(f'{base_url}{endpoint}').close()
+
+    for _ in range(iterations):
+        for template, endpoint in endpoints.items():
+            start = time.perf_counter()
+            response = session.get(f'{base_url}{endpoint}')
+            size = len(response.content)
+            latency = time.perf_counter() - start
+            # Errors are usually much faster or slower than real responses,
+            # so they would skew the latency distribution
+            if response.status_code != 200:
+                logging.warning(f'{endpoint} returned {response.status_code}')
+                continue
+            results[template]['latencies'].append(latency)
+            results[template]['sizes'].append(size)
+            server_timing = utils.parse_server_timing(
+                response.headers.get('Server-Timing')
+            )
+            for phase, seconds in server_timing.items():
+                results[template]['phases'].setdefault(phase, []).append(
+                    seconds
+                )
+    return results
+
+
+def get_slowest_phase(phases, baseline_phases):
+    """Find the phase reported by the server whose median duration grew the
+    most compared to the baseline, which a latency regression is attributed
+    to
+
+    :returns: A tuple of the phase and the growth of its median duration in
+              seconds, or (None, None) if no phase is in both runs
+    """
+
+    growths = {
+        phase: (statistics.median(durations)
+                - statistics.median(baseline_phases[phase]))
+        for phase, durations in phases.items()
+        if phase != 'total' and durations and baseline_phases.get(phase)
+    }
+    if not growths:
+        return None, None
+    phase = max(growths, key=growths.get)
+    return phase, growths[phase]
+
+
+def compare_results(results, baseline, significance, regression_ratio):
+    """Compare benchmark results against a baseline
+
+    :param results: results of the current run
+    :param baseline: results of the baseline run
+    :param significance: p-value below which a slowdown is significant
+    :param regression_ratio: minimum ratio of current to baseline median
+                             latency to flag as a regression
+    :returns: A tuple of per-endpoint comparison rows and a list of the
+              rows of endpoints which regressed
+    """
+
+    rows = []
+    regressions = []
+    for template, current in sorted(results.items()):
+        if template not in baseline:
+            logging.warning(f'{template} is not in the baseline')
+            continue
+        previous = baseline[template]
+        current_median = statistics.median(current['latencies'])
+        previous_median = statistics.median(previous['latencies'])
+        ratio = current_median / previous_median
+        p_value = mann_whitney_u(current['latencies'],
+                                 previous['latencies'])
+        size_ratio = (statistics.median(current['sizes'])
+                      / max(statistics.median(previous['sizes']), 1))
+        regressed = p_value < significance and ratio >= regression_ratio
+        phase, phase_growth = get_slowest_phase(current.get('phases', {}),
+                                                previous.get('phases', {}))
+        rows.append({
+            'endpoint': template,
+            'baseline_p50_seconds': previous_median,
+            'p50_seconds': current_median,
+            'ratio': ratio,
+            'p_value': p_value,
+            'size_ratio': size_ratio,
+            'phase': phase,
+            'phase_growth_seconds': phase_growth,
+            'regressed': regressed
+        })
+        if regressed:
+            regressions.append(rows[-1])
+    return rows, regressions
+
+
+def log_comparison(rows):
+    """Log a baseline comparison table"""
+
+    lines = [f"{'endpoint':<45} {'base p50':>9} {'p50':>9} {'ratio':>6} "
+             f"{'p-value':>8} {'size':>6}  slowest phase"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        lines.append(
+            f"{row['endpoint']:<45} {row['baseline_p50_seconds']:>9.4f} "
+            f"{row['p50_seconds']:>9.4f} {row['ratio']:>6.2f} "
+            f"{row['p_value']:>8.4f} {row['size_ratio']:>6.2f}  "
+            f"{format_phase(row):<20}{flag}")
+    logging.info('\n'.join(lines))
+
+
+# Format the phase a latency change is attributed to, e.g. 'query +12.3 ms'
+def format_phase(row):
+    if row['phase'] is None:
+        return '-'
+    return f"{row['phase']} {row['phase_growth_seconds'] * 1000:+.1f} ms"
+
+
+def run(test_case_class, arguments):
+    """Run the benchmark mode, then save the results as a new baseline or
+    compare them against an existing one
+
+    :returns: True if no endpoint regressed, otherwise False
+    """
+
+    if (
+        not arguments.save_baseline
+        and not os.path.exists(arguments.baseline_path)
+    ):
+        sys.exit(f'Error: baseline {arguments.baseline_path} does not exist, '
+                 f'run with --save-baseline to create it')
+
+    endpoints = get_benchmark_endpoints(test_case_class.benchmark_config)
+    results = run_benchmark(test_case_class.session,
+                            test_case_class.base_url,
+                            endpoints,
+                            arguments.iterations)
+    failed_templates = [template for template, result in results.items()
+                        if not result['latencies']]
+    for template in failed_templates:
+        logging.error(f'Benchmark failed: {template} never returned 200')
+    if failed_templates:
+        return False
+
+    if arguments.save_baseline:
+        with open(arguments.baseline_path, 'w') as baseline_file:
+            json.dump({
+                'created': datetime.datetime.now().isoformat(),
+                'base_url': test_case_class.base_url,
+                'iterations': arguments.iterations,
+                'endpoints': results
+            }, baseline_file, indent=2)
+        logging.info(f'Saved baseline to {arguments.baseline_path}')
+        return True
+
+    with open(arguments.baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    logging.info(f"Comparing against baseline from {baseline['created']}")
+    rows, regressions = compare_results(results,
+                                        baseline['endpoints'],
+                                        arguments.significance,
+                                        arguments.regression_ratio)
+    log_comparison(rows)
+    for row in regressions:
+        logging.error(f"Latency regression: {row['endpoint']} (slowest "
+                      f"phase: {format_phase(row)})")
+    return not regressions
@@ -0,0 +1,152 @@
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+
+import benchmark
+import load
+import utils
+
+
+# Upper bounds in bytes and labels of the response size buckets
+SIZE_BUCKETS = [
+    (1000, '<1KB'),
+    (10000, '1KB-10KB'),
+    (100000, '10KB-100KB'),
+    (1000000, '100KB-1MB'),
+    (10000000, '1MB-10MB')
+]
+
+
+def iter_osu_ids(corpus_path):
+    """Lazily read OSU IDs from a corpus file with one ID per line. Blank
+    lines and lines starting with # are skipped"""
+
+    with open(corpus_path) as corpus_file:
+        for line in corpus_file:
+            osu_id = line.strip()
+            if osu_id and not osu_id.startswith('#'):
+                yield osu_id
+
+
+def get_size_bucket(size):
+    """Get the bucket label of a response size in bytes"""
+
+    for upper_bound, label in SIZE_BUCKETS:
+        if size < upper_bound:
+            return label
+    return '>=10MB'
+
+
+class FanOutRecorder:
+    """Thread-safe collector of latencies grouped by endpoint and response
+    size bucket"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = collections.defaultdict(list)
+        self.sizes = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.students = 0
+
+    def record(self, endpoint, size, elapsed_seconds, succeeded):
+        key = (endpoint, get_size_bucket(size))
+        with self._lock:
+            self.latencies[key].append(elapsed_seconds)
+            self.sizes[key].append(size)
+            if not succeeded:
+                self.errors[key] += 1
+
+    def log_summary(self, wall_seconds):
+        """Log a latency table broken down by response size bucket"""
+
+        lines = [
+            f'Fan-out over {self.students} student(s) finished in '
+            f'{wall_seconds:.1f} second(s)',
+            f"{'endpoint':<40} {'size':>12} {'reqs':>6} {'errs':>5} "
+            f"{'avg KB':>8} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}"
+        ]
+        with self._lock:
+            for key in sorted(self.latencies,
+                              key=lambda key: (key[0],
+                                               min(self.sizes[key]))):
+                endpoint, bucket = key
+                samples = sorted(self.latencies[key])
+                average_kb = sum(self.sizes[key]) / len(samples) / 1000
+                lines.append(
+                    f'{endpoint:<40} {bucket:>12} {len(samples):>6} '
+                    f'{self.errors[key]:>5} {average_kb:>8.1f} '
+                    f'{load.percentile(samples, 50):>7.3f} '
+                    f'{load.percentile(samples, 90):>7.3f} '
+                    f'{load.percentile(samples, 99):>7.3f} '
+                    f'{samples[-1]:>7.3f}')
+        logging.info('\n'.join(lines))
+
+
+def run_fan_out(session_pool, base_url, osu_ids, endpoint_templates,
+                workers):
+    """Request every endpoint for every OSU ID with bounded concurrency.
+    At most twice as many requests as workers are queued at a time, so the
+    OSU IDs are only read as fast as they are requested
+
+    :returns: A tuple of the fan-out recorder and the wall clock duration
+    """
+
+    recorder = FanOutRecorder()
+    pending = threading.BoundedSemaphore(workers * 2)
+
+    def __request(template, osu_id):
+        start = time.perf_counter()
+        try:
+            endpoint = template.replace('{osuId}', osu_id)
+            with session_pool.acquire() as session:
+                start = time.perf_counter()
+                response = session.get(f'{base_url}{endpoint}')
+                size = len(response.content)
+            recorder.record(template, size, time.perf_counter() - start,
+                            response.status_code == 200)
+        except Exception as error:
+            logging.error(f'Request for {osu_id} failed: {error}')
+            recorder.record(template, 0, time.perf_counter() - start, False)
+        finally:
+            pending.release()
+
+    start = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        for osu_id in osu_ids:
+            recorder.students += 1
+            for template in endpoint_templates:
+                pending.acquire()
+                executor.submit(__request, template, osu_id)
+    return recorder, time.monotonic() - start
+
+
+def run(test_case_class, arguments):
+    """Run the fan-out mode over the OSU IDs of a corpus file
+
+    :returns: True if every request succeeded, otherwise False
+    """
+
+    endpoint_templates = list(benchmark.get_benchmark_endpoints(
+        test_case_class.benchmark_config, mode='fan-out'
+    ))
+    if arguments.fan_out_endpoints:
+        sub_endpoints = arguments.fan_out_endpoints.split(',')
+        endpoint_templates = [
+            template for template in endpoint_templates
+            if template.split('/')[-1] in sub_endpoints
+        ]
+
+    session_pool = utils.SessionPool(test_case_class.session,
+                                     arguments.workers)
+    recorder, wall_seconds = run_fan_out(
+        session_pool,
+        test_case_class.base_url,
+        iter_osu_ids(arguments.fan_out_path),
+        endpoint_templates,
+        arguments.workers
+    )
+    session_pool.close()
+    recorder.log_summary(wall_seconds)
+    return not sum(recorder.errors.values())
@@ -1,41 +1,171 @@
+import concurrent.futures
+import functools
 import json
 import logging
+import statistics
+import sys
+import threading
+import time
 import unittest
-import yaml
-
-from prance import ResolvingParser
 
+import benchmark
+import fan_out
+import load
+import parallel
+import replay
+import report
+import schema
+import soak
+import stand_in_server
+import stress
 import utils
 
 
+# Requests per term value when comparing term=current with an explicit term
+CURRENT_TERM_SAMPLES = 15
+
+# Maximum median latency that resolving term=current may add, in seconds
+CURRENT_TERM_MAX_OVERHEAD_SECONDS = 0.02
+
+# Maximum number of OSU IDs of a batch request
+BATCH_MAX_OSU_IDS = 50
+
+# Rounds of requests when comparing batched with single-ID retrieval
+BATCH_SAMPLES = 5
+
+# Page size when walking every page of a paginated endpoint
+PAGE_SIZE = 10
+
+# Maximum elapsed time of a single page, in seconds
+PAGE_MAX_ELAPSED_SECONDS = 2
+
+# Pairs of full and conditional requests whose median latencies are compared
+CONDITIONAL_SAMPLES = 5
+
+# Identical concurrent requests of a burst, each sent with its own session
+BURST_SIZE = 10
+
+# Phases which the API reports in the Server-Timing header of every response
+# read from the database
+SERVER_TIMING_PHASES = ['query', 'serialize', 'total']
+
+
+# Format the mean response sizes and latencies of sparse fieldsets as a table
+def format_sparse_fieldset_results(results):
+    lines = [f"{'endpoint':<45} {'fields':<30} {'count':>6} {'full':>9} "
+             f"{'sparse':>9} {'size':>7} {'latency':>10}"]
+    for (endpoint, fields), aggregate in results.items():
+        count, sums = aggregate['count'], aggregate['sum']
+        size_reduction = 1 - sums['sparse_size'] / sums['full_size']
+        latency_reduction = (sums['full_seconds']
+                             - sums['sparse_seconds']) / count * 1000
+        lines.append(f"{endpoint:<45} {fields:<30} {count:>6} "
+                     f"{sums['full_size'] / count:>9.0f} "
+                     f"{sums['sparse_size'] / count:>9.0f} "
+                     f"{-size_reduction:>7.1%} {-latency_reduction:>+7.1f} ms")
+    return '\n'.join(lines)
+
+
+# Format the largest compressed and uncompressed response sizes of each
+# endpoint and encoding with their size budgets as a table
+def format_payload_sizes(payload_sizes, size_budgets):
+    lines = [f"{'endpoint':<45} {'encoding':<9} {'count':>6} {'max wire':>9} "
+             f"{'max full':>9} {'ratio':>6} {'wire budget':>11} "
+             f"{'full budget':>11}"]
+    for (template, encoding), aggregate in payload_sizes.items():
+        sums, maximums = aggregate['sum'], aggregate['max']
+        ratio = (sums['compressed_size']
+                 / max(sums['uncompressed_size'], 1))
+        budget = size_budgets.get(template, {})
+        lines.append(
+            f"{template:<45} {encoding:<9} {aggregate['count']:>6} "
+            f"{maximums['compressed_size']:>9} "
+            f"{maximums['uncompressed_size']:>9} {ratio:>6.1%} "
+            f"{budget.get('max_compressed_bytes', '-'):>11} "
+            f"{budget.get('max_uncompressed_bytes', '-'):>11}"
+        )
+    return '\n'.join(lines)
+
+
 class IntegrationTests(utils.UtilsTestCase):
+    stand_in = None
+    # Response sizes and latencies of full and sparse fieldset responses
+    # keyed by endpoint template and fields
+    sparse_fieldset_results = utils.RunningAggregates()
+
     @classmethod
-    def setup(cls, config_path, openapi_path):
+    def setup(cls, config_path, openapi_path, stand_in_items=None,
+              stand_in_sizes=None, stand_in_pool=None,
+              stand_in_query_seconds=0, openapi_cache_path=None):
         with open(config_path) as config_file:
             config = json.load(config_file)
-            cls.base_url = utils.setup_base_url(config)
-            cls.session = utils.setup_session(config)
             cls.local_test = config['local_test']
 
             cls.test_cases = config['test_cases']
             cls.valid_terms = cls.test_cases['valid_terms']
             cls.invalid_terms = cls.test_cases['invalid_terms']
-
-        with open(openapi_path) as openapi_file:
-            openapi = yaml.load(openapi_file, Loader=yaml.SafeLoader)
-            if 'swagger' in openapi:
-                backend = 'flex'
-            elif 'openapi' in openapi:
-                backend = 'openapi-spec-validator'
-            else:
-                exit('Error: could not determine openapi document version')
-
-        parser = ResolvingParser(openapi_path, backend=backend)
-        cls.openapi = parser.specification
+            cls.batch_osu_ids = cls.test_cases.get(
+                'valid_batch_osu_ids',
+                sorted({osu_id for test_case, osu_id in cls.test_cases.items()
+                        if test_case.startswith('valid_')
+                        and isinstance(osu_id, str)})
+            )
+            cls.size_budgets = config.get('size_budgets', {})
+            cls.benchmark_config = config.get('benchmark', {})
+            cls.load_test_config = config.get('load_test', {})
+            cls.soak_test_config = config.get('soak_test', {})
+            cls.stress_test_config = config.get('stress_test', {})
+            cls.replay_config = config.get('replay', {})
+
+        cls.openapi, cls.resource_schemas = utils.load_openapi(
+            openapi_path, openapi_cache_path
+        )
+        cls.schema_compiler = schema.SchemaCompiler(cls.openapi)
+
+        if stand_in_items is None:
+            cls.base_url = utils.setup_base_url(config)
+            cls.session = utils.setup_session(config)
+        else:
+            basic_auth = config['auth']['basic_auth']
+            cls.stand_in = stand_in_server.StandInServer(
+                cls.openapi,
+                default_items=stand_in_items,
+                items=stand_in_sizes,
+                credentials=(basic_auth['username'], basic_auth['password']),
+                pool_size=stand_in_pool,
+                query_seconds=stand_in_query_seconds
+            )
+            cls.stand_in.start()
+            cls.base_url = cls.stand_in.base_url
+            cls.session = utils.setup_session({**config, 'local_test': True})
+            cls.local_test = True
 
     @classmethod
     def cleanup(cls):
+        if cls.sparse_fieldset_results:
+            logging.info(format_sparse_fieldset_results(
+                cls.sparse_fieldset_results
+            ))
+        if cls.payload_sizes:
+            logging.info(format_payload_sizes(cls.payload_sizes,
+                                              cls.size_budgets))
         cls.session.close()
+        if cls.stand_in:
+            cls.stand_in.stop()
+
+    @classmethod
+    # Helper function to get the URL of the admin metrics endpoint, or None
+    # if it is not configured
+    def get_metrics_url(cls):
+        if cls.stand_in:
+            return cls.stand_in.metrics_url
+        return cls.soak_test_config.get('metrics_url')
+
+    # Helper function to get a metric of the admin metrics endpoint
+    def get_metric(self, name):
+        response = self.session.get(self.get_metrics_url())
+        self.assertEqual(response.status_code, 200)
+        return response.json()['metrics'][name]
 
     @classmethod
     # Helper function to get testing endpoint
@@ -44,16 +174,155 @@ class IntegrationTests(utils.UtilsTestCase):
 
     # Helper function for testing term query
     def term_testing(self, endpoint, resource, nullable_fields=None):
+        sub_cases = []
         for valid_term in self.valid_terms:
             params = {'term': valid_term}
-            self.check_endpoint(endpoint, resource, 200,
-                                query_params=params,
-                                nullable_fields=nullable_fields)
+            sub_cases.append((params, functools.partial(
+                self.check_endpoint, endpoint, resource, 200,
+                query_params=params,
+                nullable_fields=nullable_fields
+            )))
 
         for invalid_term in self.invalid_terms:
             params = {'term': invalid_term}
-            self.check_endpoint(endpoint, 'ErrorObject', 400,
-                                query_params=params)
+            sub_cases.append((params, functools.partial(
+                self.check_endpoint, endpoint, 'ErrorObject', 400,
+                query_params=params
+            )))
+
+        self.run_sub_cases(sub_cases)
+
+    # Helper function for walking every page of an endpoint via links.next
+    # and comparing the pages with the unpaginated results
+    def page_testing(self, endpoint, resource, get_page_items,
+                     nullable_fields=None):
+        validator = self.get_validator(resource, nullable_fields)
+        response = self.make_request(endpoint, 200)
+        expected_items = get_page_items(self.check_schema(response, validator))
+
+        items = []
+        pages = 0
+        page_endpoint, params = endpoint, {'page[size]': PAGE_SIZE}
+        while page_endpoint:
+            response = self.make_request(
+                page_endpoint, 200, params=params,
+                max_elapsed_seconds=PAGE_MAX_ELAPSED_SECONDS
+            )
+            document = self.check_schema(response, validator)
+            self.check_url(document['links']['self'], endpoint, params)
+            page_items = get_page_items(document)
+            self.assertLessEqual(len(page_items), PAGE_SIZE)
+            items += page_items
+            pages += 1
+            self.assertLessEqual(pages, document['meta']['totalPages'])
+
+            next_link = document['links']['next']
+            page_endpoint, params = (self.get_link_request(next_link)
+                                     if next_link else (None, None))
+
+        self.assertEqual(items, expected_items)
+        self.assertEqual(document['meta']['totalResults'], len(items))
+        self.assertEqual(document['meta']['totalPages'], pages)
+
+    # Helper function for testing the batch variant of an endpoint
+    def batch_testing(self, sub_endpoint, resource, nullable_fields=None):
+        endpoint = f'/students/batch/{sub_endpoint}'
+        params = {'osuIds': ','.join(self.batch_osu_ids)}
+
+        validator = self.get_validator(resource, nullable_fields)
+        response = self.make_request(endpoint, 200, params=params)
+        document = self.check_schema(response, validator)
+        self.check_url(document['links']['self'], endpoint, params)
+        for resource_object in document['data']:
+            self.assertIn(resource_object['id'][:9], self.batch_osu_ids)
+
+    # Test case: GET /students/{osuId}
+    def test_get_student_by_id(self):
+        resource = 'StudentResource'
+        endpoint = f"/students/{self.test_cases['valid_student']}"
+        include = ['classification', 'gpa', 'holds', 'account-balance',
+                   'class-schedule']
+        nullable_fields = [
+            'email',
+            'beginTime',
+            'endTime',
+            'room',
+            'building',
+            'buildingDescription',
+            'repeatedCourseInd'
+        ]
+
+        validator = self.get_validator(resource)
+        for term in [None, *self.valid_terms]:
+            params = {'include': ','.join(include),
+                      **({'term': term} if term else {})}
+            with self.subTest(term=term):
+                response = self.make_request(endpoint, 200, params=params)
+                document = self.check_schema(response, validator,
+                                             nullable_fields)
+                self.check_url(document['links']['self'], endpoint, params)
+                if self.conditional_requests:
+                    self.check_conditional_request(endpoint, response,
+                                                   params)
+
+                # Every included resource is linked by a relationship of the
+                # student, and vice versa
+                relationships = document['data']['relationships']
+                self.assertCountEqual(relationships, include)
+                linked_resources = []
+                for name, relationship in relationships.items():
+                    related_endpoint, _ = self.get_link_request(
+                        relationship['links']['related']
+                    )
+                    self.assertEqual(related_endpoint, f'{endpoint}/{name}')
+                    data = relationship['data']
+                    linked_resources.extend(
+                        data if isinstance(data, list) else [data] if data
+                        else []
+                    )
+                self.assertCountEqual(linked_resources, document['included'])
+
+        for params in [{}, {'include': 'invalid'}]:
+            with self.subTest(**params):
+                self.check_endpoint(endpoint, 'ErrorObject', 400,
+                                    query_params=params)
+
+    # Helper function for testing sparse fieldsets of an endpoint, which
+    # also records how much smaller and faster the trimmed responses are
+    def fields_testing(self, endpoint, resource, nullable_fields=None):
+        schema = self.get_resource_schema(resource)
+        resource_type = schema['type']['enum'][0]
+        parameter = f'fields[{resource_type}]'
+        fieldsets = self.test_cases.get('sparse_fieldsets', {}).get(
+            resource_type,
+            [[next(iter(schema['attributes']['properties']))]]
+        )
+
+        full_response = self.make_request(endpoint, 200)
+        full_size = len(full_response.body.content)
+
+        def __check_fieldset(fields):
+            params = {parameter: ','.join(fields)}
+            validator = self.get_validator(resource, nullable_fields, fields)
+            response = self.make_request(endpoint, 200, params=params)
+            document = self.check_schema(response, validator)
+            self.check_url(document['links']['self'], endpoint, params)
+            self.sparse_fieldset_results.add(
+                (utils.get_endpoint_template(endpoint), params[parameter]),
+                full_size=full_size,
+                sparse_size=len(response.body.content),
+                full_seconds=full_response.elapsed.total_seconds(),
+                sparse_seconds=response.elapsed.total_seconds()
+            )
+
+        sub_cases = [({parameter: ','.join(fields)},
+                      functools.partial(__check_fieldset, fields))
+                     for fields in fieldsets]
+        sub_cases.append(({parameter: 'invalid'}, functools.partial(
+            self.check_endpoint, endpoint, 'ErrorObject', 400,
+            query_params={parameter: 'invalid'}
+        )))
+        self.run_sub_cases(sub_cases)
 
     # Test case: GET /students/{osuId}/account-balance
     def test_get_account_balance_by_id(self):
@@ -62,6 +331,8 @@ class IntegrationTests(utils.UtilsTestCase):
                                           'account-balance')
 
         self.check_endpoint(endpoint, resource, 200)
+        self.batch_testing('account-balance', resource)
+        self.fields_testing(endpoint, resource)
 
     # Test case: GET /students/{osuId}/account-transactions
     def test_get_account_transactions_by_id(self):
@@ -70,6 +341,12 @@ class IntegrationTests(utils.UtilsTestCase):
                                           'account-transactions')
 
         self.check_endpoint(endpoint, resource, 200)
+        self.batch_testing('account-transactions', resource)
+        self.fields_testing(endpoint, resource)
+        self.page_testing(
+            endpoint, resource,
+            lambda document: document['data']['attributes']['transactions']
+        )
 
     # Test case: GET /students/{osuId}/academic-status
     def test_get_academic_status_by_id(self):
@@ -81,6 +358,10 @@ class IntegrationTests(utils.UtilsTestCase):
         self.check_endpoint(endpoint, resource, 200,
                             nullable_fields=nullable_fields)
         self.term_testing(endpoint, resource, nullable_fields=nullable_fields)
+        self.batch_testing('academic-status', resource,
+                           nullable_fields=nullable_fields)
+        self.fields_testing(endpoint, resource,
+                            nullable_fields=nullable_fields)
 
     # Test case: GET /students/{osuId}/classification
     def test_get_classification_by_id(self):
@@ -89,6 +370,8 @@ class IntegrationTests(utils.UtilsTestCase):
                                           'classification')
 
         self.check_endpoint(endpoint, resource, 200)
+        self.batch_testing('classification', resource)
+        self.fields_testing(endpoint, resource)
 
     # Test case: GET /students/{osuId}/gpa
     def test_get_gpa_by_id(self):
@@ -97,6 +380,8 @@ class IntegrationTests(utils.UtilsTestCase):
                                           'gpa')
 
         self.check_endpoint(endpoint, resource, 200)
+        self.batch_testing('gpa', resource)
+        self.fields_testing(endpoint, resource)
 
     # Test case: GET /students/{osuId}/grades
     def test_get_grades_by_id(self):
@@ -113,6 +398,14 @@ class IntegrationTests(utils.UtilsTestCase):
         self.check_endpoint(endpoint, resource, 200,
                             nullable_fields=nullable_fields)
         self.term_testing(endpoint, resource, nullable_fields=nullable_fields)
+        self.batch_testing('grades', resource, nullable_fields=nullable_fields)
+        self.fields_testing(endpoint, resource,
+                            nullable_fields=nullable_fields)
+        self.page_testing(
+            endpoint, resource,
+            lambda document: [grade['id'] for grade in document['data']],
+            nullable_fields=nullable_fields
+        )
 
     # Test case: GET /students/{osuId}/class-schedule
     def test_get_class_schedule_by_id(self):
@@ -137,6 +430,10 @@ class IntegrationTests(utils.UtilsTestCase):
         self.check_endpoint(endpoint, resource, 200,
                             nullable_fields=nullable_fields)
         self.term_testing(endpoint, resource, nullable_fields=nullable_fields)
+        self.batch_testing('class-schedule', resource,
+                           nullable_fields=nullable_fields)
+        self.fields_testing(endpoint, resource,
+                            nullable_fields=nullable_fields)
 
     # Test case: GET /students/{osuId}/holds
     def test_get_holds_by_id(self):
@@ -145,6 +442,8 @@ class IntegrationTests(utils.UtilsTestCase):
                                           'holds')
 
         self.check_endpoint(endpoint, resource, 200)
+        self.batch_testing('holds', resource)
+        self.fields_testing(endpoint, resource)
 
     # Test case: GET /students/{osuId}/dual-enrollment
     def test_get_dual_enrollment_by_id(self):
@@ -154,6 +453,8 @@ class IntegrationTests(utils.UtilsTestCase):
 
         self.check_endpoint(endpoint, resource, 200)
         self.term_testing(endpoint, resource)
+        self.batch_testing('dual-enrollment', resource)
+        self.fields_testing(endpoint, resource)
 
     # Test case: GET /students/{osuId}/degrees
     def test_get_degrees_by_id(self):
@@ -170,6 +471,10 @@ class IntegrationTests(utils.UtilsTestCase):
         self.check_endpoint(endpoint, resource, 200,
                             nullable_fields=nullable_fields)
         self.term_testing(endpoint, resource, nullable_fields=nullable_fields)
+        self.batch_testing('degrees', resource,
+                           nullable_fields=nullable_fields)
+        self.fields_testing(endpoint, resource,
+                            nullable_fields=nullable_fields)
 
     # Test case: GET /students/{osuId}/emergency-contacts
     def test_get_emergency_contacts_by_id(self):
@@ -203,6 +508,165 @@ class IntegrationTests(utils.UtilsTestCase):
 
         self.check_endpoint(endpoint, resource, 200,
                             nullable_fields=nullable_fields)
+        self.batch_testing('emergency-contacts', resource,
+                           nullable_fields=nullable_fields)
+        self.fields_testing(endpoint, resource,
+                            nullable_fields=nullable_fields)
+
+    # Test case: term=current is as fast as an explicit term since the
+    # current term is cached by the API
+    def test_current_term_latency(self):
+        endpoint = self.get_test_endpoint('valid_class_schedule',
+                                          'class-schedule')
+        explicit_terms = [term for term in self.valid_terms
+                          if term.isdigit()]
+        if not explicit_terms:
+            self.skipTest('No explicit term in valid_terms')
+
+        latencies = {'current': [], explicit_terms[0]: []}
+        # The first round warms up the cache and is discarded
+        for sample in range(CURRENT_TERM_SAMPLES + 1):
+            for term, samples in latencies.items():
+                response = self.make_request(endpoint, 200,
+                                             params={'term': term})
+                response.body.content
+                if sample:
+                    samples.append(response.elapsed.total_seconds())
+
+        current_median = statistics.median(latencies['current'])
+        explicit_median = statistics.median(latencies[explicit_terms[0]])
+        logging.debug(f'Median latency of term=current: {current_median}, '
+                      f'term={explicit_terms[0]}: {explicit_median}')
+        self.assertLess(current_median - explicit_median,
+                        CURRENT_TERM_MAX_OVERHEAD_SECONDS)
+
+    # Test case: the duration of each phase of a request is reported in the
+    # Server-Timing header, and no phase takes longer than the whole request
+    def test_server_timing(self):
+        endpoint = self.get_test_endpoint('valid_gpa', 'gpa')
+        response = self.make_request(endpoint, 200)
+        response.body.content
+
+        timings = response.server_timing
+        logging.debug(f'Server timing of {endpoint}: {timings}')
+        for phase in SERVER_TIMING_PHASES:
+            self.assertIn(phase, timings)
+        for phase, seconds in timings.items():
+            self.assertLessEqual(seconds, timings['total'], phase)
+        self.assertLessEqual(timings['total'],
+                             response.elapsed.total_seconds())
+
+    # Test case: large responses are compressed if the client accepts gzip,
+    # and sent as they are otherwise
+    def test_compression(self):
+        endpoint = self.get_test_endpoint('valid_grades', 'grades')
+        response = self.make_request(endpoint, 200,
+                                     headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        content = response.body.content
+        self.assertLess(response.body.wire_size, len(content))
+
+        response = self.make_request(endpoint, 200,
+                                     headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        content = response.body.content
+        self.assertEqual(response.body.wire_size, len(content))
+
+    # Test case: a successful response can be revalidated with its ETag, and
+    # the 304 response is faster than requesting the resource again
+    def test_conditional_request(self):
+        endpoint = self.get_test_endpoint('valid_grades', 'grades')
+        full_seconds = []
+        conditional_seconds = []
+        for _ in range(CONDITIONAL_SAMPLES):
+            response = self.make_request(endpoint, 200)
+            response.body.content
+            full_seconds.append(response.elapsed.total_seconds())
+            conditional_response = self.check_conditional_request(endpoint,
+                                                                  response)
+            conditional_seconds.append(
+                conditional_response.elapsed.total_seconds()
+            )
+        saved_seconds = (statistics.median(full_seconds)
+                         - statistics.median(conditional_seconds))
+        logging.info(f'Conditional requests of {endpoint} answered with 304 '
+                     f'saved {saved_seconds * 1000:.1f} ms at the median')
+
+    # Test case: a burst of identical concurrent requests gets identical
+    # responses, and shares database queries instead of running one each.
+    # Only shared calls are counted, since the database executions of tests
+    # running at the same time would be counted as well
+    def test_request_coalescing(self):
+        endpoint = self.get_test_endpoint('valid_grades', 'grades')
+        params = {'term': self.valid_terms[0]}
+        metrics_url = self.get_metrics_url()
+        if metrics_url:
+            shared_calls_before = self.get_metric('coalescing.sharedCalls')
+
+        barrier = threading.Barrier(BURST_SIZE)
+        session_pool = utils.SessionPool(self.session, BURST_SIZE)
+
+        def __request(_):
+            with session_pool.acquire() as session:
+                barrier.wait()
+                response = self.make_request(endpoint, 200, params=params,
+                                             session=session)
+                return response.body.content
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(BURST_SIZE) as executor:
+                bodies = list(executor.map(__request, range(BURST_SIZE)))
+        finally:
+            session_pool.close()
+        self.assertEqual(len(set(bodies)), 1)
+
+        if not metrics_url:
+            self.skipTest('No metrics_url to count shared database queries')
+        shared_calls = self.get_metric('coalescing.sharedCalls') - (
+            shared_calls_before
+        )
+        logging.debug(f'{BURST_SIZE} identical requests shared '
+                      f'{shared_calls} database queries')
+        self.assertGreater(shared_calls, 0)
+
+    # Test case: GET /students/batch/{resource} with too many OSU IDs
+    def test_batch_size_limit(self):
+        endpoint = '/students/batch/gpa'
+        osu_ids = [f'{index:09d}' for index in range(BATCH_MAX_OSU_IDS + 1)]
+
+        self.check_endpoint(endpoint, 'ErrorObject', 400,
+                            query_params={'osuIds': ','.join(osu_ids)})
+
+    # Test case: a batch request is faster than requesting each student
+    def test_batch_throughput(self):
+        if len(self.batch_osu_ids) < 2:
+            self.skipTest('Less than two OSU IDs to batch')
+
+        single_seconds = []
+        batch_seconds = []
+        for sample in range(BATCH_SAMPLES):
+            elapsed_seconds = 0
+            for osu_id in self.batch_osu_ids:
+                response = self.make_request(f'/students/{osu_id}/gpa', 200)
+                response.body.content
+                elapsed_seconds += response.elapsed.total_seconds()
+            single_seconds.append(elapsed_seconds)
+
+            response = self.make_request(
+                '/students/batch/gpa', 200,
+                params={'osuIds': ','.join(self.batch_osu_ids)}
+            )
+            response.body.content
+            batch_seconds.append(response.elapsed.total_seconds())
+
+        single_median = statistics.median(single_seconds)
+        batch_median = statistics.median(batch_seconds)
+        students = len(self.batch_osu_ids)
+        logging.debug(f'Throughput of single-ID requests: '
+                      f'{students / single_median:.1f} students/s, '
+                      f'batch request: {students / batch_median:.1f} '
+                      f'students/s')
+        self.assertLess(batch_median, single_median)
 
 
 if __name__ == '__main__':
@@ -214,5 +678,66 @@ if __name__ == '__main__':
     else:
         logging.basicConfig(level=logging.INFO)
 
-    IntegrationTests.setup(arguments.config_path, arguments.openapi_path)
-    unittest.main(argv=argv)
+    stand_in_options = {}
+    if arguments.stand_in:
+        stand_in_options = {
+            'stand_in_items': arguments.stand_in_items,
+            'stand_in_sizes': stand_in_server.parse_sizes(
+                arguments.stand_in_sizes
+            ),
+            'stand_in_pool': arguments.stand_in_pool,
+            'stand_in_query_seconds': arguments.stand_in_query_seconds
+        }
+    IntegrationTests.setup(arguments.config_path, arguments.openapi_path,
+                           openapi_cache_path=arguments.openapi_cache_path,
+                           **stand_in_options)
+
+    IntegrationTests.conditional_requests = arguments.conditional_requests
+    if arguments.report_path:
+        IntegrationTests.reporter = report.RequestReporter(
+            arguments.report_path
+        )
+
+    start = time.perf_counter()
+    if arguments.load:
+        passed = load.run(IntegrationTests, arguments,
+                          IntegrationTests.load_test_config)
+    elif arguments.benchmark:
+        passed = benchmark.run(IntegrationTests, arguments)
+    elif arguments.fan_out_path:
+        passed = fan_out.run(IntegrationTests, arguments)
+    elif arguments.soak:
+        metrics_url = IntegrationTests.get_metrics_url()
+        if not metrics_url:
+            sys.exit('Error: the soak test needs soak_test.metrics_url in the '
+                     'configuration file, or --stand-in')
+        passed = soak.run(IntegrationTests, arguments,
+                          IntegrationTests.soak_test_config, metrics_url)
+    elif arguments.stress:
+        metrics_url = IntegrationTests.get_metrics_url()
+        passed = stress.run(IntegrationTests, arguments,
+                            IntegrationTests.stress_test_config, metrics_url)
+    elif arguments.replay_path:
+        passed = replay.run(IntegrationTests, arguments,
+                            IntegrationTests.replay_config)
+    else:
+        IntegrationTests.sub_case_workers = arguments.parallel_sub_cases
+        utils.resize_connection_pool(
+            IntegrationTests.session,
+            arguments.parallel * arguments.parallel_sub_cases
+        )
+        program = unittest.main(
+            argv=argv,
+            exit=False,
+            testRunner=parallel.get_runner_class(arguments.parallel)
+        )
+        passed = program.result.wasSuccessful()
+        if arguments.junit_path:
+            report.write_junit_xml(arguments.junit_path, program.result,
+                                   IntegrationTests.test_durations)
+    logging.info(f'Run took {time.perf_counter() - start:.3f} second(s)')
+    if IntegrationTests.reporter:
+        IntegrationTests.reporter.close()
+
+    IntegrationTests.cleanup()
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,219 @@
+import collections
+import concurrent.futures
+import itertools
+import logging
+import math
+import threading
+import time
+import unittest
+
+import utils
+
+
+# Statistics checked by thresholds whose name differs from the statistic,
+# e.g. max_error_rate limits error_rate. Other thresholds are named after
+# the statistic they limit, e.g. p99_seconds
+THRESHOLD_STATS = {
+    'max_error_rate': 'error_rate',
+    'min_throughput': 'throughput'
+}
+
+
+def percentile(sorted_samples, percent):
+    """Get the nearest-rank percentile of an ascending list of samples"""
+
+    if not sorted_samples:
+        return None
+    rank = math.ceil(percent / 100 * len(sorted_samples))
+    return sorted_samples[max(rank, 1) - 1]
+
+
+class LatencyRecorder:
+    """Thread-safe collector of request latencies grouped by endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.failed_tests = collections.Counter()
+
+    @property
+    def total_requests(self):
+        with self._lock:
+            return sum(len(samples) for samples in self.latencies.values())
+
+    def record(self, endpoint, elapsed_seconds, succeeded):
+        """Record the latency of a single request
+
+        :param endpoint: endpoint template, e.g. /students/{osuId}/gpa
+        :param elapsed_seconds: elapsed time of the request
+        :param succeeded: whether the expected status code was returned
+        """
+
+        with self._lock:
+            self.latencies[endpoint].append(elapsed_seconds)
+            if not succeeded:
+                self.errors[endpoint] += 1
+
+    def record_test(self, test_name, result):
+        """Record the outcome of a single test method run"""
+
+        if not result.wasSuccessful():
+            with self._lock:
+                self.failed_tests[test_name] += 1
+
+    def summarize(self, wall_seconds):
+        """Summarize the recorded latencies
+
+        :param wall_seconds: wall clock duration of the whole run
+        :returns: A dictionary of endpoint statistics keyed by endpoint
+        """
+
+        summary = {}
+        with self._lock:
+            for endpoint, samples in sorted(self.latencies.items()):
+                samples = sorted(samples)
+                summary[endpoint] = {
+                    'requests': len(samples),
+                    'errors': self.errors[endpoint],
+                    'error_rate': self.errors[endpoint] / len(samples),
+                    'throughput': len(samples) / wall_seconds,
+                    'p50_seconds': percentile(samples, 50),
+                    'p90_seconds': percentile(samples, 90),
+                    'p99_seconds': percentile(samples, 99),
+                    'max_seconds': samples[-1]
+                }
+        return summary
+
+
+def log_summary(summary, wall_seconds, label='Load test'):
+    """Log a latency summary table
+
+    :param summary: endpoint statistics returned by LatencyRecorder.summarize
+    :param wall_seconds: wall clock duration of the run
+    :param label: name of the run in the first line, e.g. 'Soak test'
+                  (default: 'Load test')
+    """
+
+    header = (f"{'endpoint':<45} {'reqs':>6} {'errs':>5} {'req/s':>7} "
+              f"{'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}")
+    lines = [f'{label} finished in {wall_seconds:.1f} second(s)', header]
+    for endpoint, stats in summary.items():
+        lines.append(
+            f"{endpoint:<45} {stats['requests']:>6} {stats['errors']:>5} "
+            f"{stats['throughput']:>7.2f} {stats['p50_seconds']:>7.3f} "
+            f"{stats['p90_seconds']:>7.3f} {stats['p99_seconds']:>7.3f} "
+            f"{stats['max_seconds']:>7.3f}")
+    logging.info('\n'.join(lines))
+
+
+def check_thresholds(summary, load_test_config):
+    """Compare a latency summary against the thresholds from the
+    configuration file
+
+    :param summary: endpoint statistics returned by LatencyRecorder.summarize
+    :param load_test_config: the 'load_test' section of the configuration
+    :returns: A list of human-readable threshold breaches
+    """
+
+    default_thresholds = load_test_config.get('thresholds', {})
+    endpoint_thresholds = load_test_config.get('endpoint_thresholds', {})
+    breaches = []
+
+    for endpoint, stats in summary.items():
+        thresholds = {
+            **default_thresholds,
+            **endpoint_thresholds.get(endpoint, {})
+        }
+        for name, limit in thresholds.items():
+            stat = THRESHOLD_STATS.get(name, name)
+            if stat not in stats:
+                logging.warning(f"Unknown load test threshold '{name}'")
+                continue
+
+            if name.startswith('min_'):
+                breached = stats[stat] < limit
+            else:
+                breached = stats[stat] > limit
+            if breached:
+                breaches.append(f'{endpoint}: {stat} = {stats[stat]:.3f}, '
+                                f'threshold {name} = {limit}')
+    return breaches
+
+
+def run_load_test(test_case_class, workers, duration=None,
+                  request_count=None):
+    """Run every test method of a test case class from a pool of concurrent
+    workers until the duration has passed or the request count is reached
+
+    :param test_case_class: UtilsTestCase subclass that has been set up
+    :param workers: number of concurrent workers
+    :param duration: seconds to sustain the load (default: None)
+    :param request_count: minimum number of requests to send (default: None)
+    :returns: A tuple of the latency recorder and the wall clock duration
+    """
+
+    test_names = unittest.TestLoader().getTestCaseNames(test_case_class)
+    schedule = itertools.cycle(test_names)
+    schedule_lock = threading.Lock()
+    recorder = LatencyRecorder()
+
+    test_case_class.recorder = recorder
+    utils.resize_connection_pool(test_case_class.session, workers)
+
+    start = time.monotonic()
+
+    def __next_test_name():
+        if duration is not None and time.monotonic() - start >= duration:
+            return None
+        if (
+            request_count is not None
+            and recorder.total_requests >= request_count
+        ):
+            return None
+        with schedule_lock:
+            return next(schedule)
+
+    def __worker():
+        test_name = __next_test_name()
+        while test_name is not None:
+            result = unittest.TestResult()
+            test_case_class(test_name).run(result)
+            recorder.record_test(test_name, result)
+            test_name = __next_test_name()
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(__worker) for _ in range(workers)]
+        for future in futures:
+            future.result()
+
+    test_case_class.recorder = None
+    return recorder, time.monotonic() - start
+
+
+def run(test_case_class, arguments, load_test_config):
+    """Run the load test mode and check the configured thresholds
+
+    :returns: True if no threshold was breached, otherwise False
+    """
+
+    duration = arguments.duration
+    if duration is None and arguments.request_count is None:
+        duration = 60
+
+    recorder, wall_seconds = run_load_test(
+        test_case_class,
+        arguments.workers,
+        duration=duration,
+        request_count=arguments.request_count
+    )
+    summary = recorder.summarize(wall_seconds)
+    log_summary(summary, wall_seconds)
+
+    for test_name, failures in recorder.failed_tests.items():
+        logging.warning(f'{test_name} failed {failures} time(s)')
+
+    breaches = check_thresholds(summary, load_test_config)
+    for breach in breaches:
+        logging.error(f'Threshold breached: {breach}')
+    return not breaches
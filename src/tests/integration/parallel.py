@@ -0,0 +1,79 @@
+import concurrent.futures
+import unittest
+
+
+class BufferedTestResult(unittest.TestResult):
+    """TestResult which records the outcome of a test so that it can be
+    replayed into another result later on"""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def replay(self, result):
+        """Report the recorded outcome to another result"""
+
+        for method_name, args in self.events:
+            getattr(result, method_name)(*args)
+
+    def _record(method_name):
+        def record(self, *args):
+            self.events.append((method_name, args))
+        return record
+
+    startTest = _record('startTest')
+    stopTest = _record('stopTest')
+    addSuccess = _record('addSuccess')
+    addFailure = _record('addFailure')
+    addError = _record('addError')
+    addSkip = _record('addSkip')
+    addSubTest = _record('addSubTest')
+    addExpectedFailure = _record('addExpectedFailure')
+    addUnexpectedSuccess = _record('addUnexpectedSuccess')
+    del _record
+
+
+# Flatten nested test suites into a list of test cases
+def flatten_suite(suite):
+    if isinstance(suite, unittest.TestSuite):
+        return [test for child in suite for test in flatten_suite(child)]
+    return [suite]
+
+
+class ParallelTestSuite(unittest.TestSuite):
+    """TestSuite which runs its test cases concurrently and reports them in
+    their original order"""
+
+    def __init__(self, tests=(), workers=1):
+        super().__init__(tests)
+        self.workers = workers
+
+    def run(self, result, debug=False):
+        def __run_buffered(test):
+            buffered_result = BufferedTestResult()
+            test(buffered_result)
+            return buffered_result
+
+        tests = flatten_suite(self)
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as executor:
+            futures = [executor.submit(__run_buffered, test) for test in tests]
+            for future in futures:
+                future.result().replay(result)
+                if result.shouldStop:
+                    break
+        return result
+
+
+class ParallelTextTestRunner(unittest.TextTestRunner):
+    """TextTestRunner which runs test cases from a pool of workers"""
+
+    workers = 1
+
+    def run(self, test):
+        return super().run(ParallelTestSuite([test], workers=self.workers))
+
+
+# Create a ParallelTextTestRunner class with a given number of workers
+def get_runner_class(workers):
+    return type('ParallelTextTestRunner', (ParallelTextTestRunner,),
+                {'workers': workers})
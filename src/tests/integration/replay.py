@@ -0,0 +1,249 @@
+import collections
+import concurrent.futures
+import datetime
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+import urllib.parse
+
+import load
+import streaming
+import utils
+
+
+def iter_log(log_path):
+    """Lazily read the entries of a JSONL access log. Blank lines are skipped
+    and lines which are not valid JSON are skipped with a warning"""
+
+    with open(log_path) as log_file:
+        for line_number, line in enumerate(log_file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.decoder.JSONDecodeError as error:
+                logging.warning(f'Skipping line {line_number} of {log_path}: '
+                                f'{error}')
+
+
+# Get the seconds since the epoch of a numeric or ISO 8601 timestamp
+def parse_timestamp(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.datetime.fromisoformat(
+        timestamp.replace('Z', '+00:00')
+    ).timestamp()
+
+
+class EndpointMatcher:
+    """Match request paths against the path templates of an OpenAPI
+    specification"""
+
+    def __init__(self, openapi):
+        self.openapi = openapi
+        self._patterns = []
+        # Static segments are preferred over parameters, so that e.g.
+        # /students/batch/grades is not matched as /students/{osuId}/grades
+        for template in sorted(self.openapi['paths'], key=lambda template: [
+            segment.startswith('{') for segment in template.split('/')
+        ]):
+            pattern = re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', template)
+            self._patterns.append((re.compile(f'^{pattern}$'), template))
+
+    def match(self, path):
+        """Match a request path
+
+        :param path: path of the request relative to the base URL
+        :returns: A tuple of the path template and the path parameters, or
+                  (None, None) if no template matches
+        """
+
+        for pattern, template in self._patterns:
+            match = pattern.match(path)
+            if match:
+                return template, match.groupdict()
+        return None, None
+
+    def get_resource_type(self, template, path_params):
+        """Get the type of the primary data of a successful response
+
+        :returns: The resource type, or None if it cannot be determined
+        """
+
+        responses = self.openapi['paths'][template]['get']['responses']
+        data = responses['200']['schema']['properties']['data']
+        type_enum = data.get('items', data)['properties']['type'].get('enum')
+        if type_enum:
+            return type_enum[0]
+
+        # Batch endpoints serve the resources of the endpoint named by their
+        # resource parameter
+        resource = path_params.get('resource')
+        sub_templates = [sub_template for sub_template in self.openapi['paths']
+                         if sub_template.endswith(f'/{resource}')]
+        if resource and sub_templates:
+            return self.get_resource_type(sub_templates[0], {})
+        return None
+
+
+class ReplayRecorder(load.LatencyRecorder):
+    """Thread-safe collector of request latencies and schema violations
+    grouped by endpoint"""
+
+    def __init__(self):
+        super().__init__()
+        self.violations = collections.Counter()
+        self.first_violations = {}
+        self.skipped = collections.Counter()
+
+    def record_violation(self, endpoint, message):
+        with self._lock:
+            self.violations[endpoint] += 1
+            self.first_violations.setdefault(endpoint, message)
+
+    def log_violations(self):
+        """Log the number of schema violations and the first one of each
+        endpoint"""
+
+        for endpoint, count in sorted(self.violations.items()):
+            logging.error(f'{endpoint}: {count} schema violation(s), first: '
+                          f'{self.first_violations[endpoint]}')
+        for reason, count in sorted(self.skipped.items()):
+            logging.warning(f'Skipped {count} log entries: {reason}')
+
+
+def run_replay(test_case, entries, workers, timing='asap', speed=1,
+               nullable_fields=None):
+    """Replay the GET requests of access log entries with bounded
+    concurrency, and check the schema of every response. At most twice as
+    many requests as workers are queued at a time, so the log is only read as
+    fast as it is replayed
+
+    :param test_case: UtilsTestCase instance whose session and schema are
+                      used
+    :param entries: iterable of log entries with a method, path, params and
+                    timestamp
+    :param workers: number of concurrent workers
+    :param timing: 'asap' to send each request as soon as a worker is free,
+                   or 'original' to keep the intervals between the
+                   timestamps of the log (default: 'asap')
+    :param speed: factor by which the original intervals are shortened
+                  (default: 1)
+    :param nullable_fields: fields which are allowed to be null
+                            (default: None)
+    :returns: A tuple of the replay recorder, the wall clock duration and the
+              maximum seconds a request was sent behind its original time
+    """
+
+    base_url = test_case.base_url
+    base_path = urllib.parse.urlparse(base_url).path.rstrip('/')
+    matcher = EndpointMatcher(test_case.openapi)
+    error_validator = test_case.get_validator('ErrorObject')
+    session_pool = utils.SessionPool(test_case.session, workers)
+    recorder = ReplayRecorder()
+    pending = threading.BoundedSemaphore(workers * 2)
+
+    def __validate(response, template, path_params):
+        if response.status_code == 200 and template:
+            resource_type = matcher.get_resource_type(template, path_params)
+            validator = test_case.schema_compiler.get_type_validator(
+                resource_type, nullable_fields
+            )
+        elif response.status_code >= 400:
+            validator = error_validator
+        else:
+            response.body.content
+            return
+        test_case.check_schema(response, validator, nullable_fields)
+
+    def __request(path, params):
+        template, path_params = matcher.match(path)
+        endpoint = template or utils.get_endpoint_template(path)
+        start = time.perf_counter()
+        try:
+            with session_pool.acquire() as session:
+                response = session.get(f'{base_url}{path}', params=params,
+                                       stream=True)
+                response.body = streaming.ResponseBody(response)
+                try:
+                    __validate(response, template, path_params)
+                except AssertionError as error:
+                    recorder.record_violation(
+                        endpoint,
+                        f'{path}: {str(error).splitlines()[0]}'
+                    )
+            recorder.record(endpoint, response.elapsed.total_seconds(),
+                            response.status_code < 500)
+        except Exception as error:
+            logging.error(f'Request to {path} failed: {error}')
+            recorder.record(endpoint, time.perf_counter() - start, False)
+        finally:
+            pending.release()
+
+    start = time.monotonic()
+    first_timestamp = None
+    max_lag_seconds = 0
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        for entry in entries:
+            if entry.get('method', 'GET').upper() != 'GET':
+                recorder.skipped['not a GET request'] += 1
+                continue
+            path = entry.get('path', '')
+            if base_path and path.startswith(f'{base_path}/'):
+                path = path[len(base_path):]
+
+            if timing == 'original':
+                try:
+                    timestamp = parse_timestamp(entry['timestamp'])
+                except (KeyError, TypeError, ValueError):
+                    recorder.skipped['missing or invalid timestamp'] += 1
+                    continue
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                send_time = start + (timestamp - first_timestamp) / speed
+                time.sleep(max(send_time - time.monotonic(), 0))
+
+            pending.acquire()
+            if timing == 'original':
+                # Requests are delayed rather than queued without bound if
+                # the server cannot keep up, which shows up as lag
+                max_lag_seconds = max(max_lag_seconds,
+                                      time.monotonic() - send_time)
+            executor.submit(__request, path, entry.get('params'))
+
+    session_pool.close()
+    return recorder, time.monotonic() - start, max_lag_seconds
+
+
+def run(test_case_class, arguments, replay_config):
+    """Run the replay mode over the entries of an access log
+
+    :param replay_config: the 'replay' section of the configuration
+    :returns: True if every response matched the OpenAPI specification and
+              none was a server error, otherwise False
+    """
+
+    entries = iter_log(arguments.replay_path)
+    if arguments.request_count is not None:
+        entries = itertools.islice(entries, arguments.request_count)
+
+    recorder, wall_seconds, max_lag_seconds = run_replay(
+        test_case_class(),
+        entries,
+        arguments.workers,
+        timing=arguments.replay_timing,
+        speed=arguments.replay_speed,
+        nullable_fields=replay_config.get('nullable_fields')
+    )
+    load.log_summary(recorder.summarize(wall_seconds), wall_seconds,
+                     label='Replay')
+    if arguments.replay_timing == 'original':
+        logging.info(f'Requests were sent up to {max_lag_seconds:.3f} '
+                     f'second(s) behind their original time')
+    recorder.log_violations()
+    return not (sum(recorder.errors.values())
+                or sum(recorder.violations.values()))
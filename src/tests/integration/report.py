@@ -0,0 +1,166 @@
+import collections
+import csv
+import json
+import logging
+import os
+import threading
+import xml.etree.ElementTree as ElementTree
+
+import load
+
+
+# Fields of a request record, in the column order of CSV reports
+FIELDS = [
+    'timestamp',
+    'test',
+    'method',
+    'endpoint',
+    'path',
+    'params',
+    'status',
+    'expected_status',
+    'latency_seconds',
+    'wire_bytes',
+    'bytes',
+    'validation_seconds'
+]
+
+
+# Get the path of the summary file written next to a report
+def get_summary_path(report_path):
+    return f'{os.path.splitext(report_path)[0]}-summary.json'
+
+
+class RequestReporter:
+    """Thread-safe writer of one record per request to a JSONL report, or to
+    a CSV report if the path ends with .csv. Records are flushed as they are
+    written, so the report of an interrupted run is still usable, and are
+    aggregated into a summary when the reporter is closed
+
+    :param report_path: path to the report file
+    """
+
+    def __init__(self, report_path):
+        self.report_path = report_path
+        self._lock = threading.Lock()
+        self._file = open(report_path, 'w', newline='')
+        self._csv_writer = None
+        if report_path.endswith('.csv'):
+            self._csv_writer = csv.DictWriter(self._file, FIELDS)
+            self._csv_writer.writeheader()
+        self.latencies = collections.defaultdict(list)
+        self.sizes = collections.defaultdict(list)
+        self.validation_times = collections.defaultdict(list)
+        self.errors = collections.Counter()
+
+    def record(self, record):
+        """Write a request record and add it to the summary
+
+        :param record: dictionary of the FIELDS of a request
+        """
+
+        with self._lock:
+            if self._csv_writer:
+                self._csv_writer.writerow({
+                    **record, 'params': json.dumps(record['params'])
+                })
+            else:
+                self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+            endpoint = record['endpoint']
+            self.latencies[endpoint].append(record['latency_seconds'])
+            self.sizes[endpoint].append(record['bytes'])
+            if record['validation_seconds'] is not None:
+                self.validation_times[endpoint].append(
+                    record['validation_seconds']
+                )
+            if record['status'] != record['expected_status']:
+                self.errors[endpoint] += 1
+
+    def summarize(self):
+        """Aggregate the records written so far
+
+        :returns: A dictionary of endpoint statistics keyed by endpoint
+        """
+
+        summary = {}
+        with self._lock:
+            for endpoint, samples in sorted(self.latencies.items()):
+                samples = sorted(samples)
+                validation_times = sorted(self.validation_times[endpoint])
+                summary[endpoint] = {
+                    'requests': len(samples),
+                    'errors': self.errors[endpoint],
+                    'p50_seconds': load.percentile(samples, 50),
+                    'p90_seconds': load.percentile(samples, 90),
+                    'p99_seconds': load.percentile(samples, 99),
+                    'max_seconds': samples[-1],
+                    'mean_bytes': (sum(self.sizes[endpoint])
+                                   / len(samples)),
+                    'max_bytes': max(self.sizes[endpoint]),
+                    'p50_validation_seconds': load.percentile(
+                        validation_times, 50
+                    ),
+                    'p99_validation_seconds': load.percentile(
+                        validation_times, 99
+                    )
+                }
+        return summary
+
+    def close(self):
+        """Close the report and write the summary next to it"""
+
+        self._file.close()
+        summary_path = get_summary_path(self.report_path)
+        with open(summary_path, 'w') as summary_file:
+            json.dump(self.summarize(), summary_file, indent=2)
+        logging.info(f'Wrote the request report to {self.report_path} and '
+                     f'its summary to {summary_path}')
+
+
+def write_junit_xml(junit_path, result, durations):
+    """Export the outcome and duration of every test method as JUnit XML.
+    Failures of sub-tests are reported as failures of their test method
+
+    :param junit_path: path to the XML file
+    :param result: unittest.TestResult of the run
+    :param durations: seconds taken by each test method keyed by test ID
+    """
+
+    outcomes = collections.defaultdict(list)
+    for tag, tests in [('failure', result.failures),
+                       ('error', result.errors),
+                       ('skipped', result.skipped)]:
+        for test, details in tests:
+            test = getattr(test, 'test_case', test)
+            outcomes[test.id()].append((tag, details))
+
+    test_ids = sorted(set(durations) | set(outcomes))
+    counts = collections.Counter(outcomes[test_id][0][0]
+                                 for test_id in test_ids if outcomes[test_id])
+    test_suite = ElementTree.Element(
+        'testsuite',
+        name='integration_test',
+        tests=str(len(test_ids)),
+        failures=str(counts['failure']),
+        errors=str(counts['error']),
+        skipped=str(counts['skipped']),
+        time=f'{sum(durations.values()):.3f}'
+    )
+    for test_id in test_ids:
+        class_name, _, name = test_id.rpartition('.')
+        test_case = ElementTree.SubElement(
+            test_suite,
+            'testcase',
+            classname=class_name,
+            name=name,
+            time=f'{durations.get(test_id, 0):.3f}'
+        )
+        for tag, details in outcomes[test_id]:
+            message = details.splitlines()[-1] if details else ''
+            ElementTree.SubElement(test_case, tag,
+                                   message=message).text = details
+    ElementTree.ElementTree(test_suite).write(junit_path, encoding='utf-8',
+                                              xml_declaration=True)
+    logging.info(f'Wrote the JUnit XML report to {junit_path}')
@@ -0,0 +1,328 @@
+import logging
+import re
+import threading
+
+import validators
+
+
+# Mapping of OpenAPI data types and python data types
+TYPES_DICT = {
+    'string': str,
+    'integer': int,
+    'int32': int,
+    'int64': int,
+    'float': (float, int),
+    'double': (float, int),
+    'number': (float, int),
+    'boolean': bool,
+    'array': list,
+    'object': dict
+}
+
+
+class CompiledAttribute:
+    """An OpenAPI attribute with its type, pattern and nested item schema
+    resolved ahead of validation"""
+
+    __slots__ = ['expected_type', 'pattern', 'formatting', 'nullable',
+                 'item_attributes']
+
+    def __init__(self, expected_type, pattern, formatting, nullable,
+                 item_attributes):
+        self.expected_type = expected_type
+        self.pattern = pattern
+        self.formatting = formatting
+        self.nullable = nullable
+        self.item_attributes = item_attributes
+
+    def validate(self, field, actual_value):
+        """Validate an actual value of the attribute"""
+
+        # Check item schema if attribute is an array
+        if self.item_attributes is not None:
+            for actual_item in actual_value or []:
+                validate_attributes(actual_item, self.item_attributes)
+
+        if (actual_value and self.expected_type) or not self.nullable:
+            if self.expected_type is None:
+                return
+            if not isinstance(actual_value, self.expected_type):
+                raise AssertionError(
+                    f"{actual_value!r} is not an instance of "
+                    f"{self.expected_type!r} in field '{field}'")
+
+            # Pattern validation overrides any format validaton
+            if self.pattern is not None:
+                if not self.pattern.search(actual_value):
+                    raise AssertionError(
+                        f"Regex didn't match: '{self.pattern.pattern}' not "
+                        f"found in {actual_value!r} in field '{field}'")
+            elif self.formatting in ['uri', 'url']:
+                if not validators.url(actual_value):
+                    raise AssertionError(
+                        f"{actual_value!r} is not a valid URL in field "
+                        f"'{field}'")
+            elif self.formatting == 'email':
+                if not validators.email(actual_value):
+                    raise AssertionError(
+                        f"{actual_value!r} is not a valid email in field "
+                        f"'{field}'")
+
+
+def validate_attributes(actual_attributes, expected_attributes):
+    """Check through all actual attributes against compiled attributes"""
+
+    if not isinstance(actual_attributes, dict):
+        raise AssertionError(f'{actual_attributes!r} is not an object')
+
+    for field, actual_value in actual_attributes.items():
+        if field not in expected_attributes:
+            raise AssertionError(f"Unexpected field '{field}'")
+        expected_attributes[field].validate(field, actual_value)
+
+
+def get_sparse_attributes(attributes, fields):
+    """Get the attribute definitions of a sparse fieldset like the API does.
+    An array attribute of objects is also kept if any attributes of its items
+    are requested, and its items are trimmed to them
+
+    :param attributes: attribute definitions of a resource
+    :param fields: requested attribute names
+    :returns: The attribute definitions of the sparse fieldset
+    """
+
+    sparse_attributes = {}
+    for field, attribute in attributes.items():
+        item_attributes = attribute.get('items', {}).get('properties', {})
+        if field in fields:
+            sparse_attributes[field] = attribute
+        elif item_attributes.keys() & set(fields):
+            sparse_attributes[field] = {
+                **attribute,
+                'items': {
+                    **attribute['items'],
+                    'properties': {
+                        item_field: item_attribute
+                        for item_field, item_attribute
+                        in item_attributes.items()
+                        if item_field in fields
+                    }
+                }
+            }
+    return sparse_attributes
+
+
+class ResourceValidator:
+    """Reusable validator of a resource or error object definition"""
+
+    def __init__(self, resource_type, attributes, required_fields=None):
+        self.resource_type = resource_type
+        self.attributes = attributes
+        self.required_fields = required_fields or set()
+
+    def validate_resource(self, resource):
+        """Validate a single resource object"""
+
+        if resource['type'] != self.resource_type:
+            raise AssertionError(f"Resource type '{resource['type']}' != "
+                                 f"'{self.resource_type}'")
+        # Resources without attributes, e.g. the primary data of a compound
+        # document, only have a type and relationships
+        if self.attributes or 'attributes' in resource:
+            validate_attributes(resource['attributes'], self.attributes)
+            missing_fields = (self.required_fields
+                              - resource['attributes'].keys())
+            if missing_fields:
+                raise AssertionError(
+                    f'Missing field(s) {sorted(missing_fields)}')
+
+    def validate_error(self, error):
+        """Validate a single error object"""
+
+        validate_attributes(error, self.attributes)
+
+    def validate_document(self, content, status_code):
+        """Validate a JSON:API document against the resource definition
+
+        :param content: parsed JSON content of the response
+        :param status_code: HTTP status code of the response
+        """
+
+        try:
+            if status_code == 200:
+                resource_data = content['data']
+                if isinstance(resource_data, list):
+                    for resource in resource_data:
+                        self.validate_resource(resource)
+                else:
+                    self.validate_resource(resource_data)
+            elif status_code >= 400:
+                errors_data = content['errors']
+                if not isinstance(errors_data, list):
+                    raise AssertionError(f'{errors_data!r} is not a list')
+                for error in errors_data:
+                    self.validate_error(error)
+        except KeyError as error:
+            raise AssertionError(f'Missing key {error}')
+
+
+class SchemaCompiler:
+    """Compile resource definitions of a resolved OpenAPI specification into
+    memoized validators"""
+
+    def __init__(self, openapi):
+        self.openapi = openapi
+        self._validators = {}
+        self._patterns = {}
+        self._reference_types = {}
+        self._resource_types = None
+        self._lock = threading.Lock()
+
+    def get_validator(self, resource, nullable_fields=None, fields=None):
+        """Get the validator of a resource definition, compiling it the first
+        time it is requested
+
+        :param resource: name of the resource definition
+        :param nullable_fields: fields which are allowed to be null
+                                (default: None)
+        :param fields: requested fields of a sparse fieldset, which are the
+                       only fields allowed and must all be present
+                       (default: None)
+        :returns: A ResourceValidator object
+        """
+
+        nullable_fields = frozenset(nullable_fields or [])
+        fields = None if fields is None else frozenset(fields)
+        key = (resource, nullable_fields, fields)
+        with self._lock:
+            if key not in self._validators:
+                self._validators[key] = self._compile(resource,
+                                                      nullable_fields,
+                                                      fields)
+            return self._validators[key]
+
+    def get_type_validator(self, resource_type, nullable_fields=None):
+        """Get the validator of the resource definition of a resource type,
+        e.g. of an included resource of a compound document
+
+        :param resource_type: type of the resource, e.g. 'gpa'
+        :param nullable_fields: fields which are allowed to be null
+                                (default: None)
+        :returns: A ResourceValidator object
+        """
+
+        with self._lock:
+            if self._resource_types is None:
+                # Resources without attributes, e.g. the primary data of a
+                # compound document, are typed too
+                self._resource_types = {
+                    definition['properties']['type']['enum'][0]: resource
+                    for resource, definition
+                    in self.openapi['definitions'].items()
+                    if 'enum' in definition.get('properties', {}).get(
+                        'type', {}
+                    )
+                }
+        if resource_type not in self._resource_types:
+            raise AssertionError(f"Unknown resource type '{resource_type}'")
+        return self.get_validator(self._resource_types[resource_type],
+                                  nullable_fields)
+
+    def _compile(self, resource, nullable_fields, fields=None):
+        schema = self.openapi['definitions'][resource]['properties']
+        if 'enum' in schema.get('type', {}):
+            resource_type = schema['type']['enum'][0]
+            expected_attributes = schema.get('attributes',
+                                             {}).get('properties', {})
+        else:
+            # Error objects are validated against the definition itself
+            resource_type = None
+            expected_attributes = schema
+
+        required_fields = None
+        if fields is not None:
+            expected_attributes = get_sparse_attributes(expected_attributes,
+                                                        fields)
+            required_fields = set(expected_attributes)
+
+        attributes = self._compile_attributes(expected_attributes,
+                                              nullable_fields)
+        return ResourceValidator(resource_type, attributes, required_fields)
+
+    def _compile_attributes(self, expected_attributes, nullable_fields):
+        compiled_attributes = {}
+        for field, expected_attribute in expected_attributes.items():
+            expected_type = self._get_attribute_type(expected_attribute)
+
+            item_attributes = None
+            if (
+                expected_type is list
+                and 'properties' in expected_attribute['items']
+            ):
+                item_attributes = self._compile_attributes(
+                    expected_attribute['items']['properties'],
+                    nullable_fields
+                )
+
+            pattern = expected_attribute.get('pattern')
+            compiled_attributes[field] = CompiledAttribute(
+                expected_type,
+                None if pattern is None else self._compile_pattern(pattern),
+                expected_attribute.get('format'),
+                field in nullable_fields,
+                item_attributes
+            )
+        return compiled_attributes
+
+    def _compile_pattern(self, pattern):
+        if pattern not in self._patterns:
+            self._patterns[pattern] = re.compile(pattern)
+        return self._patterns[pattern]
+
+    def _get_attribute_type(self, attribute):
+        """Map between OpenAPI data types and python data types"""
+
+        openapi_type = None
+        if 'properties' in attribute:
+            return dict
+        if 'format' in attribute and attribute['format'] in TYPES_DICT:
+            openapi_type = attribute['format']
+        elif 'type' in attribute:
+            openapi_type = attribute['type']
+        elif '$ref' in attribute:
+            openapi_type = self._get_reference_type(attribute['$ref'])
+
+        if not openapi_type:
+            logging.warning('OpenAPI property contains no type or properties')
+            return None
+        return TYPES_DICT[openapi_type]
+
+    def _get_reference_type(self, object_path):
+        """Get type of referenced object, following nested references"""
+
+        if object_path in self._reference_types:
+            return self._reference_types[object_path]
+
+        visited_paths = [object_path]
+        reference_type = None
+        while reference_type is None:
+            keys = re.search('#/(.*)', visited_paths[-1]).group(1).split('/')
+            reference = self.openapi
+            for key in keys:
+                reference = reference[key]
+
+            if 'format' in reference and reference['format'] in TYPES_DICT:
+                reference_type = reference['format']
+            elif 'type' in reference:
+                reference_type = reference['type']
+            elif (
+                '$ref' in reference
+                and reference['$ref'] not in visited_paths
+            ):
+                # Avoid infinite recursion
+                visited_paths.append(reference['$ref'])
+            else:
+                break
+
+        self._reference_types[object_path] = reference_type
+        return reference_type
@@ -0,0 +1,208 @@
+import concurrent.futures
+import itertools
+import logging
+import statistics
+import threading
+import time
+
+import benchmark
+import load
+import utils
+
+
+def linear_trend(xs, ys):
+    """Fit a least squares line through points
+
+    :returns: A tuple of the slope and the coefficient of determination
+    """
+
+    mean_x = statistics.mean(xs)
+    mean_y = statistics.mean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    if not sxx:
+        return 0, 0
+    slope = sxy / sxx
+    r_squared = sxy ** 2 / (sxx * syy) if syy else 0
+    return slope, r_squared
+
+
+class MetricsSampler(threading.Thread):
+    """Thread which periodically samples the metrics endpoint of the server
+    together with the number of requests sent so far"""
+
+    def __init__(self, session, metrics_url, interval, recorder):
+        super().__init__(daemon=True)
+        self.session = session
+        self.metrics_url = metrics_url
+        self.interval = interval
+        self.recorder = recorder
+        self.samples = []
+        self.stopped = threading.Event()
+        self.start_time = time.monotonic()
+
+    def sample(self):
+        elapsed_seconds = time.monotonic() - self.start_time
+        requests_sent = self.recorder.total_requests
+        try:
+            response = self.session.get(self.metrics_url)
+            metrics = response.json()['metrics']
+        except Exception as error:
+            logging.warning(f'Could not sample {self.metrics_url}: {error}')
+            return
+
+        rate = None
+        if self.samples:
+            previous = self.samples[-1]
+            rate = ((requests_sent - previous['requests'])
+                    / (elapsed_seconds - previous['elapsed_seconds']))
+        self.samples.append({
+            'elapsed_seconds': elapsed_seconds,
+            'requests': requests_sent,
+            'rate': rate,
+            'metrics': metrics
+        })
+        logging.info(
+            f'[{elapsed_seconds / 60:.1f} min] '
+            + (f'rate = {rate:.2f} req/s, ' if rate is not None else '')
+            + ', '.join(f'{name} = {value}'
+                        for name, value in sorted(metrics.items())))
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+def check_trends(samples, soak_test_config, warm_up_seconds):
+    """Check that no metric keeps growing while the request rate stays
+    constant
+
+    :param samples: samples taken by MetricsSampler
+    :param soak_test_config: the 'soak_test' section of the configuration
+    :param warm_up_seconds: samples taken before this time are ignored
+    :returns: A list of human-readable failures
+    """
+
+    samples = [sample for sample in samples
+               if sample['elapsed_seconds'] >= warm_up_seconds]
+    if len(samples) < 3:
+        return ['Not enough metric samples to compute trends']
+
+    failures = []
+    rates = [sample['rate'] for sample in samples[1:]]
+    mean_rate = statistics.mean(rates)
+    max_rate_variation = soak_test_config.get('max_rate_variation', 0.1)
+    if not mean_rate:
+        failures.append('Request rate was not sustained: no requests were '
+                        'completed after the warm-up')
+    else:
+        rate_variation = statistics.pstdev(rates) / mean_rate
+        if rate_variation > max_rate_variation:
+            failures.append(f'Request rate was not sustained: variation '
+                            f'{rate_variation:.2f} > {max_rate_variation}')
+
+    min_r_squared = soak_test_config.get('min_r_squared', 0.5)
+    lines = [f"{'metric':<30} {'first':>14} {'last':>14} {'per hour':>14} "
+             f"{'r2':>5} {'limit':>12}"]
+    hours = [sample['elapsed_seconds'] / 3600 for sample in samples]
+    for name, limit in sorted(
+        soak_test_config.get('max_growth_per_hour', {}).items()
+    ):
+        values = [sample['metrics'].get(name) for sample in samples]
+        if None in values:
+            logging.warning(f"Metric '{name}' is not reported by the server")
+            continue
+        slope, r_squared = linear_trend(hours, values)
+        lines.append(f'{name:<30} {values[0]:>14} {values[-1]:>14} '
+                     f'{slope:>14.1f} {r_squared:>5.2f} {limit:>12}')
+
+        # A steep slope only counts as growth if the line explains the
+        # samples, not if it is caused by a few spikes
+        if slope > limit and r_squared >= min_r_squared:
+            failures.append(f'{name} keeps growing: {slope:.1f} per hour > '
+                            f'{limit} (r2 = {r_squared:.2f})')
+    logging.info('\n'.join(lines))
+    return failures
+
+
+def run_soak(test_case_class, rate, duration, sample_interval, metrics_url,
+             workers):
+    """Sustain a constant request rate over every endpoint of the test cases
+    while sampling the metrics endpoint of the server
+
+    :returns: A tuple of the latency recorder, the metric samples and the
+              wall clock duration
+    """
+
+    session = test_case_class.session
+    base_url = test_case_class.base_url
+    endpoints = itertools.cycle(benchmark.get_benchmark_endpoints(
+        test_case_class.benchmark_config, mode='soak'
+    ).items())
+    recorder = load.LatencyRecorder()
+    pending = threading.BoundedSemaphore(workers * 2)
+
+    def __request(template, endpoint):
+        start = time.perf_counter()
+        try:
+            response = session.get(f'{base_url}{endpoint}')
+            response.content
+            recorder.record(template, response.elapsed.total_seconds(),
+                            response.status_code == 200)
+        except Exception as error:
+            logging.error(f'Request to {endpoint} failed: {error}')
+            recorder.record(template, time.perf_counter() - start, False)
+        finally:
+            pending.release()
+
+    utils.resize_connection_pool(session, workers)
+    sampler = MetricsSampler(session, metrics_url, sample_interval, recorder)
+    sampler.start()
+
+    start = time.monotonic()
+    next_send = start
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        while next_send - start < duration:
+            time.sleep(max(next_send - time.monotonic(), 0))
+            # Requests are delayed rather than queued without bound if the
+            # server cannot keep up, which shows up as a lower rate
+            pending.acquire()
+            executor.submit(__request, *next(endpoints))
+            next_send += 1 / rate
+
+    sampler.stop()
+    return recorder, sampler.samples, time.monotonic() - start
+
+
+def run(test_case_class, arguments, soak_test_config, metrics_url):
+    """Run the soak mode and check the trends of the server metrics
+
+    :returns: True if the rate was sustained and no metric kept growing,
+              otherwise False
+    """
+
+    duration = 3600 if arguments.duration is None else arguments.duration
+    recorder, samples, wall_seconds = run_soak(
+        test_case_class,
+        arguments.rate,
+        duration,
+        arguments.sample_interval,
+        metrics_url,
+        arguments.workers
+    )
+    load.log_summary(recorder.summarize(wall_seconds), wall_seconds,
+                     label='Soak test')
+
+    warm_up_seconds = soak_test_config.get('warm_up_seconds',
+                                           arguments.sample_interval)
+    failures = check_trends(samples, soak_test_config, warm_up_seconds)
+    for failure in failures:
+        logging.error(f'Soak test failed: {failure}')
+    return not failures
@@ -0,0 +1,784 @@
+import argparse
+import base64
+import contextlib
+import datetime
+import functools
+import gzip
+import hashlib
+import http.server
+import json
+import logging
+import math
+import re
+import threading
+import time
+import urllib.parse
+
+import schema
+import utils
+
+
+# Number of items generated for arrays nested inside other arrays
+NESTED_ITEMS = 2
+
+# Page size used if only a page number is requested
+DEFAULT_PAGE_SIZE = 25
+
+
+# Smallest body which is compressed, like the API's default threshold
+COMPRESSION_THRESHOLD_BYTES = 1024
+
+
+# Seconds after which a request rejected by a saturated pool should be
+# retried, like the API's default retryAfterSeconds
+RETRY_AFTER_SECONDS = 1
+
+
+# Paths of single-student resources, which clients may cache
+CACHEABLE_PATH = re.compile(r'/students/(?!batch/)[^/?]+(?:[/?]|$)')
+
+
+# Build a JSON:API error document in the same shape as the API's errors
+def error_document(status, title, detail):
+    code = f'1{status}'
+    return {
+        'errors': [{
+            'status': str(status),
+            'title': title,
+            'code': code,
+            'detail': detail,
+            'links': {
+                'about': ('https://developer.oregonstate.edu/documentation/'
+                          f'error-reference#{code}')
+            }
+        }]
+    }
+
+
+class Route:
+    """A GET operation of the OpenAPI specification served by the stand-in
+    server"""
+
+    def __init__(self, path, operation):
+        self.path = path
+        self.name = path.rstrip('/').split('/')[-1]
+        self.regex = re.compile(
+            '^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', path) + '$'
+        )
+        self.parameters = operation.get('parameters', [])
+        self.schema = operation['responses']['200']['schema']['properties']
+
+    def validate_parameters(self, path_params, query):
+        """Validate path and query parameters like the API does
+
+        :returns: An error document and status code, or None if all
+                  parameters are valid
+        """
+
+        for parameter in self.parameters:
+            name = parameter['name']
+            if parameter['in'] == 'path':
+                pattern = parameter.get('pattern')
+                enum = parameter.get('enum')
+                if (
+                    (pattern and not re.search(pattern, path_params[name]))
+                    or (enum and path_params[name] not in enum)
+                ):
+                    return 404, error_document(
+                        404, 'Not found',
+                        f"'{name}' in path should match pattern "
+                        f"\"{pattern}\"")
+            elif parameter['in'] == 'query' and name not in query:
+                if parameter.get('required'):
+                    return 400, error_document(
+                        400, 'Bad Request',
+                        f"Missing required query parameter '{name}'")
+            elif parameter['in'] == 'query':
+                if parameter.get('type') == 'array':
+                    values = query[name].split(',')
+                    enum = parameter.get('items', {}).get('enum')
+                    pattern = parameter.get('items', {}).get('pattern')
+                    if len(values) > parameter.get('maxItems', len(values)):
+                        return 400, error_document(
+                            400, 'Bad Request',
+                            f"Query parameter '{name}' should have at most "
+                            f"{parameter['maxItems']} items")
+                elif parameter.get('type') == 'integer':
+                    if not re.search(r'^\d+$', query[name]) or not (
+                        parameter.get('minimum', 0)
+                        <= int(query[name])
+                        <= parameter.get('maximum', math.inf)
+                    ):
+                        return 400, error_document(
+                            400, 'Bad Request',
+                            f"Invalid value '{query[name]}' of query "
+                            f"parameter '{name}'")
+                    continue
+                else:
+                    values = [query[name]]
+                    enum = parameter.get('enum')
+                    pattern = parameter.get('pattern')
+                for value in values:
+                    if (
+                        (pattern and not re.search(pattern, value))
+                        or (enum and value not in enum)
+                    ):
+                        return 400, error_document(
+                            400, 'Bad Request',
+                            f"Invalid value '{value}' of query parameter "
+                            f"'{name}'")
+        return None
+
+
+class PoolSaturatedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Pool of simulated database connections with a bounded wait queue,
+    which rejects requests like the API's Oracle connection pool
+
+    :param size: number of connections
+    :param queue_max: requests waiting beyond this are rejected at once
+    :param queue_timeout: seconds a request waits before it is rejected
+    """
+
+    def __init__(self, size, queue_max, queue_timeout):
+        self.size = size
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.queue_length = 0
+        self.connections_in_use = 0
+        self.rejected_count = 0
+        self.timed_out_count = 0
+        self._connections = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Hold a connection, raising PoolSaturatedError if the queue is
+        full or no connection is released within queue_timeout"""
+
+        with self._lock:
+            if self.queue_length >= self.queue_max:
+                self.rejected_count += 1
+                raise PoolSaturatedError()
+            self.queue_length += 1
+        acquired = self._connections.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.queue_length -= 1
+            if not acquired:
+                self.timed_out_count += 1
+                raise PoolSaturatedError()
+            self.connections_in_use += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.connections_in_use -= 1
+            self._connections.release()
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'oracledb.connectionsOpen': self.size,
+                'oracledb.connectionsInUse': self.connections_in_use,
+                'oracledb.queueLength': self.queue_length,
+                'oracledb.rejectedCount': self.rejected_count,
+                'oracledb.timedOutCount': self.timed_out_count
+            }
+
+
+class SingleFlight:
+    """Group of calls in which identical concurrent calls share a single
+    execution and its result, like the request coalescing of the API"""
+
+    def __init__(self):
+        self.executions = 0
+        self.shared_calls = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, function):
+        """Call a function, or wait for the call in flight with the same
+        key and share its result or exception"""
+
+        with self._lock:
+            call = self._pending.get(key)
+            leader = call is None
+            if leader:
+                call = self._pending[key] = {'done': threading.Event()}
+                self.executions += 1
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            call['done'].wait()
+            if 'error' in call:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = function()
+            return call['result']
+        except Exception as error:
+            call['error'] = error
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            call['done'].set()
+
+
+class StandInServer:
+    """In-process HTTP server that serves every path of an OpenAPI
+    specification with synthetic JSON:API payloads
+
+    :param openapi: resolved OpenAPI specification
+    :param default_items: number of items generated for list resources and
+                          array attributes (default: 25)
+    :param items: number of items keyed by resource name, e.g.
+                  {'grades': 500} (default: None)
+    :param credentials: basic auth username and password tuple required by
+                        the server, or None to accept any request
+                        (default: None)
+    :param host: host to bind (default: 127.0.0.1)
+    :param port: port to bind, 0 picks a free port (default: 0)
+    :param pool_size: number of simulated database connections, with a
+                      queue of four times as many requests and a timeout of
+                      5 seconds like the API's defaults, or None for no limit
+                      (default: None)
+    :param query_seconds: seconds each request holds a simulated database
+                          connection (default: 0)
+    """
+
+    def __init__(self, openapi, default_items=25, items=None,
+                 credentials=None, host='127.0.0.1', port=0, pool_size=None,
+                 query_seconds=0):
+        self.openapi = openapi
+        self.default_items = default_items
+        self.items = items or {}
+        self.base_path = openapi.get('basePath', '')
+        # Static path segments are matched before path parameters, e.g.
+        # /students/batch/gpa is not a GPA of a student with ID 'batch'
+        self.routes = sorted(
+            (
+                Route(path, operations['get'])
+                for path, operations in openapi['paths'].items()
+                if 'get' in operations
+            ),
+            key=lambda route: [segment.startswith('{')
+                               for segment in route.path.split('/')]
+        )
+        # Attribute definitions keyed by resource type, for sparse fieldsets
+        self.attribute_definitions = {
+            definition['properties']['type']['enum'][0]:
+                definition['properties']['attributes']['properties']
+            for definition in openapi['definitions'].values()
+            if 'attributes' in definition.get('properties', {})
+            and 'enum' in definition['properties']['type']
+        }
+        self.authorization = None
+        if credentials:
+            token = base64.b64encode(':'.join(credentials).encode()).decode()
+            self.authorization = f'Basic {token}'
+
+        self.pool = (ConnectionPool(pool_size, pool_size * 4, 5)
+                     if pool_size else None)
+        self.query_seconds = query_seconds
+        self.execute_count = 0
+        self.flight = SingleFlight()
+        self.request_count = 0
+        self.server_seconds = 0
+        self._stats_lock = threading.Lock()
+        self._httpd = http.server.ThreadingHTTPServer(
+            (host, port),
+            self._handler_class()
+        )
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self._start_time = time.time()
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/api{self.base_path}'
+
+    @property
+    def metrics_url(self):
+        return f'{self.base_url}/metrics'
+
+    def start(self):
+        """Serve requests from a background thread"""
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        logging.info(f'Stand-in server listening on {self.base_url}')
+
+    def stop(self):
+        """Stop serving requests and log the time spent in the server"""
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        logging.info(f'Stand-in server handled {self.request_count} '
+                     f'request(s) in {self.server_seconds:.3f} second(s)')
+
+    def handle(self, method, raw_path, headers):
+        """Handle a request
+
+        :returns: A tuple of status code and JSON document
+        """
+
+        if self.authorization and (
+            headers.get('Authorization') != self.authorization
+        ):
+            return 401, error_document(401, 'Unauthorized',
+                                       'Credentials are invalid')
+
+        url = urllib.parse.urlsplit(raw_path)
+        prefix = f'/api{self.base_path}'
+        path = url.path[len(prefix):] if url.path.startswith(prefix) else None
+        query = dict(urllib.parse.parse_qsl(url.query,
+                                            keep_blank_values=True))
+
+        if path == '/metrics' and method == 'GET':
+            return 200, self._metrics_document()
+
+        for route in self.routes:
+            match = route.regex.match(path or '')
+            if match and method == 'GET':
+                path_params = match.groupdict()
+                error = route.validate_parameters(path_params, query)
+                if error:
+                    return error
+                # Identical concurrent requests share a single query and
+                # document
+                key = (path, url.query, headers.get('Host'))
+                try:
+                    return 200, self.flight.run(key, functools.partial(
+                        self._get, route, path_params, query, headers, path,
+                        url.query
+                    ))
+                except PoolSaturatedError:
+                    return 503, error_document(
+                        503, 'Service Unavailable',
+                        'The server is busy. Please retry later.'
+                    )
+
+        return 404, error_document(404, 'Not found', 'Resource not found.')
+
+    def _get(self, route, path_params, query, headers, path, raw_query):
+        # Build the document of a GET request of a route
+        self._query()
+        link = self._self_link(headers, path, raw_query)
+        if 'osuIds' in query:
+            document = self._build_batch_document(path_params['resource'],
+                                                  query)
+        elif route.path == '/students/{osuId}':
+            document = self._build_student_document(path_params['osuId'],
+                                                    query, headers)
+        else:
+            document = self._build_document(route.path,
+                                            path_params.get('osuId'),
+                                            query.get('term'))
+        document = {'links': {'self': link}, **document}
+        if 'page[number]' in query or 'page[size]' in query:
+            document = self._paginate(document, headers, path, query)
+        return self._trim_fields(document, query)
+
+    def _query(self):
+        # Hold a simulated database connection for query_seconds
+        with self._stats_lock:
+            self.execute_count += 1
+        if not self.pool:
+            time.sleep(self.query_seconds)
+            return
+        with self.pool.connection():
+            time.sleep(self.query_seconds)
+
+    def _metrics_document(self):
+        # Same shape as the admin metrics endpoint of the API
+        now = time.time()
+        with self._stats_lock:
+            metrics = {
+                'standIn.requestCount': self.request_count,
+                'standIn.serverSeconds': self.server_seconds,
+                'standIn.cachedDocuments':
+                    self._build_document.cache_info().currsize,
+                'oracledb.executeCount': self.execute_count,
+                'coalescing.executions': self.flight.executions,
+                'coalescing.sharedCalls': self.flight.shared_calls
+            }
+        if self.pool:
+            metrics.update(self.pool.get_metrics())
+        return {
+            'meta': {
+                'unixTime': int(now),
+                'uptimeSeconds': now - self._start_time
+            },
+            'metrics': metrics
+        }
+
+    def _paginate(self, document, headers, path, query):
+        # Cut a page out of a list resource, or out of the array attribute of
+        # a singleton resource, e.g. transactions
+        number = int(query.get('page[number]', 1))
+        size = int(query.get('page[size]', DEFAULT_PAGE_SIZE))
+        data = document['data']
+        if isinstance(data, list):
+            items = data
+        else:
+            field = next(field for field, value in data['attributes'].items()
+                         if isinstance(value, list))
+            items = data['attributes'][field]
+
+        total_pages = max(math.ceil(len(items) / size), 1)
+        page_items = items[(number - 1) * size:number * size]
+        if isinstance(data, list):
+            data = page_items
+        else:
+            data = {**data,
+                    'attributes': {**data['attributes'], field: page_items}}
+
+        def page_link(page_number):
+            page_query = {**query, 'page[number]': page_number,
+                          'page[size]': size}
+            return self._self_link(headers, path,
+                                   urllib.parse.urlencode(page_query))
+
+        return {
+            'links': {
+                'self': document['links']['self'],
+                'first': page_link(1),
+                'last': page_link(total_pages),
+                'prev': (page_link(number - 1)
+                         if 1 < number <= total_pages else None),
+                'next': page_link(number + 1) if number < total_pages else None
+            },
+            'meta': {
+                'totalResults': len(items),
+                'totalPages': total_pages,
+                'currentPageNumber': number,
+                'currentPageSize': size
+            },
+            'data': data
+        }
+
+    def _trim_fields(self, document, query):
+        # Trim the attributes of each resource to the sparse fieldset of its
+        # type, if one is requested
+        def trim(resource):
+            fields = query.get(f"fields[{resource['type']}]")
+            if fields is None:
+                return resource
+            fields = fields.split(',')
+            sparse_attributes = schema.get_sparse_attributes(
+                self.attribute_definitions[resource['type']], fields
+            )
+            attributes = {}
+            for field, attribute in sparse_attributes.items():
+                value = resource['attributes'][field]
+                if field not in fields:
+                    item_fields = attribute['items']['properties']
+                    value = [{item_field: item_value
+                              for item_field, item_value in item.items()
+                              if item_field in item_fields}
+                             for item in value]
+                attributes[field] = value
+            return {**resource, 'attributes': attributes}
+
+        data = document['data']
+        document = {**document,
+                    'data': ([trim(resource) for resource in data]
+                             if isinstance(data, list) else trim(data))}
+        if 'included' in document:
+            document['included'] = [trim(resource)
+                                    for resource in document['included']]
+        return document
+
+    def _self_link(self, headers, path, query_string):
+        # Like local API instances, links contain no port and no /api prefix
+        host = headers.get('Host', 'localhost').split(':')[0]
+        link = f'http://{host}{self.base_path}{path}'
+        return f'{link}?{query_string}' if query_string else link
+
+    @functools.lru_cache(maxsize=256)
+    def _build_document(self, path, osu_id, term):
+        route = next(route for route in self.routes if route.path == path)
+        count = self.items.get(route.name, self.default_items)
+        data_schema = route.schema['data']
+        context = {'osuId': osu_id, 'term': term}
+
+        if data_schema.get('type') == 'array':
+            data = [
+                self._build_resource(data_schema['items']['properties'],
+                                     f'{osu_id}-{index}', index,
+                                     NESTED_ITEMS, context)
+                for index in range(count)
+            ]
+        else:
+            data = self._build_resource(data_schema['properties'], osu_id, 0,
+                                        count, context)
+        return {'data': data}
+
+    def _build_batch_document(self, resource, query):
+        # A batch contains the resources of the single student endpoint for
+        # every distinct OSU ID
+        path = f'/students/{{osuId}}/{resource}'
+        data = []
+        for osu_id in dict.fromkeys(query['osuIds'].split(',')):
+            resource_data = self._build_document(path, osu_id,
+                                                 query.get('term'))['data']
+            data.extend(resource_data if isinstance(resource_data, list)
+                        else [resource_data])
+        return {'data': data}
+
+    def _build_student_document(self, osu_id, query, headers):
+        # A student includes the resources of the single student endpoints,
+        # and links each of them as a relationship
+        relationships = {}
+        included = []
+        for resource in dict.fromkeys(query['include'].split(',')):
+            path = f'/students/{{osuId}}/{resource}'
+            route = next(route for route in self.routes if route.path == path)
+            term = query.get('term') if any(
+                parameter['name'] == 'term' for parameter in route.parameters
+            ) else None
+            resource_data = self._build_document(path, osu_id, term)['data']
+            identifiers = [
+                {'type': item['type'], 'id': item['id']}
+                for item in (resource_data if isinstance(resource_data, list)
+                             else [resource_data])
+            ]
+            relationships[resource] = {
+                'links': {'related': self._self_link(
+                    headers, f'/students/{osu_id}/{resource}',
+                    urllib.parse.urlencode({'term': term}) if term else ''
+                )},
+                'data': (identifiers if isinstance(resource_data, list)
+                         else identifiers[0])
+            }
+            included.extend(resource_data if isinstance(resource_data, list)
+                            else [resource_data])
+        return {
+            'data': {
+                'type': 'student',
+                'id': osu_id,
+                'relationships': relationships,
+                'links': {'self': self._self_link(headers,
+                                                  f'/students/{osu_id}', '')}
+            },
+            'included': included
+        }
+
+    def _build_resource(self, schema, resource_id, index, array_items,
+                        context):
+        attributes = schema['attributes']['properties']
+        return {
+            'type': schema['type']['enum'][0],
+            'id': resource_id,
+            'attributes': {
+                field: self._generate_value(field, attribute, index,
+                                            array_items, context)
+                for field, attribute in attributes.items()
+            }
+        }
+
+    def _generate_value(self, field, attribute, index, array_items,
+                        context):
+        """Generate a value which satisfies an OpenAPI attribute"""
+
+        openapi_type = attribute.get('type')
+        formatting = attribute.get('format')
+        example = attribute.get('example')
+
+        if 'enum' in attribute:
+            values = [value for value in attribute['enum']
+                      if value is not None]
+            if values:
+                return values[index % len(values)]
+        if 'properties' in attribute and openapi_type in [None, 'object']:
+            return {
+                nested_field: self._generate_value(nested_field,
+                                                   nested_attribute, index,
+                                                   NESTED_ITEMS, context)
+                for nested_field, nested_attribute
+                in attribute['properties'].items()
+            }
+        if openapi_type == 'array':
+            return [
+                self._generate_value(field, attribute['items'], item_index,
+                                     NESTED_ITEMS, context)
+                for item_index in range(array_items)
+            ]
+        if openapi_type == 'boolean':
+            return index % 2 == 0
+        if openapi_type == 'integer' or formatting in ['int32', 'int64',
+                                                       'integer']:
+            return example if isinstance(example, int) else index + 1
+        if openapi_type == 'number':
+            return (float(example) if isinstance(example, (int, float))
+                    else index + 0.5)
+        if formatting == 'date':
+            date = datetime.date(2018, 9, 20) + datetime.timedelta(index)
+            return date.isoformat()
+        if formatting == 'date-time':
+            date_time = (datetime.datetime(2018, 4, 27, 6, 31, 15)
+                         + datetime.timedelta(hours=index))
+            return f'{date_time.isoformat()}Z'
+        if formatting in ['uri', 'url']:
+            return 'https://api.oregonstate.edu/v1'
+        if formatting == 'email':
+            return f'student{index}@oregonstate.edu'
+        if field == 'term' and context['term'] and context['term'].isdigit():
+            return context['term']
+        if example is not None:
+            return example if isinstance(example, str) else str(example)
+        return f'{field}-{index}'
+
+    def _handler_class(self):
+        server = self
+
+        class StandInRequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, which would otherwise
+            # stall every keep-alive response on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                start = time.perf_counter()
+                status, document = server.handle('GET', self.path,
+                                                 self.headers)
+                handled = time.perf_counter()
+                body = json.dumps(document).encode()
+                durations = {
+                    'query': handled - start,
+                    'serialize': time.perf_counter() - handled
+                }
+                compressed = (
+                    len(body) >= COMPRESSION_THRESHOLD_BYTES
+                    and accepts_gzip(self.headers.get('Accept-Encoding'))
+                )
+                # Like the API, the compressed representation has its own
+                # ETag
+                etag = (f'"{hashlib.sha1(body).hexdigest()}'
+                        f'{"-gzip" if compressed else ""}"')
+                if status == 200 and (
+                    self.headers.get('If-None-Match') == etag
+                ):
+                    status, body, compressed = 304, b'', False
+
+                if compressed:
+                    serialized = time.perf_counter()
+                    body = gzip.compress(body, compresslevel=6)
+                    durations['compress'] = (time.perf_counter()
+                                             - serialized)
+                durations['total'] = time.perf_counter() - start
+                server_timing = format_server_timing(durations)
+
+                self.send_response(status)
+                self.send_header('Server-Timing', server_timing)
+                self.send_header('Vary', 'Accept-Encoding')
+                if status == 503:
+                    self.send_header('Retry-After', str(RETRY_AFTER_SECONDS))
+                if compressed:
+                    self.send_header('Content-Encoding', 'gzip')
+                if status in (200, 304):
+                    self.send_header('ETag', etag)
+                    if CACHEABLE_PATH.search(self.path):
+                        self.send_header('Cache-Control',
+                                         'private, max-age=0')
+                if status != 304:
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+                with server._stats_lock:
+                    server.request_count += 1
+                    server.server_seconds += time.perf_counter() - start
+
+            def log_message(self, format, *args):
+                logging.debug(format % args)
+
+        return StandInRequestHandler
+
+
+# Format durations in seconds keyed by phase as a Server-Timing header
+def format_server_timing(durations):
+    return ', '.join(f'{phase};dur={seconds * 1000:.1f}'
+                     for phase, seconds in durations.items())
+
+
+# Whether an Accept-Encoding header allows gzip
+def accepts_gzip(accept_encoding):
+    for coding in (accept_encoding or '').split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        if name in ('gzip', '*'):
+            return 'q=0' not in params
+    return False
+
+
+# Parse RESOURCE=N pairs of payload sizes into a dictionary
+def parse_sizes(sizes):
+    items = {}
+    for size in sizes or []:
+        resource, _, count = size.partition('=')
+        items[resource] = int(count)
+    return items
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--openapi',
+        dest='openapi_path',
+        help='Path to yaml formatted OpenAPI specification',
+        required=True)
+    parser.add_argument(
+        '--port',
+        dest='port',
+        help='Port to listen on (default: 8080)',
+        type=int,
+        default=8080)
+    parser.add_argument(
+        '--items',
+        dest='items',
+        help='Number of items per list resource or array attribute '
+             '(default: 25)',
+        type=int,
+        default=25)
+    parser.add_argument(
+        '--size',
+        dest='sizes',
+        help='Number of items for a single resource, e.g. grades=500',
+        action='append')
+    parser.add_argument(
+        '--pool',
+        dest='pool_size',
+        help='Number of simulated database connections (default: unlimited)',
+        type=int)
+    parser.add_argument(
+        '--query-seconds',
+        dest='query_seconds',
+        help='Seconds each request holds a simulated database connection '
+             '(default: 0)',
+        type=float,
+        default=0)
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    openapi, _ = utils.load_openapi(arguments.openapi_path)
+    stand_in = StandInServer(openapi,
+                             default_items=arguments.items,
+                             items=parse_sizes(arguments.sizes),
+                             host='localhost',
+                             port=arguments.port,
+                             pool_size=arguments.pool_size,
+                             query_seconds=arguments.query_seconds)
+    try:
+        stand_in.start()
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stand_in.stop()
@@ -0,0 +1,155 @@
+import json
+
+import ijson
+
+
+class LazyMessage:
+    """Message which is only built when it is converted to a string, e.g. by
+    a debug log record or a failed assertion"""
+
+    def __init__(self, build):
+        self.build = build
+
+    def __str__(self):
+        return self.build()
+
+
+class ResponseBody:
+    """File-like view of a streamed response body which keeps the bytes it
+    has read so that they can be reused after streaming validation
+
+    :param response: response object requested with stream=True
+    :param chunk_size: number of bytes to read at a time (default: 65536)
+    """
+
+    def __init__(self, response, chunk_size=65536):
+        self._raw = response.raw
+        self._chunks = []
+        self._iterator = response.iter_content(chunk_size)
+        self._position = 0
+        self._content = None
+        self._end_callbacks = []
+        self.size = 0
+        self.complete = False
+
+    def _read_chunk(self):
+        chunk = next(self._iterator, b'')
+        if chunk:
+            self._chunks.append(chunk)
+            self.size += len(chunk)
+        elif not self.complete:
+            self.complete = True
+            for callback in self._end_callbacks:
+                callback()
+        return chunk
+
+    def on_end(self, callback):
+        """Call a function once the whole body has been read, or at once if
+        it already has been"""
+
+        if self.complete:
+            callback()
+        else:
+            self._end_callbacks.append(callback)
+
+    def read(self, size=-1):
+        """Read the next chunk of the body, or an empty bytes object at the
+        end of the body. Chunks which have already been read from the
+        response are replayed first"""
+
+        if size == 0 or (
+            self._position == len(self._chunks) and not self._read_chunk()
+        ):
+            return b''
+        self._position += 1
+        return self._chunks[self._position - 1]
+
+    @property
+    def content(self):
+        """The whole body, reading whatever has not been read yet"""
+
+        if self._content is None:
+            while self._read_chunk():
+                pass
+            self._content = b''.join(self._chunks)
+        return self._content
+
+    @property
+    def wire_size(self):
+        """Number of bytes read from the connection so far, which is the
+        compressed size of a compressed body once it has been read"""
+
+        return self._raw.tell()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def __str__(self):
+        try:
+            return json.dumps(self.json(), indent=4)
+        except json.decoder.JSONDecodeError:
+            return self.content.decode(errors='replace')
+
+
+def validate_stream(body, validator, status_code,
+                    get_included_validator=None):
+    """Parse a response body incrementally, validating each element of a
+    top-level data or included array as soon as it has been parsed instead
+    of building the whole document first
+
+    :param body: ResponseBody of the response
+    :param validator: ResourceValidator of the expected resource
+    :param status_code: HTTP status code of the response
+    :param get_included_validator: function returning the ResourceValidator
+                                   of an included resource by its type, or
+                                   None if the document is not compound
+                                   (default: None)
+    :returns: The parsed document, where the elements of a data or included
+              array are reduced to their resource identifiers
+    """
+
+    document_builder = ijson.ObjectBuilder()
+    item_builder = None
+    item_prefix = None
+    identifiers = {}
+
+    try:
+        for prefix, event, value in ijson.parse(body, use_float=True):
+            if item_builder is not None:
+                item_builder.event(event, value)
+                if prefix == item_prefix and event == 'end_map':
+                    resource = item_builder.value
+                    if status_code == 200 and item_prefix == 'data.item':
+                        validator.validate_resource(resource)
+                    elif status_code == 200:
+                        if get_included_validator is None:
+                            raise AssertionError(
+                                'Unexpected included resources')
+                        get_included_validator(
+                            resource['type']
+                        ).validate_resource(resource)
+                    identifiers[item_prefix].append({
+                        'type': resource.get('type'),
+                        'id': resource.get('id')
+                    })
+                    item_builder = None
+            elif (
+                prefix in ('data.item', 'included.item')
+                and event == 'start_map'
+            ):
+                item_builder = ijson.ObjectBuilder()
+                item_builder.event(event, value)
+                item_prefix = prefix
+                identifiers.setdefault(prefix, [])
+            else:
+                document_builder.event(event, value)
+    except KeyError as error:
+        raise AssertionError(f'Missing key {error}')
+
+    document = document_builder.value
+    if 'data.item' not in identifiers:
+        # Singleton resources, errors and empty arrays are validated at once
+        validator.validate_document(document, status_code)
+    for prefix, prefix_identifiers in identifiers.items():
+        document[prefix.split('.')[0]] = prefix_identifiers
+    return document
@@ -0,0 +1,225 @@
+import collections
+import concurrent.futures
+import logging
+import statistics
+import threading
+import time
+
+import load
+import utils
+
+
+# Requests used to measure the unloaded latency before the stress phase
+BASELINE_REQUESTS = 10
+
+
+def request(session, url):
+    """Send a request and read the whole body
+
+    :returns: A tuple of the status code, or None if the request failed, the
+              elapsed seconds and the Retry-After header
+    """
+
+    start = time.perf_counter()
+    try:
+        response = session.get(url)
+        response.content
+    except Exception as error:
+        logging.debug(f'Request to {url} failed: {error}')
+        return None, time.perf_counter() - start, None
+    return (response.status_code, time.perf_counter() - start,
+            response.headers.get('Retry-After'))
+
+
+def run_stress(session_pool, urls, workers, duration, on_peak=None):
+    """Send requests from concurrent workers, each sending its next request
+    as soon as the previous one is answered. The workers take turns over the
+    URLs, so that the API coalesces no identical requests in flight if there
+    are at least as many URLs as workers
+
+    :param urls: URLs to request, e.g. of the same endpoint for different
+                 students
+    :param on_peak: function called from the main thread halfway through the
+                    stress phase, e.g. to sample the server metrics
+                    (default: None)
+    :returns: A list of (status code, elapsed seconds, Retry-After) tuples
+    """
+
+    results = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def __work(url):
+        with session_pool.acquire() as session:
+            while time.monotonic() < deadline:
+                result = request(session, url)
+                with lock:
+                    results.append(result)
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(__work, urls[worker % len(urls)])
+                   for worker in range(workers)]
+        time.sleep(duration / 2)
+        if on_peak:
+            on_peak()
+        concurrent.futures.wait(futures)
+    return results
+
+
+def measure_recovery(session, url, max_latency, max_recovery_seconds):
+    """Send sequential requests until one succeeds within max_latency
+
+    :returns: Seconds until the server recovered, or None if it did not
+              recover within max_recovery_seconds
+    """
+
+    start = time.monotonic()
+    while time.monotonic() - start < max_recovery_seconds:
+        status_code, elapsed_seconds, _ = request(session, url)
+        if status_code == 200 and elapsed_seconds <= max_latency:
+            return time.monotonic() - start
+    return None
+
+
+def check_results(results, stress_test_config):
+    """Check that a saturated server fails fast with 503 and Retry-After
+    instead of erroring or queueing without bound
+
+    :param results: results of run_stress
+    :param stress_test_config: the 'stress_test' section of the configuration
+    :returns: A list of human-readable failures
+    """
+
+    failures = []
+    latencies = collections.defaultdict(list)
+    for status_code, elapsed_seconds, _ in results:
+        latencies[status_code].append(elapsed_seconds)
+
+    lines = [f"{'status':<8} {'requests':>9} {'p50':>7} {'p99':>7} "
+             f"{'max':>7}"]
+    for status_code, samples in sorted(latencies.items(), key=str):
+        samples = sorted(samples)
+        lines.append(f'{str(status_code):<8} {len(samples):>9} '
+                     f'{load.percentile(samples, 50):>7.3f} '
+                     f'{load.percentile(samples, 99):>7.3f} '
+                     f'{samples[-1]:>7.3f}')
+    logging.info('\n'.join(lines))
+
+    errors = len(results) - len(latencies[200]) - len(latencies[503])
+    max_error_rate = stress_test_config.get('max_error_rate', 0)
+    if errors > max_error_rate * len(results):
+        failures.append(f'{errors} of {len(results)} request(s) neither '
+                        f'succeeded nor got a 503')
+
+    rejections = sorted(latencies[503])
+    if not rejections:
+        message = ('No request got a 503, so the connection pool was not '
+                   'saturated. Add more --workers or osu_ids')
+        if stress_test_config.get('require_saturation', True):
+            failures.append(message)
+        else:
+            logging.warning(message)
+        return failures
+
+    missing_retry_after = sum(
+        1 for status_code, _, retry_after in results
+        if status_code == 503 and not (retry_after or '').isdigit()
+    )
+    if missing_retry_after:
+        failures.append(f'{missing_retry_after} 503 response(s) without a '
+                        f'valid Retry-After header')
+
+    max_rejection_seconds = stress_test_config.get('max_rejection_seconds',
+                                                   0.5)
+    p99_rejection = load.percentile(rejections, 99)
+    if p99_rejection > max_rejection_seconds:
+        failures.append(f'503 responses are not failing fast: p99 '
+                        f'{p99_rejection:.3f} s > {max_rejection_seconds} s')
+    return failures
+
+
+def get_osu_ids(test_case_class, stress_test_config, workers):
+    """Get the OSU IDs to request in the stress phase. The API shares a
+    single query between identical requests in flight, so the pool is only
+    saturated by requests for different students
+
+    :returns: One made-up OSU ID per worker for a stand-in server, which
+              serves any OSU ID, or else the osu_ids of the configuration,
+              or the OSU IDs of the batch tests
+    """
+
+    if test_case_class.stand_in:
+        osu_ids = [f'{worker:09d}' for worker in range(workers)]
+    else:
+        osu_ids = stress_test_config.get('osu_ids',
+                                         test_case_class.batch_osu_ids)
+    if len(set(osu_ids)) < workers:
+        logging.warning(f'Only {len(set(osu_ids))} OSU ID(s) for {workers} '
+                        f'workers, so requests of the stress phase can be '
+                        f'coalesced and may not saturate the pool')
+    return osu_ids
+
+
+def run(test_case_class, arguments, stress_test_config, metrics_url=None):
+    """Run the stress mode: measure the unloaded latency, push more
+    concurrent requests than the connection pool can serve, and measure how
+    long the server takes to recover afterwards
+
+    :returns: True if the server failed fast while saturated and recovered
+              in time, otherwise False
+    """
+
+    template = stress_test_config.get('endpoint', '/students/{osuId}/grades')
+    urls = [
+        f"{test_case_class.base_url}{template.replace('{osuId}', osu_id)}"
+        for osu_id in get_osu_ids(test_case_class, stress_test_config,
+                                  arguments.workers)
+    ]
+    url = urls[0]
+    session = test_case_class.session
+    duration = 30 if arguments.duration is None else arguments.duration
+
+    baseline = [request(session, url) for _ in range(BASELINE_REQUESTS)]
+    if any(status_code != 200 for status_code, _, _ in baseline):
+        logging.error(f'Stress test failed: {template} did not return 200 '
+                      f'before the stress phase')
+        return False
+    baseline_seconds = statistics.median(
+        elapsed_seconds for _, elapsed_seconds, _ in baseline
+    )
+    logging.info(f'Median latency of {template} before the stress phase: '
+                 f'{baseline_seconds:.3f} second(s)')
+
+    def __sample_metrics():
+        if not metrics_url:
+            return
+        try:
+            metrics = session.get(metrics_url).json()['metrics']
+        except Exception as error:
+            logging.warning(f'Could not sample {metrics_url}: {error}')
+            return
+        logging.info('Pool at peak: ' + ', '.join(
+            f'{name} = {value}' for name, value in sorted(metrics.items())
+            if name.startswith('oracledb.')
+        ))
+
+    session_pool = utils.SessionPool(session, arguments.workers)
+    results = run_stress(session_pool, urls, arguments.workers, duration,
+                         on_peak=__sample_metrics)
+    session_pool.close()
+    failures = check_results(results, stress_test_config)
+
+    max_recovery_seconds = stress_test_config.get('max_recovery_seconds', 5)
+    max_latency = (baseline_seconds
+                   * stress_test_config.get('recovery_latency_ratio', 2))
+    recovery_seconds = measure_recovery(session, url, max_latency,
+                                        max_recovery_seconds)
+    if recovery_seconds is None:
+        failures.append(f'Latency did not recover to {max_latency:.3f} s '
+                        f'within {max_recovery_seconds} s')
+    else:
+        logging.info(f'Recovered in {recovery_seconds:.3f} second(s)')
+
+    for failure in failures:
+        logging.error(f'Stress test failed: {failure}')
+    return not failures
@@ -0,0 +1,64 @@
+import unittest
+
+import load
+
+
+class CheckThresholdsTests(unittest.TestCase):
+    stats = {
+        'requests': 100,
+        'errors': 5,
+        'error_rate': 0.05,
+        'throughput': 20.0,
+        'p50_seconds': 0.2,
+        'p90_seconds': 0.5,
+        'p99_seconds': 1.5,
+        'max_seconds': 3.0
+    }
+
+    # Helper function to check the thresholds of a single endpoint
+    def check_thresholds(self, thresholds, endpoint_thresholds=None):
+        return load.check_thresholds(
+            {'/students/{osuId}/gpa': self.stats},
+            {'thresholds': thresholds,
+             'endpoint_thresholds': endpoint_thresholds or {}}
+        )
+
+    def test_breach_of_each_threshold(self):
+        breached_thresholds = {
+            'max_error_rate': 0.01,
+            'min_throughput': 50,
+            'p50_seconds': 0.1,
+            'p90_seconds': 0.4,
+            'p99_seconds': 1,
+            'max_seconds': 2
+        }
+        for name, limit in breached_thresholds.items():
+            with self.subTest(threshold=name):
+                breaches = self.check_thresholds({name: limit})
+                self.assertEqual(len(breaches), 1)
+                self.assertIn(f'{name} = {limit}', breaches[0])
+
+    def test_thresholds_within_limits(self):
+        self.assertEqual(self.check_thresholds({
+            'max_error_rate': 0.1,
+            'min_throughput': 10,
+            'p50_seconds': 1,
+            'p90_seconds': 1,
+            'p99_seconds': 2,
+            'max_seconds': 5
+        }), [])
+
+    def test_endpoint_thresholds_override_defaults(self):
+        breaches = self.check_thresholds(
+            {'p99_seconds': 1},
+            {'/students/{osuId}/gpa': {'p99_seconds': 2}}
+        )
+        self.assertEqual(breaches, [])
+
+    def test_unknown_threshold_is_ignored(self):
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.check_thresholds({'p75_seconds': 0}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import utils
+
+
+class GetEndpointTemplateTests(unittest.TestCase):
+    def test_osu_id_is_replaced(self):
+        self.assertEqual(utils.get_endpoint_template('/students/123456789'),
+                         '/students/{osuId}')
+        self.assertEqual(
+            utils.get_endpoint_template('/students/123456789/gpa'),
+            '/students/{osuId}/gpa'
+        )
+
+    def test_batch_endpoint_is_kept(self):
+        self.assertEqual(utils.get_endpoint_template('/students/batch/gpa'),
+                         '/students/batch/gpa')
+        self.assertEqual(utils.get_endpoint_template('/students/batch'),
+                         '/students/batch')
+
+    def test_osu_id_starting_with_a_static_segment_is_replaced(self):
+        self.assertEqual(
+            utils.get_endpoint_template('/students/batch1/gpa'),
+            '/students/{osuId}/gpa'
+        )
+
+
+class RunningAggregatesTests(unittest.TestCase):
+    def test_values_are_aggregated_by_key(self):
+        aggregates = utils.RunningAggregates()
+        self.assertFalse(aggregates)
+        for size in [3, 1, 2]:
+            aggregates.add('/students/{osuId}/gpa', size=size)
+        aggregates.add('/students/batch/gpa', size=10)
+
+        self.assertEqual(aggregates.items(), [
+            ('/students/batch/gpa',
+             {'count': 1, 'sum': {'size': 10}, 'min': {'size': 10},
+              'max': {'size': 10}}),
+            ('/students/{osuId}/gpa',
+             {'count': 3, 'sum': {'size': 6}, 'min': {'size': 1},
+              'max': {'size': 3}})
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,27 @@
 import argparse
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
 import json
 import logging
+import os
+import queue
 import re
 import sys
 import textwrap
+import threading
+import time
 import urllib
 import unittest
 
+import ijson
 import requests
-import validators
+import yaml
+from prance import ResolvingParser
+
+import auth
+import streaming
 
 
 # Handler for parsing command-line arguments
@@ -24,15 +37,278 @@ def parse_arguments():
         dest='openapi_path',
         help='Path to yaml formatted OpenAPI specification',
         required=True)
+    parser.add_argument(
+        '--openapi-cache',
+        dest='openapi_cache_path',
+        help='Path to a JSON file to cache the resolved OpenAPI '
+             'specification in until the specification changes, or an empty '
+             'string to resolve it on every run '
+             '(default: .openapi-cache.json)',
+        default='.openapi-cache.json')
     parser.add_argument(
         '--debug',
         dest='debug',
         help='Enable debug logging mode',
         action='store_true')
+    parser.add_argument(
+        '--load',
+        dest='load',
+        help='Run the tests repeatedly from concurrent workers and report '
+             'latency percentiles instead of a single unittest pass',
+        action='store_true')
+    parser.add_argument(
+        '--workers',
+        dest='workers',
+        help='Number of concurrent workers in load, fan-out, soak, stress '
+             'and replay mode (default: 10)',
+        type=int,
+        default=10)
+    load_limit = parser.add_mutually_exclusive_group()
+    load_limit.add_argument(
+        '--duration',
+        dest='duration',
+        help='Seconds to sustain the load in load mode (default: 60), soak '
+             'mode (default: 3600) or stress mode (default: 30)',
+        type=float)
+    load_limit.add_argument(
+        '--requests',
+        dest='request_count',
+        help='Minimum number of requests to send in load mode, or maximum '
+             'number of log entries to replay in replay mode',
+        type=int)
+    parser.add_argument(
+        '--stand-in',
+        dest='stand_in',
+        help='Run against an in-process stand-in server generated from the '
+             'OpenAPI specification instead of a live API',
+        action='store_true')
+    parser.add_argument(
+        '--stand-in-items',
+        dest='stand_in_items',
+        help='Number of items per list resource or array attribute served by '
+             'the stand-in server (default: 25)',
+        type=int,
+        default=25)
+    parser.add_argument(
+        '--stand-in-size',
+        dest='stand_in_sizes',
+        help='Number of items served by the stand-in server for a single '
+             'resource, e.g. grades=500. Can be repeated',
+        action='append')
+    parser.add_argument(
+        '--stand-in-pool',
+        dest='stand_in_pool',
+        help='Number of simulated database connections of the stand-in '
+             'server. Requests beyond the pool and its queue get a 503 '
+             '(default: unlimited)',
+        type=int)
+    parser.add_argument(
+        '--stand-in-query-seconds',
+        dest='stand_in_query_seconds',
+        help='Seconds each request of the stand-in server holds a simulated '
+             'database connection (default: 0)',
+        type=float,
+        default=0)
+    parser.add_argument(
+        '--conditional-requests',
+        dest='conditional_requests',
+        help='Revalidate every successful response with its ETag, which '
+             'doubles the number of requests',
+        action='store_true')
+    parser.add_argument(
+        '--parallel',
+        dest='parallel',
+        help='Number of test methods to run concurrently (default: 1)',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '--parallel-sub-cases',
+        dest='parallel_sub_cases',
+        help='Number of sub-cases, e.g. terms, of a test method to run '
+             'concurrently (default: 1)',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '--benchmark',
+        dest='benchmark',
+        help='Benchmark every endpoint under benchmark.endpoints in the '
+             'configuration file and compare the latencies against a stored '
+             'baseline',
+        action='store_true')
+    parser.add_argument(
+        '--baseline',
+        dest='baseline_path',
+        help='Path to the JSON baseline file of benchmark mode '
+             '(default: benchmark-baseline.json)',
+        default='benchmark-baseline.json')
+    parser.add_argument(
+        '--save-baseline',
+        dest='save_baseline',
+        help='Save the benchmark results as the new baseline instead of '
+             'comparing against it',
+        action='store_true')
+    parser.add_argument(
+        '--iterations',
+        dest='iterations',
+        help='Number of requests per endpoint in benchmark mode '
+             '(default: 30)',
+        type=int,
+        default=30)
+    parser.add_argument(
+        '--significance',
+        dest='significance',
+        help='p-value below which a slowdown is significant in benchmark '
+             'mode (default: 0.01)',
+        type=float,
+        default=0.01)
+    parser.add_argument(
+        '--regression-ratio',
+        dest='regression_ratio',
+        help='Minimum ratio of current to baseline median latency that is '
+             'reported as a regression in benchmark mode (default: 1.2)',
+        type=float,
+        default=1.2)
+    parser.add_argument(
+        '--fan-out',
+        dest='fan_out_path',
+        help='Path to a file of OSU IDs, one per line, to spread requests '
+             'across instead of running the tests')
+    parser.add_argument(
+        '--fan-out-endpoints',
+        dest='fan_out_endpoints',
+        help='Comma separated sub-endpoints to request in fan-out mode, e.g. '
+             'grades,gpa (default: every endpoint under benchmark.endpoints '
+             'in the configuration file)')
+    parser.add_argument(
+        '--soak',
+        dest='soak',
+        help='Sustain a constant request rate and fail if the memory or '
+             'connection pool usage of the server keeps growing',
+        action='store_true')
+    parser.add_argument(
+        '--rate',
+        dest='rate',
+        help='Requests per second in soak mode (default: 10)',
+        type=float,
+        default=10)
+    parser.add_argument(
+        '--sample-interval',
+        dest='sample_interval',
+        help='Seconds between samples of the server metrics in soak mode '
+             '(default: 60)',
+        type=float,
+        default=60)
+    parser.add_argument(
+        '--stress',
+        dest='stress',
+        help='Push more concurrent requests than the connection pool of the '
+             'API can serve, and check that it fails fast and recovers',
+        action='store_true')
+    parser.add_argument(
+        '--report',
+        dest='report_path',
+        help='Path to a JSONL file, or a CSV file if it ends with .csv, to '
+             'write a record of every request of the tests to, together '
+             'with a summary in a -summary.json file next to it')
+    parser.add_argument(
+        '--junit-xml',
+        dest='junit_path',
+        help='Path to write a JUnit XML report of the outcome and duration '
+             'of every test method to')
+    parser.add_argument(
+        '--replay',
+        dest='replay_path',
+        help='Path to a JSONL access log of method, path, params and '
+             'timestamp to replay, checking the schema of every response')
+    parser.add_argument(
+        '--replay-timing',
+        dest='replay_timing',
+        help='Send the requests of replay mode as fast as possible (asap) or '
+             'with the intervals of the log (original) (default: asap)',
+        choices=['asap', 'original'],
+        default='asap')
+    parser.add_argument(
+        '--replay-speed',
+        dest='replay_speed',
+        help='Factor by which the intervals of the log are shortened with '
+             '--replay-timing original (default: 1)',
+        type=float,
+        default=1)
     arguments, unittest_args = parser.parse_known_args()
     return arguments, sys.argv[:1] + unittest_args
 
 
+def load_openapi(openapi_path, cache_path=None):
+    """Load and resolve an OpenAPI specification. Resolving and validating
+    the specification takes seconds, so the resolved specification and its
+    index of resource schemas are cached together with the SHA-256 hash of
+    the file, and reused as long as the hash matches
+
+    :param openapi_path: path to the yaml formatted OpenAPI specification
+    :param cache_path: path to a JSON file to cache the resolved
+                       specification in, or None to resolve it every time
+                       (default: None)
+    :returns: A tuple of the resolved specification and the properties of
+              its resource definitions keyed by definition name
+    """
+
+    with open(openapi_path, 'rb') as openapi_file:
+        content = openapi_file.read()
+    content_hash = hashlib.sha256(content).hexdigest()
+    if cache_path:
+        try:
+            with open(cache_path) as cache_file:
+                cache = json.load(cache_file)
+            if cache['sha256'] == content_hash:
+                logging.debug(f'Loaded resolved OpenAPI specification from '
+                              f'{cache_path}')
+                return cache['specification'], cache['resource_schemas']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    openapi = yaml.load(content, Loader=yaml.SafeLoader)
+    if 'swagger' in openapi:
+        backend = 'flex'
+    elif 'openapi' in openapi:
+        backend = 'openapi-spec-validator'
+    else:
+        exit('Error: could not determine openapi document version')
+
+    parser = ResolvingParser(openapi_path, backend=backend)
+    openapi = parser.specification
+    resource_schemas = index_resource_schemas(openapi)
+    if cache_path:
+        write_openapi_cache(cache_path, {
+            'sha256': content_hash,
+            'specification': openapi,
+            'resource_schemas': resource_schemas
+        })
+    return openapi, resource_schemas
+
+
+# Write a resolved OpenAPI specification to its cache file. A temporary file
+# is written first so that concurrent runs never read a partial cache
+def write_openapi_cache(cache_path, cache):
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'w') as cache_file:
+            json.dump(cache, cache_file, separators=(',', ':'))
+        os.replace(temporary_path, cache_path)
+    except OSError as error:
+        logging.warning(f'Could not cache the resolved OpenAPI '
+                        f'specification in {cache_path}: {error}')
+
+
+# Index the properties of the resource definitions of an OpenAPI
+# specification by the name of the definition
+def index_resource_schemas(openapi):
+    return {
+        resource: definition['properties']
+        for resource, definition in openapi['definitions'].items()
+        if 'properties' in definition
+    }
+
+
 # Setup base URL from configuration file
 def setup_base_url(config):
     api = config['api']
@@ -49,21 +325,146 @@ def setup_session(config):
         session.verify = False
     else:
         oauth2 = config['auth']['oauth2']
-        data = {
-            'client_id': oauth2['client_id'],
-            'client_secret': oauth2['client_secret'],
-            'grant_type': 'client_credentials'
-        }
-        try:
-            res = requests.post(url=oauth2['token_api_url'], data=data)
-            token = res.json()['access_token']
-        except KeyError:
-            sys.exit('Error: invalid OAuth2 credentials')
-        session.headers = {'Authorization': f'Bearer {token}'}
+        token_provider = auth.OAuth2TokenProvider(
+            oauth2['token_api_url'],
+            oauth2['client_id'],
+            oauth2['client_secret'],
+            cache_path=oauth2.get('token_cache_path')
+        )
+        session.auth = auth.OAuth2BearerAuth(token_provider)
 
     return session
 
 
+class SessionPool:
+    """Pool of sessions for concurrent workers, created with the same
+    authentication and settings as a template session so that they share one
+    token provider
+
+    :param template_session: session to copy authentication and settings from
+    :param size: maximum number of sessions
+    """
+
+    def __init__(self, template_session, size):
+        self.template_session = template_session
+        self._sessions = queue.LifoQueue()
+        self._created = []
+        self._lock = threading.Lock()
+        self.size = size
+
+    def _create_session(self):
+        session = requests.Session()
+        session.auth = self.template_session.auth
+        session.verify = self.template_session.verify
+        session.headers.update(self.template_session.headers)
+        self._created.append(session)
+        return session
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """Borrow a session from the pool, waiting if all sessions are in
+        use"""
+
+        with self._lock:
+            if self._sessions.empty() and len(self._created) < self.size:
+                self._sessions.put(self._create_session())
+        session = self._sessions.get()
+        try:
+            yield session
+        finally:
+            self._sessions.put(session)
+
+    def close(self):
+        for session in self._created:
+            session.close()
+
+
+# Resize the connection pool of a session for concurrent workers
+class RunningAggregates:
+    """Thread-safe count, sum, minimum and maximum of values grouped by key.
+    Only the aggregates are kept, so they don't grow with the number of
+    values, e.g. over the requests of a long load test"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._aggregates = {}
+
+    def add(self, key, **values):
+        """Add a value of each name to the aggregates of a key
+
+        :param key: key to group the values by, e.g. an endpoint template
+        :param values: values keyed by name, e.g. size=1024
+        """
+
+        with self._lock:
+            aggregate = self._aggregates.setdefault(key, {
+                'count': 0, 'sum': {}, 'min': {}, 'max': {}
+            })
+            aggregate['count'] += 1
+            for name, value in values.items():
+                aggregate['sum'][name] = aggregate['sum'].get(name, 0) + value
+                aggregate['min'][name] = min(
+                    aggregate['min'].get(name, value), value
+                )
+                aggregate['max'][name] = max(
+                    aggregate['max'].get(name, value), value
+                )
+
+    def items(self):
+        """Get the aggregates sorted by key
+
+        :returns: A list of tuples of a key and a dictionary of its count,
+                  and the sum, min and max of each value name
+        """
+
+        with self._lock:
+            return sorted(
+                (key, {'count': aggregate['count'],
+                       **{stat: dict(aggregate[stat])
+                          for stat in ['sum', 'min', 'max']}})
+                for key, aggregate in self._aggregates.items()
+            )
+
+    def __bool__(self):
+        return bool(self._aggregates)
+
+
+def resize_connection_pool(session, pool_size):
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                            pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def parse_server_timing(header):
+    """Parse a Server-Timing header, e.g. 'pool;dur=0.4, query;dur=12.1'
+
+    :param header: value of the header, or None if it is missing
+    :returns: A dictionary of durations in seconds keyed by phase
+    """
+
+    timings = {}
+    for metric in (header or '').split(','):
+        name, *params = [part.strip() for part in metric.split(';')]
+        for param in params:
+            key, _, value = param.partition('=')
+            if name and key == 'dur':
+                timings[name] = float(value) / 1000
+    return timings
+
+
+# Static segments after /students which are not an OSU ID
+STUDENTS_STATIC_SEGMENTS = ['batch']
+
+
+# Replace the OSU ID of an endpoint with a placeholder for grouping. Batch
+# endpoints are kept as they are, e.g. /students/batch/gpa
+def get_endpoint_template(endpoint):
+    static_segments = '|'.join(STUDENTS_STATIC_SEGMENTS)
+    return re.sub(rf'^/students/(?!(?:{static_segments})(?:/|$))[^/]+',
+                  '/students/{osuId}', endpoint)
+
+
 class UtilsTestCase(unittest.TestCase):
     """TestCase subclass that includes utility methods for integration
     testing"""
@@ -71,24 +472,70 @@ class UtilsTestCase(unittest.TestCase):
     base_url = None
     session = None
     openapi = {}
+    # Properties of the resource definitions keyed by definition name
+    resource_schemas = {}
     local_test = None
+    recorder = None
+    # RequestReporter which records every response of make_request
+    reporter = None
+    # Seconds taken by each test method keyed by test ID
+    test_durations = {}
+    schema_compiler = None
+    sub_case_workers = 1
+    # Whether every successful response is revalidated with its ETag
+    conditional_requests = False
+    # Maximum sizes in bytes of successful responses keyed by endpoint
+    # template, e.g. {'max_compressed_bytes': 20480}
+    size_budgets = {}
+    # Compressed and uncompressed sizes of successful responses keyed by
+    # endpoint template and content encoding
+    payload_sizes = RunningAggregates()
+
+    def setUp(self):
+        self.start_time = time.perf_counter()
+        # Responses of make_request whose report record has not been written
+        # yet, because their body has not been read to its end
+        self.unreported_responses = []
+
+    def tearDown(self):
+        self.test_durations[self.id()] = time.perf_counter() - self.start_time
+        for response in list(self.unreported_responses):
+            self.report_response(response)
+
+    def report_response(self, response):
+        """Complete the report record of a response of make_request with the
+        size of the body read so far, and pass it to the reporter unless it
+        has been reported already"""
+
+        record, response.report_record = response.report_record, None
+        if record is None:
+            return
+        self.unreported_responses.remove(response)
+        self.reporter.record({
+            **record,
+            'wire_bytes': response.body.wire_size,
+            'bytes': response.body.size,
+            'validation_seconds': response.validation_seconds
+        })
 
     def get_json_content(self, response):
         """Get response content in JSON format"""
 
         try:
-            return response.json()
+            return response.body.json()
         except json.decoder.JSONDecodeError:
             self.fail('Response not in JSON format')
 
     def get_resource_schema(self, resource):
         """Get resource schema from OpenAPI specification"""
 
-        return self.openapi['definitions'][resource]['properties']
+        return self.resource_schemas[resource]
 
     def make_request(self, endpoint, expected_status_code,
                      params=None,
-                     max_elapsed_seconds=5):
+                     max_elapsed_seconds=5,
+                     headers=None,
+                     session=None):
         """Helper function to make a web request and lightly validate the
         response
 
@@ -96,213 +543,215 @@ class UtilsTestCase(unittest.TestCase):
         :param expected_status_code: expected HTTP status code
         :param params: key-value pairs parameters (default: None)
         :param max_elapsed_seconds: maximum elapsed times (default: 5)
+        :param headers: additional request headers, e.g. If-None-Match
+                        (default: None)
+        :param session: session to send the request with instead of the
+                        session of the test case (default: None)
         :returns: A response object contains a server’s response to an HTTP
-                  request
+                  request. The body is streamed and can be read through the
+                  response.body attribute, and the phases reported in the
+                  Server-Timing header through response.server_timing.
+                  The size budget of a successful response is checked once
+                  its body has been read. If a reporter is set,
+                  the response is reported once its body has been read and
+                  validated, or when the test ends
         """
 
         requested_url = f'{self.base_url}{endpoint}'
-        response = self.session.get(requested_url, params=params)
+        timestamp = time.time()
+        response = (session or self.session).get(requested_url,
+                                                 params=params,
+                                                 headers=headers, stream=True)
+        response.body = streaming.ResponseBody(response)
+        response.validating = False
+        response.validation_seconds = None
+        response.report_record = None
+        response.server_timing = parse_server_timing(
+            response.headers.get('Server-Timing')
+        )
         logging.debug(f'Sent request to {requested_url}, params = {params}')
         status_code = response.status_code
+        elapsed_seconds = response.elapsed.total_seconds()
+        # Revalidations answered with 304 would lower the latencies of the
+        # endpoint
+        if self.recorder and status_code != 304:
+            self.recorder.record(get_endpoint_template(endpoint),
+                                 elapsed_seconds,
+                                 status_code == expected_status_code)
+        if self.reporter:
+            response.report_record = {
+                'timestamp': timestamp,
+                'test': self.id(),
+                'method': 'GET',
+                'endpoint': get_endpoint_template(endpoint),
+                'path': endpoint,
+                'params': params,
+                'status': status_code,
+                'expected_status': expected_status_code,
+                'latency_seconds': elapsed_seconds
+            }
+            self.unreported_responses.append(response)
+            # Responses which are being validated are reported once the
+            # validation has finished
+            response.body.on_end(lambda: (
+                None if response.validating
+                else self.report_response(response)
+            ))
         response_code_details = textwrap.dedent(f'''
             Expected {expected_status_code}, recieved {status_code}
             Response body:''')
-        response_body = json.dumps(response.json(), indent=4)
-        logging.debug(f'{response_code_details}\n{response_body})')
+        # The body is only pretty-printed if debug logging or the assertion
+        # actually needs it
+        logging.debug('%s\n%s', response_code_details, response.body)
         self.assertEqual(
             status_code,
             expected_status_code,
-            f'requested_url: {requested_url},\nresponse_body: {response_body}'
+            streaming.LazyMessage(lambda: (
+                f'requested_url: {requested_url},\n'
+                f'response_body: {response.body}'
+            ))
         )
 
         # Response time should less then max_elapsed_seconds
-        elapsed_seconds = response.elapsed.total_seconds()
-        logging.debug(f'Request took {elapsed_seconds} second(s)')
+        logging.debug(f'Request took {elapsed_seconds} second(s), server '
+                      f'timing: {response.server_timing}')
         self.assertLess(elapsed_seconds, max_elapsed_seconds)
 
+        if status_code == 200:
+            response.body.on_end(
+                functools.partial(self.check_size_budget, endpoint, response)
+            )
+
         return response
 
-    def check_schema(self, response, schema, nullable_fields):
-        """Check the schema of response match OpenAPI specification"""
-
-        # Mapping of OpenAPI data types and python data types
-        types_dict = {
-            'string': str,
-            'integer': int,
-            'int32': int,
-            'int64': int,
-            'float': (float, int),
-            'double': (float, int),
-            'number': (float, int),
-            'boolean': bool,
-            'array': list,
-            'object': dict
-        }
-
-        # Helper function to get attributes of the schema
-        def __get_schema_attributes():
-            return schema['attributes']['properties']
-
-        # Validates returned attributes using pattern or format
-        def __validate_format(attribute, formatting, pattern):
-            # pattern validation overrides any format validaton
-            if pattern is not None:
-                self.assertRegex(attribute, pattern)
-            elif formatting in ['uri', 'url']:
-                self.assertTrue(validators.url(attribute))
-            elif formatting == 'email':
-                self.assertTrue(validators.email(attribute))
-
-        def __get_attribute_type(attribute):
-            """Helper function to map between OpenAPI data types and python
-            data types"""
-
-            if 'properties' in attribute:
-                return dict
-            if 'format' in attribute and attribute['format'] in types_dict:
-                openapi_type = attribute['format']
-            elif 'type' in attribute:
-                openapi_type = attribute['type']
-            elif '$ref' in attribute:
-                openapi_type = __get_reference_type(attribute['$ref'])
-
-            if not openapi_type:
-                logging.warning('OpenAPI property contains no type or'
-                                'properties')
-                return None
-            return types_dict[openapi_type]
-
-        def __get_reference_type(object_path, root_object_paths=None):
-            """Helper function to get type of referenced object"""
-
-            keys = re.split('/', re.search('#/(.*)', object_path).group(1))
-            reference = self.openapi
-            for key in keys:
-                reference = reference[key]
-
-            if 'format' in reference and reference['format'] in types_dict:
-                return reference['format']
-            if 'type' in reference:
-                return reference['type']
-            if '$ref' in reference:
-                nested_reference = reference['$ref']
-                # Avoid infinite recursion
-                if not root_object_paths:
-                    root_object_paths = [object_path]
-                if nested_reference not in root_object_paths:
-                    root_object_paths.append(nested_reference)
-                    return __get_reference_type(nested_reference,
-                                                root_object_paths)
+    def check_size_budget(self, endpoint, response):
+        """Record the compressed and uncompressed size of a response once
+        its body has been read, and check them against the size budget of the
+        endpoint
 
-            return None
+        :param endpoint: the requested endpoint
+        :param response: the response to check
+        """
 
-        # Helper function to check resource object schema
-        def __check_resource_schema(resource):
-            # Check resource type
-            self.assertEqual(resource['type'], schema['type']['enum'][0])
-            # Check resource attributes
-            actual_attributes = resource['attributes']
-            expected_attributes = __get_schema_attributes()
-            __check_attributes_schema(actual_attributes, expected_attributes)
-
-        # Helper function to check error object schema
-        def __check_error_schema(error):
-            # Check error attributes
-            actual_attributes = error
-            expected_attributes = schema
-            __check_attributes_schema(actual_attributes, expected_attributes)
-
-        # Helper function to check through all attributes
-        def __check_attributes_schema(actual_attributes, expected_attributes):
-            for field, actual_value in actual_attributes.items():
-                self.assertIn(
-                    field,
-                    expected_attributes.keys(),
-                    f"Unexpected field '{field}'"
+        uncompressed_size = response.body.size
+        compressed_size = response.body.wire_size
+        template = get_endpoint_template(endpoint)
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        self.payload_sizes.add((template, encoding),
+                               compressed_size=compressed_size,
+                               uncompressed_size=uncompressed_size)
+        logging.debug(f'Response of {endpoint} is {compressed_size} byte(s) '
+                      f'on the wire, {uncompressed_size} uncompressed')
+
+        budget = self.size_budgets.get(template, {})
+        for name, size in [('max_compressed_bytes', compressed_size),
+                           ('max_uncompressed_bytes', uncompressed_size)]:
+            if name in budget:
+                self.assertLessEqual(
+                    size, budget[name],
+                    f'{name} of {template} exceeded by {endpoint}'
                 )
-                expected_attribute = expected_attributes[field]
-                expected_type = __get_attribute_type(expected_attribute)
-
-                # Check item schema if attribute is an array
-                if (
-                    expected_type is list
-                    and 'properties' in expected_attributes[field]['items']
-                ):
-                    expected_item = (
-                        expected_attributes[field]['items']['properties']
-                    )
-                    expected_attribute = expected_attributes[field]
-                    expected_type = __get_attribute_type(expected_attribute)
-
-                    # Check item schema if attribute is an array
-                    if (
-                        expected_type is list
-                        and 'properties' in expected_attribute['items']
-                    ):
-                        expected_item = (
-                            expected_attribute['items']['properties']
-                        )
-                        actual_items = actual_attributes[field]
-
-                        for actual_item in actual_items:
-                            __check_attributes_schema(
-                                actual_item,
-                                expected_item
-                            )
-
-                    if (
-                        (actual_value and expected_type)
-                        or field not in nullable_fields
-                    ):
-                        self.assertIsInstance(actual_value, expected_type)
-
-                        # Get attribute pattern and format, then validate
-                        pattern = (
-                            None if 'pattern' not in expected_attribute
-                            else expected_attribute['pattern']
-                        )
-                        formatting = (
-                            None if 'format' not in expected_attribute
-                            else expected_attribute['format']
-                        )
-                        if pattern is not None or formatting is not None:
-                            __validate_format(
-                                actual_value,
-                                formatting,
-                                pattern
-                            )
-
-            status_code = response.status_code
-            content = self.get_json_content(response)
-
-            # Basic tests for successful/error response
+
+    def get_validator(self, resource, nullable_fields=None, fields=None):
+        """Get the compiled validator of a resource definition, or of a
+        sparse fieldset of it if fields are given"""
+
+        return self.schema_compiler.get_validator(resource, nullable_fields,
+                                                  fields)
+
+    def check_schema(self, response, validator, nullable_fields=None):
+        """Check the schema of response match OpenAPI specification while
+        the response body is streamed. Included resources of a compound
+        document are checked against the definition of their type
+
+        :param response: the response to check
+        :param validator: validator of the primary data
+        :param nullable_fields: fields of included resources which are
+                                allowed to be null (default: None)
+        :returns: The parsed document, where the elements of a data or
+                  included array are reduced to their resource identifiers.
+                  The seconds spent are set as response.validation_seconds
+        """
+
+        response.validating = True
+        start = time.perf_counter()
+        try:
+            return streaming.validate_stream(
+                response.body, validator, response.status_code,
+                functools.partial(self.schema_compiler.get_type_validator,
+                                  nullable_fields=nullable_fields)
+            )
+        except ijson.JSONError:
+            self.fail('Response not in JSON format')
+        finally:
+            response.validation_seconds = time.perf_counter() - start
+            response.validating = False
+            if getattr(response, 'report_record', None):
+                self.report_response(response)
+
+    def run_sub_cases(self, sub_cases):
+        """Run independent sub-cases of a test, concurrently if
+        sub_case_workers is greater than 1, and report each of them as a
+        unittest sub-test
+
+        :param sub_cases: a list of (parameters, function) tuples, where the
+                          parameters identify the sub-test
+        """
+
+        if self.sub_case_workers <= 1:
+            for params, sub_case in sub_cases:
+                with self.subTest(**params):
+                    sub_case()
+            return
+
+        def __run(sub_case):
             try:
-                if status_code == 200:
-                    resource_data = content['data']
-                    if isinstance(resource_data, list):
-                        for resource in resource_data:
-                            __check_resource_schema(resource)
-                    else:
-                        __check_resource_schema(resource_data)
-                elif status_code >= 400:
-                    errors_data = content['errors']
-                    self.assertIsInstance(errors_data, list)
-                    for error in errors_data:
-                        __check_error_schema(error)
-            except KeyError as error:
-                self.fail(error)
+                sub_case()
+            except Exception as error:
+                return error
+            return None
 
-    def check_url(self, link_url, endpoint, query_params=None):
-        """Check url for correct base and endpoint, parameters"""
+        with concurrent.futures.ThreadPoolExecutor(
+            self.sub_case_workers
+        ) as executor:
+            errors = list(executor.map(__run, [sub_case for _, sub_case
+                                               in sub_cases]))
 
-        query_params = {} if query_params is None else query_params
+        for (params, _), error in zip(sub_cases, errors):
+            with self.subTest(**params):
+                if error is not None:
+                    raise error
+
+    def get_link_base_url(self):
+        """Get the base URL of links returned by the API"""
 
         base_url = self.base_url
         if self.local_test:
             # Local instances return self links without port and /api
-            base_url = re.sub(r':\d{4}/api', '', self.base_url)
+            base_url = re.sub(r':\d+/api', '', self.base_url)
+
+        return re.sub(r'host\.docker\.internal', 'localhost', base_url)
+
+    def get_link_request(self, link_url):
+        """Get the endpoint and query parameters to request a link returned
+        by the API, e.g. the next page
+
+        :returns: A tuple of the endpoint and a dictionary of parameters
+        """
+
+        link_url_obj = urllib.parse.urlparse(link_url)
+        base_path = urllib.parse.urlparse(self.get_link_base_url()).path
+        self.assertTrue(link_url_obj.path.startswith(base_path),
+                        f'Link {link_url} is not below {base_path}')
+        params = dict(urllib.parse.parse_qsl(link_url_obj.query,
+                                             keep_blank_values=True))
+        return link_url_obj.path[len(base_path):], params
 
-        base_url = re.sub(r'host\.docker\.internal', 'localhost', base_url)
+    def check_url(self, link_url, endpoint, query_params=None):
+        """Check url for correct base and endpoint, parameters"""
+
+        query_params = {} if query_params is None else query_params
+        base_url = self.get_link_base_url()
 
         link_url_obj = urllib.parse.urlparse(link_url)
         base_url_obj = urllib.parse.urlparse(base_url)
@@ -335,14 +784,39 @@ class UtilsTestCase(unittest.TestCase):
         """Check response of an endpoint for response code, schema, self
         link"""
 
-        nullable_fields = [] if nullable_fields is None else nullable_fields
-        schema = self.get_resource_schema(resource)
+        validator = self.get_validator(resource, nullable_fields)
         response = self.make_request(endpoint, response_code,
                                      params=query_params)
 
-        self.check_schema(response, schema, nullable_fields)
-        response_json = response.json()
-        if 'links' in response_json:
-            self.check_url(response_json['links']['self'], endpoint,
+        document = self.check_schema(response, validator, nullable_fields)
+        if 'links' in document:
+            self.check_url(document['links']['self'], endpoint,
                            query_params)
+        if response_code == 200 and self.conditional_requests:
+            self.check_conditional_request(endpoint, response, query_params)
         return response
+
+    def check_conditional_request(self, endpoint, response, query_params=None):
+        """Check that a successful response can be revalidated with its
+        ETag
+
+        :param endpoint: the endpoint of the response
+        :param response: the successful response
+        :param query_params: key-value pairs parameters of the response
+                             (default: None)
+        :returns: The 304 response
+        """
+
+        etag = response.headers.get('ETag')
+        self.assertIsNotNone(etag, 'Successful response has no ETag')
+        self.assertFalse(etag.startswith('W/'), f'ETag {etag} is weak')
+        if not endpoint.startswith('/students/batch/'):
+            self.assertIn('Cache-Control', response.headers)
+
+        conditional_response = self.make_request(
+            endpoint, 304, params=query_params,
+            headers={'If-None-Match': etag}
+        )
+        self.assertEqual(conditional_response.headers.get('ETag'), etag)
+        self.assertEqual(conditional_response.body.content, b'')
+        return conditional_response
@@ -0,0 +1,79 @@
+import zlib from 'zlib';
+
+import chai from 'chai';
+import proxyquireModule from 'proxyquire';
+import sinon from 'sinon';
+import sinonChai from 'sinon-chai';
+
+// Prevent call thru to original dependencies
+const proxyquire = proxyquireModule.noCallThru();
+
+chai.should();
+chai.use(sinonChai);
+
+describe('Test compression middleware', () => {
+  let compression;
+  let setHeaderStub;
+
+  /**
+   * Send a body through the middleware
+   *
+   * @param {string} body Body passed to res.end()
+   * @param {string} acceptedEncoding Content coding negotiated with the client
+   * @param {object} options Request headers, status code and ETag computed by Express
+   * @returns {Promise<Buffer|string>} Promise object represents the body sent to the client
+   */
+  const send = (body, acceptedEncoding, { headers = {}, statusCode = 200, etag } = {}) => (
+    new Promise((resolve) => {
+      const req = { headers, acceptsEncodings: () => acceptedEncoding };
+      const res = {
+        locals: {},
+        statusCode,
+        vary: sinon.stub(),
+        getHeader: (name) => (name === 'ETag' ? etag : undefined),
+        setHeader: setHeaderStub,
+        end: resolve,
+      };
+      compression(req, res, () => res.end(body, 'utf8'));
+    })
+  );
+
+  beforeEach(() => {
+    ({ compression } = proxyquire('middlewares/compression', {
+      config: { has: () => true, get: () => ({ thresholdBytes: 100 }) },
+      'utils/metrics': { registerGauge: () => {} },
+    }));
+    setHeaderStub = sinon.stub();
+  });
+  afterEach(() => sinon.restore());
+
+  it('should gzip a body of at least thresholdBytes', async () => {
+    const body = JSON.stringify({ data: 'a'.repeat(1000) });
+    const compressed = await send(body, 'gzip');
+
+    zlib.gunzipSync(compressed).toString().should.equal(body);
+    setHeaderStub.should.have.been.calledWith('Content-Encoding', 'gzip');
+    setHeaderStub.should.have.been.calledWith('Content-Length', compressed.length);
+  });
+  it('should not compress small bodies or bodies for clients without compression', async () => {
+    const smallBody = JSON.stringify({ data: 'a' });
+    const body = JSON.stringify({ data: 'a'.repeat(1000) });
+
+    (await send(smallBody, 'gzip')).should.equal(smallBody);
+    (await send(body, 'identity')).should.equal(body);
+    setHeaderStub.should.not.have.been.called;
+  });
+  it('should give compressed responses the ETag of their content coding', async () => {
+    const body = JSON.stringify({ data: 'a'.repeat(1000) });
+    await send(body, 'gzip', { etag: '"abc"' });
+
+    setHeaderStub.should.have.been.calledWith('ETag', '"abc-gzip"');
+  });
+  it('should compare If-None-Match without the content coding suffix', async () => {
+    const headers = { 'if-none-match': '"abc-gzip", "def"' };
+    await send('', 'gzip', { headers, statusCode: 304, etag: '"abc"' });
+
+    headers['if-none-match'].should.equal('"abc", "def"');
+    setHeaderStub.should.have.been.calledOnceWith('ETag', '"abc-gzip"');
+  });
+});
@@ -50,6 +50,63 @@ describe('Test oracledb connection module', () => {
       createPoolStub.should.have.been.calledOnce.and.always.calledWithMatch({});
       createPoolStub.should.have.been.calledWithMatch({});
     });
+    it('Should reject at once with retryAfterSeconds when queueMax requests are waiting', async () => {
+      configGetStub.returns({ poolMax: 1, queueMax: 1, retryAfterSeconds: 2 });
+      const createPoolStub = sinon.stub()
+        .resolves({ getConnection: () => new Promise(() => {}) });
+      createOracleDbStub(createPoolStub);
+
+      connection.getConnection();
+      await connection.getConnection().should.be.rejected
+        .and.eventually.have.property('retryAfterSeconds', 2);
+      connection.getPoolStats().rejectedCount.should.equal(1);
+    });
+    it('Should reject with retryAfterSeconds when the request waits longer than queueTimeout', async () => {
+      const createPoolStub = sinon.stub().resolves({
+        getConnection: sinon.stub().rejects(new Error('NJS-040: connection request timeout')),
+      });
+      createOracleDbStub(createPoolStub);
+
+      await connection.getConnection().should.be.rejected
+        .and.eventually.have.property('retryAfterSeconds', 1);
+      connection.getPoolStats().timedOutCount.should.equal(1);
+    });
+  });
+
+  describe('getPoolStats', () => {
+    it('Should report an empty pool before the pool is created', () => {
+      createOracleDbStub(sinon.stub());
+      connection.getPoolStats().should.deep.equal({
+        connectionsOpen: 0,
+        connectionsInUse: 0,
+        queueLength: 0,
+        rejectedCount: 0,
+        timedOutCount: 0,
+      });
+    });
+    it('Should report pool connections and requests waiting for a connection', async () => {
+      let releaseConnection;
+      const pendingConnection = new Promise((resolve) => { releaseConnection = resolve; });
+      const createPoolStub = sinon.stub().resolves({
+        connectionsOpen: 4,
+        connectionsInUse: 4,
+        getConnection: () => pendingConnection,
+      });
+      createOracleDbStub(createPoolStub);
+
+      const result = connection.getConnection();
+      await createPoolStub.returnValues[0];
+      connection.getPoolStats().should.deep.equal({
+        connectionsOpen: 4,
+        connectionsInUse: 4,
+        queueLength: 1,
+        rejectedCount: 0,
+        timedOutCount: 0,
+      });
+      releaseConnection('test-connection');
+      await result.should.eventually.be.fulfilled.and.deep.equal('test-connection');
+      connection.getPoolStats().queueLength.should.equal(0);
+    });
   });
 
   const testCases = [
@@ -80,5 +137,20 @@ describe('Test oracledb connection module', () => {
         closeStub.should.have.been.calledOnce;
       });
     });
+    it('Should ping the poolMin connections of the pool to warm it up', async () => {
+      configGetStub.returns({ poolMin: 2 });
+      const executeStub = sinon.stub().resolves();
+      const pingStub = sinon.stub().resolves();
+      const closeStub = sinon.stub().resolves();
+      const createPoolStub = sinon.stub().resolves({
+        getConnection: async () => ({ execute: executeStub, ping: pingStub, close: closeStub }),
+      });
+      createOracleDbStub(createPoolStub);
+
+      await connection.validateOracleDb().should.eventually.be.fulfilled;
+      createPoolStub.should.have.been.calledOnce;
+      pingStub.should.have.been.calledTwice;
+      closeStub.should.have.been.calledThrice;
+    });
   });
 });
@@ -0,0 +1,73 @@
+import chai from 'chai';
+import chaiAsPromised from 'chai-as-promised';
+import proxyquireModule from 'proxyquire';
+import sinon from 'sinon';
+import sinonChai from 'sinon-chai';
+
+// Prevent call thru to original dependencies
+const proxyquire = proxyquireModule.noCallThru();
+
+chai.should();
+chai.use(chaiAsPromised);
+chai.use(sinonChai);
+
+describe('Test current term cache', () => {
+  let currentTerm;
+  let getCurrentTermSqlStub;
+  let executeStub;
+  let connection;
+
+  beforeEach(() => {
+    getCurrentTermSqlStub = sinon.stub().returns('currentTermSql');
+    currentTerm = proxyquire('api/v1/db/oracledb/current-term', {
+      config: { get: () => ({ currentTermTtlSeconds: 60 }) },
+      './contrib/contrib': { contrib: { getCurrentTerm: getCurrentTermSqlStub } },
+    });
+    executeStub = sinon.stub().resolves({ rows: [{ currentTerm: '201901' }] });
+    connection = { execute: executeStub };
+  });
+  afterEach(() => sinon.restore());
+
+  it('Should only look up the current term once while it is cached', async () => {
+    await currentTerm.getCurrentTerm(connection).should.eventually.equal('201901');
+    await currentTerm.getCurrentTerm(connection).should.eventually.equal('201901');
+    executeStub.should.have.been.calledOnceWithExactly('currentTermSql');
+  });
+  it('Should share a single lookup between concurrent callers', async () => {
+    const terms = await Promise.all([
+      currentTerm.getCurrentTerm(connection),
+      currentTerm.getCurrentTerm(connection),
+      currentTerm.getCurrentTerm(connection),
+    ]);
+    terms.should.deep.equal(['201901', '201901', '201901']);
+    executeStub.should.have.been.calledOnce;
+  });
+  it('Should look up the current term again after the TTL elapses or the day ends', async () => {
+    const clock = sinon.useFakeTimers({ now: new Date(2019, 0, 10, 23, 58), toFake: ['Date'] });
+    await currentTerm.getCurrentTerm(connection);
+    clock.tick(30 * 1000);
+    await currentTerm.getCurrentTerm(connection);
+    executeStub.should.have.been.calledOnce;
+    // 23:59:01, after the TTL has elapsed
+    clock.tick(31 * 1000);
+    await currentTerm.getCurrentTerm(connection);
+    executeStub.should.have.been.calledTwice;
+    // 00:00:00, after the day has ended but before the TTL has elapsed
+    clock.tick(59 * 1000);
+    executeStub.resolves({ rows: [{ currentTerm: '201902' }] });
+    await currentTerm.getCurrentTerm(connection).should.eventually.equal('201902');
+    executeStub.should.have.been.calledThrice;
+  });
+  it('Should not cache a failed lookup', async () => {
+    executeStub.onFirstCall().rejects(new Error('Lookup failed'));
+    await currentTerm.getCurrentTerm(connection).should.be.rejectedWith('Lookup failed');
+    await currentTerm.getCurrentTerm(connection).should.eventually.equal('201901');
+    executeStub.should.have.been.calledTwice;
+  });
+  it('Should not keep a lookup that failed while building its query', async () => {
+    getCurrentTermSqlStub.onFirstCall().throws(new Error('Query failed'));
+    await currentTerm.getCurrentTerm(connection).should.be.rejectedWith('Query failed');
+    await currentTerm.getCurrentTerm(connection).should.eventually.equal('201901');
+    executeStub.should.have.been.calledOnce;
+  });
+});
@@ -0,0 +1,39 @@
+import chai from 'chai';
+
+import { getMetrics, observe, registerGauge } from 'utils/metrics';
+
+chai.should();
+
+describe('Test metrics', () => {
+  it('should include process memory usage', () => {
+    const { meta, metrics } = getMetrics();
+    meta.should.include.all.keys('time', 'unixTime', 'uptimeSeconds');
+    metrics.should.include.all.keys(
+      'process.rss',
+      'process.heapTotal',
+      'process.heapUsed',
+      'process.external',
+    );
+  });
+  it('should evaluate registered gauges every time metrics are collected', () => {
+    let value = 1;
+    registerGauge('fake.gauge', () => value);
+    getMetrics().metrics['fake.gauge'].should.equal(1);
+    value = 2;
+    getMetrics().metrics['fake.gauge'].should.equal(2);
+  });
+  it('should count observations of a histogram in cumulative buckets', () => {
+    observe('fake.histogram', 0.5);
+    observe('fake.histogram', 3);
+    observe('fake.histogram', 20000);
+    const histogram = getMetrics().histograms['fake.histogram'];
+    histogram.should.include({ count: 3, sum: 20003.5 });
+    histogram.buckets.should.include({
+      1: 1,
+      2: 1,
+      5: 2,
+      10000: 2,
+      '+Inf': 3,
+    });
+  });
+});
@@ -1,5 +1,5 @@
 import { assert } from 'chai';
-import { paginate } from 'utils/paginator';
+import { getPageQuery, getPagination, paginate } from 'utils/paginator';
 import _ from 'lodash';
 import { pets as rows } from 'db/mock-data-example.json';
 
@@ -85,4 +85,26 @@ describe('Test paginator', () => {
     repeatForAllPages(assertValidPageNumber);
     done();
   });
+
+  it('pages are only requested with page[number] or page[size]', (done) => {
+    assert.isNull(getPageQuery({}));
+    assert.isNull(getPageQuery({ term: 'current' }));
+    assert.deepEqual(getPageQuery({ 'page[number]': 3 }), { number: 3, size: 25 });
+    assert.deepEqual(getPageQuery({ 'page[size]': 10 }), { number: 1, size: 10 });
+    done();
+  });
+
+  it('pagination matches paginated rows', (done) => {
+    const assertPaginationMatchRows = ({ page }) => {
+      const { totalPages, nextPage, prevPage } = paginate(rows, page);
+      const pagination = getPagination(rows.length, page);
+      assert.equal(pagination.totalResults, rows.length);
+      assert.equal(pagination.totalPages, totalPages);
+      assert.equal(pagination.nextPage, nextPage);
+      assert.equal(pagination.prevPage, prevPage);
+      assert.isFalse(pagination.isOutOfBounds);
+    };
+    repeatForAllPages(assertPaginationMatchRows);
+    done();
+  });
 });
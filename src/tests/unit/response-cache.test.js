@@ -0,0 +1,39 @@
+import chai from 'chai';
+import sinon from 'sinon';
+
+import { createResponseCache } from 'utils/response-cache';
+
+chai.should();
+
+describe('Test response cache', () => {
+  afterEach(() => sinon.restore());
+
+  it('Should return cached values and count hits and misses', () => {
+    const cache = createResponseCache(2, 60);
+    cache.set('a', { data: 'a' });
+    cache.get('a').should.deep.equal({ data: 'a' });
+    chai.expect(cache.get('b')).to.be.undefined;
+    cache.getStats().should.deep.equal({ size: 1, hits: 1, misses: 1 });
+  });
+  it('Should evict the least recently used entry when full', () => {
+    const cache = createResponseCache(2, 60);
+    cache.set('a', 'a');
+    cache.set('b', 'b');
+    cache.get('a');
+    cache.set('c', 'c');
+    chai.expect(cache.get('b')).to.be.undefined;
+    cache.get('a').should.equal('a');
+    cache.get('c').should.equal('c');
+    cache.getStats().size.should.equal(2);
+  });
+  it('Should expire entries after the TTL', () => {
+    const clock = sinon.useFakeTimers({ toFake: ['Date'] });
+    const cache = createResponseCache(2, 60);
+    cache.set('a', 'a');
+    clock.tick(59 * 1000);
+    cache.get('a').should.equal('a');
+    clock.tick(2 * 1000);
+    chai.expect(cache.get('a')).to.be.undefined;
+    cache.getStats().size.should.equal(0);
+  });
+});
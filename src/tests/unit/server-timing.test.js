@@ -0,0 +1,44 @@
+import chai from 'chai';
+import chaiAsPromised from 'chai-as-promised';
+import sinon from 'sinon';
+
+import { createTimer, formatServerTiming } from 'utils/server-timing';
+
+chai.should();
+chai.use(chaiAsPromised);
+
+describe('Test server timing', () => {
+  afterEach(() => sinon.restore());
+
+  it('should sum up the durations of each phase and include the total', async () => {
+    const clock = sinon.useFakeTimers({ toFake: ['hrtime', 'setTimeout'] });
+    const timer = createTimer();
+
+    const stop = timer.start('query');
+    clock.tick(10);
+    stop();
+    const result = timer.time('query', () => new Promise((resolve) => {
+      setTimeout(() => resolve('rows'), 5);
+    }));
+    clock.tick(5);
+    (await result).should.equal('rows');
+    clock.tick(2);
+
+    timer.getDurations().should.deep.equal({ query: 15, total: 17 });
+  });
+  it('should record the duration of a phase which fails', async () => {
+    const clock = sinon.useFakeTimers({ toFake: ['hrtime'] });
+    const timer = createTimer();
+
+    await timer.time('pool', () => {
+      clock.tick(3);
+      throw new Error('Pool is closed');
+    }).should.be.rejected;
+
+    timer.getDurations().pool.should.equal(3);
+  });
+  it('should format durations as a Server-Timing header', () => {
+    formatServerTiming({ pool: 0.42, query: 12.06, total: 13 })
+      .should.equal('pool;dur=0.4, query;dur=12.1, total;dur=13.0');
+  });
+});
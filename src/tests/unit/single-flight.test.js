@@ -0,0 +1,43 @@
+import chai from 'chai';
+import chaiAsPromised from 'chai-as-promised';
+import sinon from 'sinon';
+import sinonChai from 'sinon-chai';
+
+import { createSingleFlight } from 'utils/single-flight';
+
+chai.should();
+chai.use(chaiAsPromised);
+chai.use(sinonChai);
+
+describe('Test single-flight group', () => {
+  let flight;
+
+  beforeEach(() => {
+    flight = createSingleFlight();
+  });
+
+  it('should share an execution between concurrent calls with the same key', async () => {
+    const fn = sinon.stub().resolves('rows');
+    const results = await Promise.all([
+      flight.run('grades', fn),
+      flight.run('grades', fn),
+      flight.run('gpa', fn),
+    ]);
+
+    results.should.deep.equal(['rows', 'rows', 'rows']);
+    fn.should.have.been.calledTwice;
+    flight.getStats().should.deep.equal({ inFlight: 0, executions: 2, sharedCalls: 1 });
+  });
+  it('should release the key once the execution settles, even if it fails', async () => {
+    const fn = sinon.stub().rejects(new Error('Query failed'));
+    await Promise.all([
+      flight.run('grades', fn).should.be.rejectedWith('Query failed'),
+      flight.run('grades', fn).should.be.rejectedWith('Query failed'),
+    ]);
+    flight.has('grades').should.be.false;
+
+    fn.resolves('rows');
+    await flight.run('grades', fn).should.eventually.equal('rows');
+    fn.should.have.been.calledTwice;
+  });
+});
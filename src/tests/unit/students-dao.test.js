@@ -5,30 +5,52 @@ import _ from 'lodash';
 import proxyquire from 'proxyquire';
 import sinon from 'sinon';
 
+import { createTimer } from 'utils/server-timing';
+
 chai.should();
 chai.use(chaiAsPromised);
 const { any } = sinon.match;
 
+/**
+ * Load students-dao with the given dependencies stubbed. config.get is only replaced while the
+ * module loads, so the result doesn't depend on which tests ran before.
+ *
+ * @param {object} stubs Stubs of the dependencies of students-dao, keyed by path
+ * @returns {object} The students-dao module
+ */
+const loadStudentsDao = (stubs) => {
+  const sandbox = sinon.createSandbox();
+  sandbox.replace(config, 'get', () => ({ oracledb: {} }));
+  try {
+    return proxyquire('../../api/v1/db/oracledb/students-dao', stubs);
+  } finally {
+    sandbox.restore();
+  }
+};
+
 describe('Test students-dao', () => {
   const fakeId = 'fakeId';
   const fakeParams = {};
   const fakeExtraBinds = {};
   const stubStudentsSerializer = sinon.stub().returnsArg(0);
 
-  sinon.replace(config, 'get', () => ({ oracledb: {} }));
-  const studentsDao = proxyquire('../../api/v1/db/oracledb/students-dao', {
-    './connection': {
-      getConnection: sinon.stub().resolves({
-        execute: (sql) => {
-          const sqlResults = {
-            multiResults: { rows: [{}, {}] },
-            singleResult: { rows: [{}] },
-          };
-          return sql in sqlResults ? sqlResults[sql] : sqlResults.singleResult;
-        },
-        close: () => null,
-      }),
-    },
+  let studentsDao;
+
+  before(() => {
+    studentsDao = loadStudentsDao({
+      './connection': {
+        getConnection: sinon.stub().resolves({
+          execute: (sql) => {
+            const sqlResults = {
+              multiResults: { rows: [{}, {}] },
+              singleResult: { rows: [{}] },
+            };
+            return sql in sqlResults ? sqlResults[sql] : sqlResults.singleResult;
+          },
+          close: () => null,
+        }),
+      },
+    });
   });
 
   afterEach(() => stubStudentsSerializer.resetHistory());
@@ -56,7 +78,9 @@ describe('Test students-dao', () => {
         .eventually.be.fulfilled
         .and.deep.equal(expectResult)
         .then(() => {
-          sinon.assert.alwaysCalledWithExactly(stubStudentsSerializer, any, any, fakeParams);
+          sinon.assert.alwaysCalledWithExactly(
+            stubStudentsSerializer, any, any, fakeParams, undefined,
+          );
           sinon.assert.callCount(stubStudentsSerializer, fulfilledCases.length);
         }));
     });
@@ -81,3 +105,217 @@ describe('Test students-dao', () => {
       .then(() => sinon.assert.notCalled(stubStudentsSerializer));
   });
 });
+
+describe('Test students-dao batch queries', () => {
+  const fakeIds = ['931234567', '931234568', '931234569'];
+  const stubSerializer = sinon.stub().callsFake((rawRows, osuId) => ({ osuId, rawRows }));
+  const stubExecute = sinon.stub().resolves({
+    rows: [
+      { batchOsuId: '931234567', value: 1 },
+      { batchOsuId: '931234569', value: 2 },
+      { batchOsuId: '931234569', value: 3 },
+    ],
+  });
+
+  let studentsDao;
+
+  before(() => {
+    studentsDao = loadStudentsDao({
+      './connection': {
+        getConnection: sinon.stub().resolves({ execute: stubExecute, close: () => null }),
+      },
+    });
+  });
+
+  afterEach(() => {
+    stubSerializer.resetHistory();
+    stubExecute.resetHistory();
+  });
+
+  it('should run a single query for every student and serialize per student', async () => {
+    const fakeSql = () => 'SELECT * FROM fake WHERE id = :osuId';
+    const result = await studentsDao.getResourcesByIds(
+      fakeIds, fakeSql, stubSerializer, false, {}, {},
+    );
+
+    sinon.assert.calledOnce(stubExecute);
+    const [sql, binds] = stubExecute.firstCall.args;
+    sql.should.include('WHERE id = ids.COLUMN_VALUE').and.not.include(':osuId');
+    binds.osuIds.val.should.deep.equal(fakeIds);
+    result.should.deep.equal([
+      { osuId: '931234567', rawRows: [{ value: 1 }] },
+      { osuId: '931234568', rawRows: [] },
+      { osuId: '931234569', rawRows: [{ value: 2 }, { value: 3 }] },
+    ]);
+  });
+  it('should skip students without a singleton and reject multiple singletons', async () => {
+    const fakeSql = () => 'SELECT * FROM fake WHERE id = :osuId';
+    const result = studentsDao.getResourcesByIds(
+      fakeIds.slice(0, 2), fakeSql, stubSerializer, true, {}, {},
+    );
+    await result.should.eventually.deep.equal([{ osuId: '931234567', rawRows: { value: 1 } }]);
+
+    return studentsDao.getResourcesByIds(fakeIds, fakeSql, stubSerializer, true, {}, {})
+      .should.be.rejectedWith('Expect a single object but got multiple results.');
+  });
+});
+
+describe('Test students-dao included resources', () => {
+  const fakeId = '931234567';
+  const stubGetConnection = sinon.stub();
+  const stubExecute = sinon.stub().resolves({ rows: [{ value: 1 }] });
+  const stubGetCurrentTerm = sinon.stub().resolves('201901');
+  const stubSerializeStudent = sinon.stub().returnsArg(1);
+
+  let studentsDao;
+
+  before(() => {
+    studentsDao = loadStudentsDao({
+      './connection': { getConnection: stubGetConnection },
+      './current-term': { getCurrentTerm: stubGetCurrentTerm },
+      './contrib/contrib': {
+        contrib: {
+          getGpaLevelsById: () => 'gpaSql',
+          getGradesById: () => 'gradesSql',
+        },
+        '@noCallThru': true,
+      },
+      '../../serializers/students-serializer': {
+        serializeGpa: (rawRows) => ({ gpa: rawRows }),
+        serializeGrades: (rawRows) => ({ grades: rawRows }),
+        serializeStudent: stubSerializeStudent,
+      },
+    });
+  });
+  beforeEach(() => {
+    stubGetConnection.resolves({ execute: stubExecute, close: () => null });
+  });
+  afterEach(() => {
+    stubGetConnection.reset();
+    stubExecute.resetHistory();
+    stubGetCurrentTerm.resetHistory();
+    stubSerializeStudent.resetHistory();
+  });
+
+  it('should fetch each included resource on its own connection with a single term', async () => {
+    const params = { include: ['gpa', 'grades', 'gpa'], term: 'current' };
+    const result = await studentsDao.getStudentById(fakeId, params);
+
+    sinon.assert.calledOnce(stubGetCurrentTerm);
+    sinon.assert.callCount(stubGetConnection, 3);
+    sinon.assert.calledWithExactly(stubExecute, 'gpaSql', { osuId: fakeId });
+    sinon.assert.calledWithExactly(stubExecute, 'gradesSql', { osuId: fakeId, term: '201901' });
+    sinon.assert.calledOnceWithExactly(stubSerializeStudent, fakeId, any, params);
+    result.should.deep.equal({
+      gpa: { gpa: [{ value: 1 }] },
+      grades: { grades: [{ value: 1 }] },
+    });
+  });
+  it('should not look up the current term if a term is given', async () => {
+    await studentsDao.getStudentById(fakeId, { include: ['grades'], term: '201803' });
+
+    sinon.assert.notCalled(stubGetCurrentTerm);
+    sinon.assert.calledOnceWithExactly(
+      stubExecute, 'gradesSql', { osuId: fakeId, term: '201803' },
+    );
+  });
+});
+
+describe('Test students-dao pagination', () => {
+  const fakeId = 'fakeId';
+  const stubSerializer = sinon.stub().returnsArg(0);
+  const stubExecute = sinon.stub().callsFake(async (sql) => (
+    _.includes(sql, 'COUNT(*)')
+      ? { rows: [{ totalResults: '60' }] }
+      : { rows: [{ value: 1 }, { value: 2 }] }
+  ));
+
+  let studentsDao;
+
+  before(() => {
+    studentsDao = loadStudentsDao({
+      './connection': {
+        getConnection: sinon.stub().resolves({ execute: stubExecute, close: () => null }),
+      },
+    });
+  });
+  const fakeSql = () => 'SELECT * FROM fake WHERE id = :osuId ORDER BY id';
+
+  afterEach(() => {
+    stubSerializer.resetHistory();
+    stubExecute.resetHistory();
+  });
+
+  it('should only fetch the requested page and count the rows separately', async () => {
+    const params = { 'page[number]': 2, 'page[size]': 25 };
+    const timer = createTimer();
+    await studentsDao.getResourceById(fakeId, fakeSql, stubSerializer, false, {}, params, timer);
+
+    sinon.assert.calledTwice(stubExecute);
+    stubExecute.firstCall.args[0].should.include('SELECT COUNT(*)');
+    timer.getDurations().should.include.all.keys('count', 'query');
+    const [pageSql, pageBinds] = stubExecute.secondCall.args;
+    pageSql.should.include('OFFSET :pageOffset ROWS FETCH NEXT :pageSize ROWS ONLY');
+    pageBinds.should.include({ osuId: fakeId, pageOffset: 25, pageSize: 25 });
+    stubSerializer.firstCall.args[3].should.include({
+      totalResults: 60,
+      totalPages: 3,
+      pageNumber: 2,
+      nextPage: 3,
+      prevPage: 1,
+    });
+  });
+  it('should not fetch any rows for a page out of bounds', async () => {
+    const params = { 'page[number]': 4, 'page[size]': 25 };
+    await studentsDao.getResourceById(fakeId, fakeSql, stubSerializer, false, {}, params);
+
+    sinon.assert.calledOnce(stubExecute);
+    stubSerializer.firstCall.args[0].should.deep.equal([]);
+  });
+  it('should fetch every row if no page is requested', async () => {
+    await studentsDao.getResourceById(fakeId, fakeSql, stubSerializer, false, {}, {});
+
+    sinon.assert.calledOnceWithExactly(stubExecute, fakeSql(), { osuId: fakeId });
+  });
+});
+
+describe('Test students-dao request coalescing', () => {
+  const fakeId = 'fakeId';
+  const stubSerializer = sinon.stub().callsFake((rows) => ({ data: rows }));
+  const stubExecute = sinon.stub().resolves({ rows: [{ value: 1 }] });
+  const stubGetConnection = sinon.stub().resolves({ execute: stubExecute, close: () => null });
+
+  let studentsDao;
+
+  before(() => {
+    studentsDao = loadStudentsDao({ './connection': { getConnection: stubGetConnection } });
+  });
+  const fakeSql = () => 'SELECT * FROM fake WHERE id = :osuId';
+
+  afterEach(() => {
+    stubSerializer.resetHistory();
+    stubExecute.resetHistory();
+    stubGetConnection.resetHistory();
+  });
+
+  it('should share a single query and result between identical concurrent calls', async () => {
+    const params = { term: '201901' };
+    const results = await Promise.all(_.times(5, () => studentsDao.getResourceById(
+      fakeId, fakeSql, stubSerializer, false, {}, params,
+    )));
+
+    sinon.assert.calledOnce(stubGetConnection);
+    sinon.assert.calledOnce(stubExecute);
+    sinon.assert.calledOnce(stubSerializer);
+    _.uniq(results).should.have.lengthOf(1);
+  });
+  it('should query again for different params and once the shared query has settled', async () => {
+    const getGrades = (term) => studentsDao.getResourceById(
+      fakeId, fakeSql, stubSerializer, false, {}, { term },
+    );
+    await Promise.all([getGrades('201901'), getGrades('201902')]);
+    await getGrades('201901');
+
+    sinon.assert.calledThrice(stubExecute);
+  });
+});
@@ -420,4 +420,75 @@ describe('Test students-serializer', () => {
       expectNumberFields(emergencyContact, numberFields);
     });
   });
+  it('test serializeBatch', () => {
+    const { serializeBatch } = studentsSerializer;
+    const singleResource = { data: { id: '931234567', type: 'gpa' } };
+    const multipleResources = {
+      data: [{ id: '931234568-201901', type: 'gpa' }, { id: '931234568-201902', type: 'gpa' }],
+    };
+    const params = { osuIds: ['931234567', '931234568'] };
+
+    const serializedBatch = serializeBatch([singleResource, multipleResources], 'gpa', params);
+    expect(serializedBatch.links.self).to.equal(
+      '/v1/students/batch/gpa?osuIds=931234567%2C931234568',
+    );
+    expect(_.map(serializedBatch.data, 'id')).to.deep.equal(
+      ['931234567', '931234568-201901', '931234568-201902'],
+    );
+  });
+  it('test serializeStudent', () => {
+    const { serializeStudent } = studentsSerializer;
+    const classification = {
+      links: { self: '/v1/students/931234567/classification' },
+      data: { id: '931234567', type: 'classification', attributes: {} },
+    };
+    const gpa = {
+      links: { self: '/v1/students/931234567/gpa' },
+      data: [
+        { id: '931234567-01', type: 'gpa', attributes: {} },
+        { id: '931234567-02', type: 'gpa', attributes: {} },
+      ],
+    };
+    const params = { include: ['classification', 'gpa'] };
+
+    const serializedStudent = serializeStudent('931234567', { classification, gpa }, params);
+    expect(serializedStudent.links.self).to.equal(
+      '/v1/students/931234567?include=classification%2Cgpa',
+    );
+    expect(serializedStudent.data).to.containSubset({
+      type: 'student',
+      id: '931234567',
+      relationships: {
+        classification: {
+          links: { related: '/v1/students/931234567/classification' },
+          data: { id: '931234567', type: 'classification' },
+        },
+        gpa: {
+          links: { related: '/v1/students/931234567/gpa' },
+          data: [{ id: '931234567-01', type: 'gpa' }, { id: '931234567-02', type: 'gpa' }],
+        },
+      },
+    });
+    expect(serializedStudent.included).to.deep.equal([classification.data, ...gpa.data]);
+  });
+  it('test sparse fieldsets', () => {
+    const { serializeGpa, serializeClassification } = studentsSerializer;
+
+    const serializedGpa = serializeGpa(
+      _.cloneDeep(testData.rawGpaLevels),
+      fakeId,
+      { 'fields[gpa]': ['gpa', 'gpaCreditHours'] },
+    );
+    expect(serializedGpa.data.attributes).to.have.all.keys('gpaLevels');
+    _.each(serializedGpa.data.attributes.gpaLevels, (gpaLevel) => {
+      expect(gpaLevel).to.have.all.keys('gpa', 'gpaCreditHours');
+    });
+
+    const serializedClassification = serializeClassification(
+      _.cloneDeep(testData.rawClassification),
+      fakeId,
+      { 'fields[classification]': ['level', 'campus'] },
+    );
+    expect(serializedClassification.data.attributes).to.have.all.keys('level', 'campus');
+  });
 });
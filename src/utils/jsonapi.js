@@ -23,7 +23,9 @@ const serializerOptions = (serializerArgs) => {
   const {
     identifierField,
     resourceKeys,
+    nestedKeys,
     pagination,
+    paginationUrl,
     resourcePath,
     topLevelSelfLink,
     query,
@@ -51,7 +53,13 @@ const serializerOptions = (serializerArgs) => {
 
   if (transformFunction) options.transform = transformFunction;
 
+  // Items of array attributes are trimmed to the given keys, e.g. for sparse fieldsets
+  _.forEach(nestedKeys, (keys, attribute) => {
+    options[attribute] = { attributes: keys };
+  });
+
   if (pagination) {
+    const pageUrl = paginationUrl || resourceUrl;
     const {
       pageNumber,
       totalPages,
@@ -62,13 +70,13 @@ const serializerOptions = (serializerArgs) => {
     } = pagination;
 
     options.topLevelLinks = _.assign(options.topLevelLinks, {
-      first: paramsLink(resourceUrl, { ...query, ...pageParamsBuilder(1, pageSize) }),
-      last: paramsLink(resourceUrl, { ...query, ...pageParamsBuilder(totalPages, pageSize) }),
+      first: paramsLink(pageUrl, { ...query, ...pageParamsBuilder(1, pageSize) }),
+      last: paramsLink(pageUrl, { ...query, ...pageParamsBuilder(totalPages, pageSize) }),
       next: nextPage
-        ? paramsLink(resourceUrl, { ...query, ...pageParamsBuilder(nextPage, pageSize) })
+        ? paramsLink(pageUrl, { ...query, ...pageParamsBuilder(nextPage, pageSize) })
         : null,
       prev: prevPage
-        ? paramsLink(resourceUrl, { ...query, ...pageParamsBuilder(prevPage, pageSize) })
+        ? paramsLink(pageUrl, { ...query, ...pageParamsBuilder(prevPage, pageSize) })
         : null,
     });
 
@@ -0,0 +1,82 @@
+import _ from 'lodash';
+import moment from 'moment';
+
+/** Functions returning the current value of a gauge, keyed by gauge name */
+const gauges = {};
+
+/** Upper bounds of the buckets of every histogram, e.g. durations in milliseconds */
+const histogramBuckets = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+/** Observation counts of each bucket, the number and the sum of observations, keyed by name */
+const histograms = {};
+
+/**
+ * Register a gauge which is evaluated every time metrics are collected
+ *
+ * @param {string} name Name of the gauge, e.g. oracledb.connectionsInUse
+ * @param {Function} getValue Function that returns the current value of the gauge
+ */
+const registerGauge = (name, getValue) => {
+  gauges[name] = getValue;
+};
+
+/**
+ * Record an observation in a histogram, creating the histogram the first time it is observed
+ *
+ * @param {string} name Name of the histogram, e.g. serverTiming.getGpaById.query
+ * @param {number} value Observed value
+ */
+const observe = (name, value) => {
+  if (!histograms[name]) {
+    histograms[name] = {
+      counts: _.fill(Array(histogramBuckets.length + 1), 0),
+      count: 0,
+      sum: 0,
+    };
+  }
+  const histogram = histograms[name];
+  histogram.counts[_.sortedIndex(histogramBuckets, value)] += 1;
+  histogram.count += 1;
+  histogram.sum += value;
+};
+
+/**
+ * Collect the current value of every metric
+ *
+ * @returns {object} Metrics document including process memory usage, every registered gauge and
+ *                   every histogram with cumulative bucket counts
+ */
+const getMetrics = () => {
+  const {
+    rss,
+    heapTotal,
+    heapUsed,
+    external,
+  } = process.memoryUsage();
+  const now = moment();
+  return {
+    meta: {
+      time: now.format('YYYY-MM-DD HH:mm:ssZZ'),
+      unixTime: now.unix(),
+      uptimeSeconds: process.uptime(),
+    },
+    metrics: {
+      'process.rss': rss,
+      'process.heapTotal': heapTotal,
+      'process.heapUsed': heapUsed,
+      'process.external': external,
+      ..._.mapValues(gauges, (getValue) => getValue()),
+    },
+    histograms: _.mapValues(histograms, ({ counts, count, sum }) => {
+      const buckets = {};
+      let cumulativeCount = 0;
+      _.forEach(histogramBuckets, (bucket, index) => {
+        cumulativeCount += counts[index];
+        buckets[bucket] = cumulativeCount;
+      });
+      return { buckets: { ...buckets, '+Inf': count }, count, sum };
+    }),
+  };
+};
+
+export { registerGauge, observe, getMetrics };
@@ -1,29 +1,66 @@
 import _ from 'lodash';
 
+/** Page size used if only a page number is requested */
+const defaultPageSize = 25;
+
 /**
- * Paginate data rows
+ * Get the pagination query of request parameters
  *
- * @param {object[]} rows Data rows
+ * @param {object} params A key-value pair params object
+ * @returns {object} Pagination query parameter, or null if no page is requested
+ */
+const getPageQuery = (params) => {
+  if (!params || (!params['page[number]'] && !params['page[size]'])) {
+    return null;
+  }
+  return {
+    number: params['page[number]'] || 1,
+    size: params['page[size]'] || defaultPageSize,
+  };
+};
+
+/**
+ * Get pagination details from the total number of results
+ *
+ * @param {number} totalResults Total number of results
  * @param {object} pageQuery Pagination query parameter
- * @returns {*} Paginated data rows
+ * @returns {object} Pagination details
  */
-const paginate = (rows, pageQuery) => {
+const getPagination = (totalResults, pageQuery) => {
   const pageNumber = parseInt(pageQuery.number, 10);
   const pageSize = parseInt(pageQuery.size, 10);
-  const totalPages = Math.ceil(rows.length / pageSize) || 1;
-  const paginatedRows = _.slice(rows, (pageNumber - 1) * pageSize, pageNumber * pageSize);
+  const totalPages = Math.ceil(totalResults / pageSize) || 1;
   const isOutOfBounds = pageNumber < 1 || pageNumber > totalPages;
   const nextPage = isOutOfBounds || pageNumber >= totalPages ? null : pageNumber + 1;
   const prevPage = isOutOfBounds || pageNumber <= 1 ? null : pageNumber - 1;
 
   return {
-    paginatedRows,
+    totalResults,
     totalPages,
     pageNumber,
     pageSize,
     nextPage,
     prevPage,
+    isOutOfBounds,
+  };
+};
+
+/**
+ * Paginate data rows
+ *
+ * @param {object[]} rows Data rows
+ * @param {object} pageQuery Pagination query parameter
+ * @returns {*} Paginated data rows
+ */
+const paginate = (rows, pageQuery) => {
+  const pagination = getPagination(rows.length, pageQuery);
+  const { pageNumber, pageSize } = pagination;
+  const paginatedRows = _.slice(rows, (pageNumber - 1) * pageSize, pageNumber * pageSize);
+
+  return {
+    paginatedRows,
+    ..._.omit(pagination, 'isOutOfBounds'),
   };
 };
 
-export { paginate };
+export { getPageQuery, getPagination, paginate };
@@ -0,0 +1,40 @@
+/**
+ * Create a bounded cache of response bodies. Entries expire after a TTL, and the least recently
+ * used entry is evicted when the cache is full.
+ *
+ * @param {number} maxEntries Maximum number of entries
+ * @param {number} ttlSeconds Seconds an entry is served from the cache
+ * @returns {object} Cache with get, set and getStats functions
+ */
+const createResponseCache = (maxEntries, ttlSeconds) => {
+  /** Entries in order of use, so the first key is the least recently used */
+  const entries = new Map();
+  let hits = 0;
+  let misses = 0;
+
+  const get = (key) => {
+    const entry = entries.get(key);
+    entries.delete(key);
+    if (!entry || entry.expiresAt <= Date.now()) {
+      misses += 1;
+      return undefined;
+    }
+    entries.set(key, entry);
+    hits += 1;
+    return entry.value;
+  };
+
+  const set = (key, value) => {
+    entries.delete(key);
+    entries.set(key, { value, expiresAt: Date.now() + ttlSeconds * 1000 });
+    if (entries.size > maxEntries) {
+      entries.delete(entries.keys().next().value);
+    }
+  };
+
+  const getStats = () => ({ size: entries.size, hits, misses });
+
+  return { get, set, getStats };
+};
+
+export { createResponseCache };
@@ -0,0 +1,57 @@
+import _ from 'lodash';
+
+/**
+ * Convert a duration returned by process.hrtime to milliseconds
+ *
+ * @param {number[]} duration Seconds and nanoseconds
+ * @returns {number} Duration in milliseconds
+ */
+const toMilliseconds = ([seconds, nanoseconds]) => seconds * 1e3 + nanoseconds / 1e6;
+
+/**
+ * Create a timer which accumulates the durations of the phases of a request, e.g. pool or query.
+ * Durations of a phase which runs several times or concurrently, e.g. the queries of included
+ * resources, are summed up.
+ *
+ * @returns {object} Timer with start, time and getDurations functions
+ */
+const createTimer = () => {
+  const requestStart = process.hrtime();
+  const durations = {};
+
+  const start = (phase) => {
+    const phaseStart = process.hrtime();
+    return () => {
+      durations[phase] = (durations[phase] || 0) + toMilliseconds(process.hrtime(phaseStart));
+    };
+  };
+
+  const time = async (phase, fn) => {
+    const stop = start(phase);
+    try {
+      return await fn();
+    } finally {
+      stop();
+    }
+  };
+
+  const getDurations = () => ({
+    ...durations,
+    total: toMilliseconds(process.hrtime(requestStart)),
+  });
+
+  return { start, time, getDurations };
+};
+
+/**
+ * Format durations as the value of a Server-Timing header
+ *
+ * @param {object} durations Durations in milliseconds keyed by phase
+ * @returns {string} Server-Timing header value, e.g. "pool;dur=0.4, query;dur=12.1"
+ */
+const formatServerTiming = (durations) => _.map(
+  durations,
+  (duration, phase) => `${phase};dur=${duration.toFixed(1)}`,
+).join(', ');
+
+export { createTimer, formatServerTiming };
@@ -0,0 +1,52 @@
+/**
+ * Create a single-flight group. Concurrent calls with the same key share a single execution and
+ * its result instead of running it once each. The key is released once the execution settles, so
+ * later calls run it again and nothing is cached.
+ *
+ * @returns {object} Single-flight group
+ */
+const createSingleFlight = () => {
+  /** Promises of the executions in flight, keyed by call key */
+  const pending = new Map();
+  let executions = 0;
+  let sharedCalls = 0;
+
+  return {
+    /**
+     * Check whether an execution with the key is in flight
+     *
+     * @param {string} key Call key
+     * @returns {boolean} Whether a call with the key would share an execution
+     */
+    has: (key) => pending.has(key),
+
+    /**
+     * Run a function, or share the execution in flight with the same key
+     *
+     * @param {string} key Call key
+     * @param {Function} fn Function returning a promise of the result
+     * @returns {Promise} Promise object represents the result of the shared execution
+     */
+    run: (key, fn) => {
+      if (pending.has(key)) {
+        sharedCalls += 1;
+        return pending.get(key);
+      }
+      executions += 1;
+      const execution = Promise.resolve()
+        .then(fn)
+        .finally(() => pending.delete(key));
+      pending.set(key, execution);
+      return execution;
+    },
+
+    /**
+     * Get statistics of the group
+     *
+     * @returns {object} Number of executions in flight, executions and calls which shared one
+     */
+    getStats: () => ({ inFlight: pending.size, executions, sharedCalls }),
+  };
+};
+
+export { createSingleFlight };
@@ -14,7 +14,11 @@ const oracledb = dataSources.includes('oracledb')
   ? require('api/v1/db/oracledb/connection').validateOracleDb
   : null;
 
-/** Validate database configuration */
+/**
+ * Validate database configuration. Failing data sources exit the process.
+ *
+ * @returns {Promise} Promise object resolves once every data source is validated and warmed up
+ */
 const validateDataSource = () => {
   const validationMethods = {
     awsS3,
@@ -23,16 +27,15 @@ const validateDataSource = () => {
     oracledb,
   };
 
-  _.each(dataSources, (dataSourceType) => {
+  return Promise.all(_.map(dataSources, (dataSourceType) => {
     if (dataSourceType in validationMethods) {
-      validationMethods[dataSourceType]().catch((err) => {
+      return validationMethods[dataSourceType]().catch((err) => {
         logger.error(err);
         process.exit(1);
       });
-    } else {
-      throw new Error(`Data source type: '${dataSourceType}' is not recognized.`);
     }
-  });
+    throw new Error(`Data source type: '${dataSourceType}' is not recognized.`);
+  }));
 };
 
 export { validateDataSource };